@@ -3,6 +3,7 @@
 import os
 import signal
 import sys
+import threading
 
 from PyQt5.QtCore import QCoreApplication, QObject, QTimer, pyqtSignal
 from PyQt5.QtXml import QDomDocument
@@ -12,9 +13,17 @@ import jacklib
 import nsm_client
 import ray
 
-connection_list = []
-saved_connections = []
-port_list = []
+# name -> JackPort
+output_ports = {}
+input_ports = {}
+
+# new port names are used to prevent reconnections
+# when a disconnection has not been saved and one new port append.
+new_output_ports = set()
+new_input_ports = set()
+
+# current connections (tuples (output, input))
+connections = set()
 
 PORT_MODE_OUTPUT = 0
 PORT_MODE_INPUT = 1
@@ -28,20 +37,158 @@ file_path = ""
 
 is_dirty = False
 
-pending_connection = False
-
 def signalHandler(sig, frame):
     if sig in (signal.SIGINT, signal.SIGTERM):
         app.quit()
 
 class JackPort:
-    #is_new is used to prevent reconnections
-    # when a disconnection has not been saved and one new port append.
     id = 0
     name = ''
     mode = PORT_MODE_NULL
     type = PORT_TYPE_NULL
-    is_new = False
+
+
+class SavedConnections:
+    ''' saved connections in file order,
+        indexed by output port and by input port names '''
+    def __init__(self):
+        # dicts are used as ordered sets
+        self._connections = {}
+        self._by_output = {}
+        self._by_input = {}
+
+    def __contains__(self, connection):
+        return connection in self._connections
+
+    def __iter__(self):
+        return iter(self._connections)
+
+    def add(self, connection):
+        if connection in self._connections:
+            return
+
+        self._connections[connection] = None
+        self._by_output.setdefault(connection[0], {})[connection] = None
+        self._by_input.setdefault(connection[1], {})[connection] = None
+
+    def remove(self, connection):
+        if connection not in self._connections:
+            return
+
+        del self._connections[connection]
+
+        for port_name, index in ((connection[0], self._by_output),
+                                 (connection[1], self._by_input)):
+            port_connections = index[port_name]
+            del port_connections[connection]
+            if not port_connections:
+                del index[port_name]
+
+    def clear(self):
+        self._connections.clear()
+        self._by_output.clear()
+        self._by_input.clear()
+
+    def from_output(self, port_name: str):
+        return self._by_output.get(port_name, {})
+
+    def to_input(self, port_name: str):
+        return self._by_input.get(port_name, {})
+
+
+saved_connections = SavedConnections()
+
+class ConnectionRestorer(threading.Thread):
+    ''' Makes the saved connections from a worker thread, by batches.
+        A batch is started once JACK confirmed all connections
+        of the previous batch (or after BATCH_TIMEOUT).
+        Progress is sent to the daemon after each batch. '''
+    BATCH_SIZE = 64
+    BATCH_TIMEOUT = 1.0
+    STOP_TIMEOUT = 5.0
+
+    def __init__(self):
+        threading.Thread.__init__(self, daemon=True)
+        self._cond = threading.Condition()
+        self._to_connect = []
+        self._queued = set()
+        self._in_flight = set()
+        self._n_total = 0
+        self._n_done = 0
+        self._stopped = False
+
+    def restore(self, connections_to_make: list):
+        with self._cond:
+            for connection in connections_to_make:
+                if (connection in self._queued
+                        or connection in self._in_flight):
+                    continue
+                self._to_connect.append(connection)
+                self._queued.add(connection)
+                self._n_total += 1
+
+            self._cond.notify_all()
+
+    def connection_made(self, connection: tuple):
+        with self._cond:
+            if connection in self._in_flight:
+                self._in_flight.discard(connection)
+                self._cond.notify_all()
+
+    def stop(self):
+        with self._cond:
+            self._stopped = True
+            self._cond.notify_all()
+
+    def _connect_batch(self, batch: list):
+        for connection in batch:
+            if connection in connections:
+                continue
+
+            with self._cond:
+                if self._stopped:
+                    return
+                self._in_flight.add(connection)
+
+            if jacklib.connect(jack_client, connection[0], connection[1]):
+                # failed or already connected, no callback will come
+                with self._cond:
+                    self._in_flight.discard(connection)
+
+    def run(self):
+        while True:
+            with self._cond:
+                while not self._to_connect and not self._stopped:
+                    self._cond.wait()
+
+                if self._stopped:
+                    return
+
+                batch = self._to_connect[:self.BATCH_SIZE]
+                del self._to_connect[:self.BATCH_SIZE]
+                for connection in batch:
+                    self._queued.discard(connection)
+
+            self._connect_batch(batch)
+
+            with self._cond:
+                # back-pressure, wait JACK to process this batch
+                self._cond.wait_for(
+                    lambda: not self._in_flight or self._stopped,
+                    timeout=self.BATCH_TIMEOUT)
+                self._in_flight.clear()
+
+                self._n_done += len(batch)
+                progress = self._n_done / self._n_total
+                finished = not self._to_connect
+                if finished:
+                    self._n_done = 0
+                    self._n_total = 0
+
+            NSMServer.sendProgress(progress)
+            if finished:
+                # clear progress display
+                NSMServer.sendProgress(0.0)
 
 class ConnectTimer(QObject):
     def __init__(self):
@@ -53,11 +200,23 @@ class ConnectTimer(QObject):
     def start(self):
         self.timer.start()
 
+def portsOfMode(mode):
+    if mode == PORT_MODE_OUTPUT:
+        return output_ports
+    if mode == PORT_MODE_INPUT:
+        return input_ports
+    return None
+
+def newPortsOfMode(mode):
+    if mode == PORT_MODE_OUTPUT:
+        return new_output_ports
+    if mode == PORT_MODE_INPUT:
+        return new_input_ports
+    return None
+
 def portExists(name, mode):
-    for port in port_list:
-        if port.name == name and port.mode == mode:
-            return True
-    return False
+    ports = portsOfMode(mode)
+    return bool(ports is not None and name in ports)
 
 def setDirtyClean():
     global is_dirty
@@ -75,21 +234,12 @@ def timerDirtyFinish():
         NSMServer.sendDirtyState(True)
 
 def isDirtyNow():
-    for connection in connection_list:
+    for connection in connections:
         if not connection in saved_connections:
             return True
 
-    output_ports = []
-    input_ports = []
-
-    for port in port_list:
-        if port.mode == PORT_MODE_OUTPUT:
-            output_ports.append(port.name)
-        elif port.mode == PORT_MODE_INPUT:
-            input_ports.append(port.name)
-
     for connection in saved_connections:
-        if connection in connection_list:
+        if connection in connections:
             continue
 
         if connection[0] in output_ports and connection[1] in input_ports:
@@ -190,55 +340,59 @@ def JackPortConnectCallback(port_id_A, port_id_B, connect_yesno, arg=None):
 
     return 0
 
+def addPort(port):
+    ports = portsOfMode(port.mode)
+    if ports is None:
+        return
+
+    ports[port.name] = port
+    newPortsOfMode(port.mode).add(port.name)
+
 def portAdded(port_name, port_mode, port_type):
     port = JackPort()
     port.name = port_name
     port.mode = port_mode
     port.type = port_type
-    port.is_new = True
-
-    port_list.append(port)
+    addPort(port)
 
     connect_timer.start()
 
 def portRemoved(port_name, port_mode, port_type):
-    for i in range(len(port_list)):
-        port = port_list[i]
-        if (port.name == port_name
-                and port.mode == port_mode
-                and port.type == port_type):
-            break
-    else:
+    ports = portsOfMode(port_mode)
+    if ports is None:
         return
 
-    port_list.__delitem__(i)
+    port = ports.get(port_name)
+    if port is None or port.type != port_type:
+        return
+
+    del ports[port_name]
+    newPortsOfMode(port_mode).discard(port_name)
 
 def portRenamed(old_name, new_name, port_mode, port_type):
-    for port in port_list:
-        if (port.name == old_name
-                and port.mode == port_mode
-                and port.type == port_type):
-            port.name = new_name
-            port.is_new = True
-            connect_timer.start()
-            break
+    ports = portsOfMode(port_mode)
+    if ports is None:
+        return
 
-def connectionAdded(port_str_A, port_str_B):
-    connection_list.append((port_str_A, port_str_B))
+    port = ports.get(old_name)
+    if port is None or port.type != port_type:
+        return
 
-    if pending_connection:
-        makeMayConnections()
+    del ports[old_name]
+    newPortsOfMode(port_mode).discard(old_name)
+    port.name = new_name
+    addPort(port)
+    connect_timer.start()
+
+def connectionAdded(port_str_A, port_str_B):
+    connections.add((port_str_A, port_str_B))
+    connection_restorer.connection_made((port_str_A, port_str_B))
 
     if (port_str_A, port_str_B) not in saved_connections:
         dirty_checker.start()
 
 def connectionRemoved(port_str_A, port_str_B):
-    for i in range(len(connection_list)):
-        if (connection_list[i][0] == port_str_A
-                and connection_list[i][1] == port_str_B):
-            connection_list.__delitem__(i)
-            break
-
+    connections.discard((port_str_A, port_str_B))
     dirty_checker.start()
 
 def makeAllSavedConnections(port):
@@ -251,74 +405,54 @@ def connectAllInputs(port):
     if port.mode != PORT_MODE_OUTPUT:
         return
 
-    input_ports = []
-
-    for jack_port in port_list:
-        if jack_port.mode == PORT_MODE_INPUT:
-            input_ports.append(jack_port.name)
-
-    for connection in saved_connections:
-        if connection in connection_list:
+    for connection in list(saved_connections.from_output(port.name)):
+        if connection in connections:
             continue
 
-        if connection[0] == port.name and connection[1] in input_ports:
+        if connection[1] in input_ports:
             jacklib.connect(jack_client, port.name, connection[1])
 
 def connectAllOutputs(port):
     if port.mode != PORT_MODE_INPUT:
         return
 
-    output_ports = []
-
-    for jack_port in port_list:
-        if jack_port.mode == PORT_MODE_OUTPUT:
-            output_ports.append(jack_port.name)
-
-    for connection in saved_connections:
-        if connection in connection_list:
+    for connection in list(saved_connections.to_input(port.name)):
+        if connection in connections:
             continue
 
-        if connection[0] in output_ports and connection[1] == port.name:
+        if connection[0] in output_ports:
             jacklib.connect(jack_client, connection[0], port.name)
 
-def makeMayConnections():
-    output_ports = []
-    input_ports = []
-    new_output_ports = []
-    new_input_ports = []
+def connectionsToMake(port_name, port_mode):
+    ''' yields the saved connections of this port
+        which are not connected and whose other port exists '''
+    if port_mode == PORT_MODE_OUTPUT:
+        port_connections = saved_connections.from_output(port_name)
+        other_ports, other_index = input_ports, 1
+    else:
+        port_connections = saved_connections.to_input(port_name)
+        other_ports, other_index = output_ports, 0
 
-    for port in port_list:
-        if port.mode == PORT_MODE_OUTPUT:
-            output_ports.append(port.name)
-            if port.is_new:
-                new_output_ports.append(port.name)
+    for connection in port_connections:
+        if (connection not in connections
+                and connection[other_index] in other_ports):
+            yield connection
 
-        elif port.mode == PORT_MODE_INPUT:
-            input_ports.append(port.name)
-            if port.is_new:
-                new_input_ports.append(port.name)
+def makeMayConnections():
+    # all restorable connections are computed here,
+    # connection_restorer makes them in its thread.
+    connections_to_make = []
 
-    global pending_connection
-    one_connected = False
+    for port_mode, new_ports in ((PORT_MODE_OUTPUT, new_output_ports),
+                                 (PORT_MODE_INPUT, new_input_ports)):
+        for port_name in new_ports:
+            connections_to_make += connectionsToMake(port_name, port_mode)
 
-    for connection in saved_connections:
-        if (not connection in connection_list
-                and connection[0] in output_ports
-                and connection[1] in input_ports
-                and (connection[0] in new_output_ports
-                     or connection[1] in new_input_ports)):
-
-            if one_connected:
-                pending_connection = True
-                break
-
-            jacklib.connect(jack_client, connection[0], connection[1])
-            one_connected = True
-    else:
-        pending_connection = False
+    new_output_ports.clear()
+    new_input_ports.clear()
 
-        for port in port_list:
-            port.is_new = False
+    if connections_to_make:
+        connection_restorer.restore(connections_to_make)
 
 def c_char_p_p_to_list(c_char_p_p):
     i = 0
@@ -368,15 +502,15 @@ def openFile(project_path, session_name, full_client_id):
 
         while not node.isNull():
             el = node.toElement()
+            node = node.nextSibling()
+
             if el.tagName() != "connection":
                 continue
 
             port_from = el.attribute('from')
             port_to = el.attribute('to')
 
-            saved_connections.append((port_from, port_to))
-
-            node = node.nextSibling()
+            saved_connections.add((port_from, port_to))
 
         makeMayConnections()
 
@@ -389,23 +523,16 @@ def saveFile():
     if not file_path:
         return
 
-    for connection in connection_list:
-        if not connection in saved_connections:
-            saved_connections.append(connection)
-
-    delete_list = []
+    for connection in connections:
+        saved_connections.add(connection)
 
     # delete connection of the saved_connections
     # if its two ports are still presents and not connected
-    for i in range(len(saved_connections)):
-        if (portExists(saved_connections[i][0], PORT_MODE_OUTPUT)
-                and portExists(saved_connections[i][1], PORT_MODE_INPUT)):
-            if not saved_connections[i] in connection_list:
-                delete_list.append(i)
-
-    delete_list.reverse()
-    for i in delete_list:
-        saved_connections.__delitem__(i)
+    for connection in list(saved_connections):
+        if (portExists(connection[0], PORT_MODE_OUTPUT)
+                and portExists(connection[1], PORT_MODE_INPUT)
+                and connection not in connections):
+            saved_connections.remove(connection)
 
     try:
         file = open(file_path, 'w')
@@ -476,7 +603,8 @@ if __name__ == '__main__':
     NSMServer = nsm_client.NSMThread('ray-jackpatch', signaler,
                                      daemon_address, False)
     NSMServer.start()
-    NSMServer.announce('JACK Connections', ':dirty:switch:', 'ray-jackpatch')
+    NSMServer.announce('JACK Connections', ':dirty:switch:progress:',
+                       'ray-jackpatch')
 
     #connect signals
     signal.signal(signal.SIGINT, signalHandler)
@@ -508,9 +636,7 @@ if __name__ == '__main__':
         else:
             jack_port.type = PORT_TYPE_NULL
 
-        jack_port.is_new = True
-
-        port_list.append(jack_port)
+        addPort(jack_port)
 
         if jacklib.port_flags(portPtr) & jacklib.JackPortIsInput:
             continue
@@ -520,7 +646,7 @@ if __name__ == '__main__':
                                                                  portPtr))
 
         for portConName in portConnectionNames:
-            connection_list.append((portName, portConName))
+            connections.add((portName, portConName))
 
     app = QCoreApplication(sys.argv)
 
@@ -534,7 +660,16 @@ if __name__ == '__main__':
     connect_timer = ConnectTimer()
     dirty_checker = DirtyChecker()
 
+    connection_restorer = ConnectionRestorer()
+    connection_restorer.start()
+
     app.exec()
 
-    jacklib.deactivate(jack_client)
-    jacklib.client_close(jack_client)
+    connection_restorer.stop()
+    # the restorer thread may be in jacklib.connect with our client,
+    # it has to finish before the client is closed.
+    connection_restorer.join(ConnectionRestorer.STOP_TIMEOUT)
+
+    if not connection_restorer.is_alive():
+        jacklib.deactivate(jack_client)
+        jacklib.client_close(jack_client)
@@ -98,22 +98,23 @@ class CanvasSaver(ServerSender):
                               *gpos.spread())
 
     def send_all_group_positions(self, src_addr):
+        gpos_list = list(self.group_positions_session)
+        for gpos_cf in self.group_positions_config:
+            for gpos_ss in self.group_positions_session:
+                if (gpos_ss.port_types_view == gpos_cf.port_types_view
+                        and gpos_ss.group_name == gpos_cf.group_name):
+                    break
+            else:
+                gpos_list.append(gpos_cf)
+
         if ray.are_on_same_machine(self.get_server_url(), src_addr.url):
             # GUI is on the same machine than the daemon
             # send group positions via a tmp file because they can be many
             # it can be faster, it also prevents to lose packets
             canvas_dict = {'group_positions': [], 'portgroups': []}
-            for gpos in self.group_positions_session:
+            for gpos in gpos_list:
                 canvas_dict['group_positions'].append(gpos.to_dict())
 
-            for gpos_cf in self.group_positions_config:
-                for gpos_ss in self.group_positions_session:
-                    if (gpos_ss.port_types_view == gpos_cf.port_types_view
-                            and gpos_ss.group_name == gpos_cf.group_name):
-                        break
-                else:
-                    canvas_dict['group_positions'].append(gpos_cf.to_dict())
-
             for portgroup in self.portgroups:
                 canvas_dict['portgroups'].append(portgroup.to_dict())
 
@@ -125,38 +126,25 @@ class CanvasSaver(ServerSender):
                       file.name)
             return
 
-        i = 0
-
-        for gpos in self.group_positions_session:
-            self.send(src_addr, '/ray/gui/patchbay/update_group_position',
-                      *gpos.spread())
-            i += 1
-            if i == 50:
-                # we need to slow big process of canvas memory
-                # to prevent loss OSC packets
-                time.sleep(0.020)
-                i = 0
+        messages = []
+        for gpos in gpos_list:
+            messages.append(
+                ('/ray/gui/patchbay/update_group_position', *gpos.spread()))
 
-        for gpos_cf in self.group_positions_config:
-            for gpos_ss in self.group_positions_session:
-                if (gpos_ss.port_types_view == gpos_cf.port_types_view
-                        and gpos_ss.group_name == gpos_cf.group_name):
-                    break
-            else:
-                self.send(src_addr, '/ray/gui/patchbay/update_group_position',
-                          *gpos_cf.spread())
+        for portgroup in self.portgroups:
+            messages.append(
+                ('/ray/gui/patchbay/update_portgroup', *portgroup.spread()))
 
-                i += 1
-                if i == 50:
-                    time.sleep(0.020)
-                    i = 0
+        server = self.get_server()
+        if server is not None and server.send_bulk(src_addr, messages):
+            return
 
-        for portgroup in self.portgroups:
-            self.send(src_addr, '/ray/gui/patchbay/update_portgroup',
-                      *portgroup.spread())
+        for i, message in enumerate(messages):
+            self.send(src_addr, *message)
 
-            i += 1
-            if i == 50:
+            if i % 50 == 49:
+                # we need to slow big process of canvas memory
+                # to prevent loss OSC packets
                 time.sleep(0.020)
 
     def save_group_position(self, *args):
@@ -11,10 +11,10 @@ from PyQt5.QtXml import QDomDocument
 
 import ray
 from server_sender import ServerSender
-from daemon_tools  import (TemplateRoots, Terminal, RS,
-                           get_code_root, highlight_text)
+from daemon_tools  import TemplateRoots, Terminal, RS, highlight_text
 from signaler import Signaler
 from scripter import ClientScripter
+from desktop_file_index import DesktopFileIndex, localized_values
 
 NSM_API_VERSION_MAJOR = 1
 NSM_API_VERSION_MINOR = 0
@@ -58,6 +58,7 @@ class Client(ServerSender, ray.ClientData):
     tmp_arguments = ''
 
     auto_start = True
+    start_after = ''
     start_gui_hidden = False
     no_save_level = 0
     is_external = False
@@ -361,51 +362,26 @@ class Client(ServerSender, ray.ClientData):
         if self.session.wait_for == ray.WaitFor.REPLY:
             self.session.end_timer_if_last_expected(self)
 
-    def _set_infos_from_desktop_contents(self, contents: str):
-        lang = os.getenv('LANG')
-        lang_strs = ("[%s]" % lang[0:5], "[%s]" % lang[0:2], "")
-        all_data = {'Comment': ['', '', ''],
-                    'Name': ['', '', ''],
-                    'Icon': ['', '', '']}
+    def _set_infos_from_desktop_entry(self, entry: dict):
+        fields = entry['fields']
 
-        for line in contents.split('\n'):
-            if line.startswith('[') and line != "[Desktop Entry]":
+        for str_value in localized_values(fields, 'Comment'):
+            if str_value and not self.description:
+                self._desktop_description = str_value
+                self.description = str_value
                 break
 
-            if '=' not in line:
-                continue
-
-            var, egal, value = line.partition('=')
-            found = False
-
-            for searched in all_data:
-                for i in range(len(lang_strs)):
-                    lang_str = lang_strs[i]
-                    if var == searched + lang_str:
-                        all_data[searched][i] = value
-                        found = True
-                        break
-
-                if found:
-                    break
+        for str_value in localized_values(fields, 'Name'):
+            if str_value and not self.label:
+                self._desktop_label = str_value
+                self.label = str_value
+                break
 
-        for data in all_data:
-            for str_value in all_data[data]:
-                if data == "Comment":
-                    if str_value and not self.description:
-                        self._desktop_description = str_value
-                        self.description = str_value
-                        break
-                elif data == "Name":
-                    if str_value and not self.label:
-                        self._desktop_label = str_value
-                        self.label = str_value
-                        break
-                elif data == "Icon":
-                    if str_value and not self.icon:
-                        self._desktop_icon = str_value
-                        self.icon = str_value
-                        break
+        for str_value in localized_values(fields, 'Icon'):
+            if str_value and not self.icon:
+                self._desktop_icon = str_value
+                self.icon = str_value
+                break
 
     def _rename_files(
             self, spath, old_session_name, new_session_name,
@@ -831,6 +807,7 @@ class Client(ServerSender, ray.ClientData):
         self.description = ctx.attribute('description')
         self.icon = ctx.attribute('icon')
         self.auto_start = bool(ctx.attribute('launched') != '0')
+        self.start_after = ctx.attribute('start_after')
         self.check_last_save = bool(ctx.attribute('check_last_save') != '0')
         self.start_gui_hidden = bool(ctx.attribute('gui_visible') == '0')
         self.template_origin = ctx.attribute('template_origin')
@@ -965,6 +942,8 @@ class Client(ServerSender, ray.ClientData):
             ctx.setAttribute('icon', self.icon)
         if not self.check_last_save:
             ctx.setAttribute('check_last_save', 0)
+        if self.start_after:
+            ctx.setAttribute('start_after', self.start_after)
 
         if self.prefix_mode != ray.PrefixMode.SESSION_NAME:
             ctx.setAttribute('prefix_mode', self.prefix_mode)
@@ -1605,6 +1584,7 @@ class Client(ServerSender, ray.ClientData):
         self.description = new_client.description
         self.icon = new_client.icon
         self.auto_start = new_client.auto_start
+        self.start_after = new_client.start_after
         self.check_last_save = new_client.check_last_save
         self.ignored_extensions = new_client.ignored_extensions
         self.custom_data = new_client.custom_data
@@ -1723,6 +1703,8 @@ class Client(ServerSender, ray.ClientData):
                     self.check_last_save = bool(int(value))
             elif prop == 'ignored_extensions':
                 self.ignored_extensions = value
+            elif prop == 'start_after':
+                self.start_after = value
             elif prop == 'protocol':
                 # do not change protocol value
                 continue
@@ -1774,7 +1756,8 @@ desktop_file:%s
 label:%s
 icon:%s
 check_last_save:%i
-ignored_extensions:%s""" % (self.client_id,
+ignored_extensions:%s
+start_after:%s""" % (self.client_id,
                             ray.protocol_to_str(self.protocol),
                             self.executable_path,
                             self.pre_env,
@@ -1788,7 +1771,8 @@ ignored_extensions:%s""" % (self.client_id,
                             self.label,
                             self.icon,
                             int(self.check_last_save),
-                            self.ignored_extensions)
+                            self.ignored_extensions,
+                            self.start_after)
 
         if self.protocol == ray.Protocol.NSM:
             message += "\ncapabilities:%s" % self.capabilities
@@ -1857,94 +1841,33 @@ net_session_template:%s""" % (self.ray_net.daemon_url,
         if self.icon and self.description and self.label:
             return
 
-        desk_path_list = (
-            '%s/data' % get_code_root(),
-            '%s/.local' % os.getenv('HOME'),
-            '/usr/local',
-            '/usr')
-
         desktop_file = self.desktop_file
         if desktop_file == '//not_found':
             return
 
+        desktop_index = DesktopFileIndex.get_instance()
+        if desktop_index is None:
+            return
+
+        desktop_index.refresh()
+
         if not desktop_file:
             desktop_file = os.path.basename(self.executable_path)
 
         if not desktop_file.endswith('.desktop'):
             desktop_file += ".desktop"
 
-        for desk_path in desk_path_list:
-            org_prefixs = ('', 'org.gnome.', 'org.kde.')
-            desk_file = ''
-
-            for org_prefix in org_prefixs:
-                desk_file = "%s/share/applications/%s%s" % (
-                    desk_path, org_prefix, desktop_file)
-
-                if os.path.isfile(desk_file):
-                    break
-            else:
-                continue
-
-            try:
-                file = open(desk_file, 'r')
-                contents = file.read()
-            except:
-                continue
-
-            self._set_infos_from_desktop_contents(contents)
-            break
-
-        else:
-            desk_file_found = False
-            for desk_path in desk_path_list:
-                full_desk_path = "%s/share/applications" % desk_path
-                if not os.path.isdir(full_desk_path):
-                    # applications folder doesn't exists
-                    continue
-
-                if not os.access(full_desk_path, os.R_OK):
-                    # no permission to read this applications folder
-                    continue
-
-                for desk_file in os.listdir(full_desk_path):
-                    if not desk_file.endswith('.desktop'):
-                        continue
-
-                    full_desk_file = "%s/share/applications/%s" \
-                                        % (desk_path, desk_file)
-
-                    if os.path.isdir(full_desk_file):
-                        continue
-
-                    try:
-                        file = open(full_desk_file, 'r')
-                        contents = file.read()
-                    except:
-                        continue
+        entry = desktop_index.get_entry_from_file(desktop_file)
+        if entry is None:
+            entry = desktop_index.get_entry_from_executable(
+                self.executable_path)
+            if entry is None:
+                self.desktop_file = '//not_found'
+                return
 
-                    for line in contents.split('\n'):
-                        if line.startswith('Exec='):
-                            value = line.partition('=')[2]
-                            if (value == self.executable_path
-                                    or value.startswith(
-                                        "%s " % self.executable_path)
-                                    or value.endswith(
-                                        " %s" % self.executable_path)
-                                    or " %s " in value):
-                            #if self.executable_path in value:
-                                desk_file_found = True
-
-                                self.desktop_file = desk_file
-                                self._set_infos_from_desktop_contents(contents)
-                                break
+            self.desktop_file = entry['desktop_file']
 
-                    if desk_file_found:
-                        break
-                if desk_file_found:
-                    break
-            else:
-                self.desktop_file = '//not_found'
+        self._set_infos_from_desktop_entry(entry)
 
     def save_as_template(self, template_name, src_addr=None, src_path=''):
         if src_addr:
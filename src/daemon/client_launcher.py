@@ -0,0 +1,168 @@
+import time
+from PyQt5.QtCore import QTimer
+
+import ray
+
+from daemon_tools import RS, basename
+
+
+class ClientLauncher:
+    ''' Starts clients in parallel, at most max_parallel clients
+        can be launching in the same time (0 means no limit).
+        A client can wait for other clients (by client_id or executable
+        name) to be ready before to start, this is the client 'start_after'
+        attribute. A dependency blocks a client at most
+        dependency_timeout seconds, and dependency cycles are broken
+        when clients are queued. '''
+
+    def __init__(self, session):
+        self.session = session
+
+        self.max_parallel = RS.settings.value(
+            'daemon/max_parallel_launch', 8, type=int)
+        self.dependency_timeout = RS.settings.value(
+            'daemon/launch_dependency_timeout', 10.0, type=float)
+
+        self._to_launch = []
+        # dict client -> time at queue
+        self._queued_at = {}
+        # clients launched without waiting their dependencies
+        # because they are part of a dependency cycle
+        self._cycle_breakers = set()
+        # dict client -> time at start
+        self._launching = {}
+
+        self._timer = QTimer()
+        self._timer.setInterval(20)
+        self._timer.timeout.connect(self._timer_timeout)
+
+    def _is_ready(self, client, started_at: float, now: float) -> bool:
+        if now - started_at > self.dependency_timeout:
+            return True
+
+        if client.did_announce:
+            return True
+
+        if client.status in (ray.ClientStatus.READY, ray.ClientStatus.STOPPED,
+                             ray.ClientStatus.ERROR, ray.ClientStatus.REMOVED):
+            return True
+
+        if client.is_ray_hack():
+            # without config file, a ray-hack client is ready once launched
+            return bool(client.status == ray.ClientStatus.LAUNCH
+                        and not client.ray_hack.config_file)
+
+        # dumb clients will never announce
+        return bool(client.is_running()
+                    and client.executable_path in RS.non_active_clients)
+
+    def _matches(self, client, dependency: str) -> bool:
+        return bool(dependency in (client.client_id,
+                                   basename(client.executable_path)))
+
+    def _queued_dependencies(self, client) -> list:
+        return [other for other in self._to_launch
+                if other is not client
+                and any(self._matches(other, dependency)
+                        for dependency in client.start_after.split())]
+
+    def _break_cycles(self):
+        # depth first search on queued clients,
+        # a client depending on a client in the current path closes a cycle,
+        # this client will be launched without waiting its dependencies.
+        done = set()
+        path = []
+
+        def visit(client):
+            if client in self._cycle_breakers:
+                # its dependencies are already ignored
+                done.add(client)
+                return
+
+            path.append(client)
+            for other in self._queued_dependencies(client):
+                if other in path:
+                    self._cycle_breakers.add(client)
+                    break
+                if other not in done:
+                    visit(other)
+            path.pop()
+            done.add(client)
+
+        for client in self._to_launch:
+            if client not in done and client not in self._cycle_breakers:
+                visit(client)
+
+    def _dependencies_ready(self, client, now: float) -> bool:
+        if client in self._cycle_breakers:
+            return True
+
+        if now - self._queued_at.get(client, now) > self.dependency_timeout:
+            return True
+
+        for dependency in client.start_after.split():
+            for other in self._to_launch:
+                if other is not client and self._matches(other, dependency):
+                    return False
+
+            for other in self._launching:
+                if self._matches(other, dependency):
+                    return False
+        return True
+
+    def _timer_timeout(self):
+        now = time.time()
+
+        for client, started_at in list(self._launching.items()):
+            if self._is_ready(client, started_at, now):
+                self._launching.pop(client)
+
+        for client in self._to_launch.copy():
+            if (self.max_parallel
+                    and len(self._launching) >= self.max_parallel):
+                break
+
+            if not self._dependencies_ready(client, now):
+                continue
+
+            self._unqueue(client)
+            self._launching[client] = now
+            client.start()
+
+        if not self._to_launch:
+            self._timer.stop()
+            self._launching.clear()
+
+    def _unqueue(self, client):
+        self._to_launch.remove(client)
+        self._queued_at.pop(client, None)
+        self._cycle_breakers.discard(client)
+
+    def launch(self, clients: list):
+        now = time.time()
+        for client in clients:
+            if client not in self._to_launch:
+                self._to_launch.append(client)
+                self._queued_at[client] = now
+
+        self._break_cycles()
+
+        if self._to_launch and not self._timer.isActive():
+            self._timer.start()
+            self._timer_timeout()
+
+    def stop(self, clients: list):
+        ''' stop clients in parallel, dependencies are not checked '''
+        for client in clients:
+            if client in self._to_launch:
+                self._unqueue(client)
+
+        for client in clients:
+            client.stop()
+
+    def clear(self):
+        self._to_launch.clear()
+        self._queued_at.clear()
+        self._cycle_breakers.clear()
+        self._launching.clear()
+        self._timer.stop()
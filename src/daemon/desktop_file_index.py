@@ -0,0 +1,267 @@
+import json
+import os
+import xdg.BaseDirectory
+
+from daemon_tools import get_code_root, dirname
+
+instance = None
+
+# keys of the [Desktop Entry] section kept in the index
+KEPT_KEYS = ('Name', 'Comment', 'Icon')
+
+
+def localized_values(fields: dict, key: str) -> list:
+    ''' returns the values of key in fields, from the most to
+        the less specific language ([ll_CC], [ll], default) '''
+    lang = os.getenv('LANG', '')
+    return [fields.get(key + lang_str, '')
+            for lang_str in ("[%s]" % lang[0:5], "[%s]" % lang[0:2], "")]
+
+
+class DesktopFileIndex:
+    ''' Index of the .desktop files found in the applications dirs
+        (RaySession data, ~/.local, /usr/local and /usr).
+        For each directory, its modification time and its parsed
+        .desktop files are kept (also saved in cache file),
+        only the directories whose modification time changed are read again.
+        An entry is a dict with keys
+        'desktop_file', 'executable', 'executables' (first and last command
+        of Exec, for wrappers as 'pw-jack carla'), 'nsm_capable' (None if
+        the file doesn't mention X-NSM-Capable) and 'fields' (Name, Comment
+        and Icon values, localized or not). '''
+
+    def __init__(self):
+        global instance
+        instance = self
+
+        # dir path -> {'modified': mtime_ns,
+        #              'subdirs': list, 'entries': list}
+        self._dirs = {}
+
+        self._by_file = {}
+        self._by_executable = {}
+        self._template_entries = []
+
+        self._cache_path = \
+            xdg.BaseDirectory.xdg_cache_home + "/RaySession/desktop_files.json"
+        self._load_cache_file()
+
+        self._roots = ['%s/share/applications' % desk_path
+                       for desk_path in (
+                           '%s/data' % get_code_root(),
+                           '%s/.local' % os.getenv('HOME'),
+                           '/usr/local',
+                           '/usr')]
+
+        self._up_to_date = False
+
+    @staticmethod
+    def get_instance():
+        return instance
+
+    def _load_cache_file(self):
+        if not os.path.isfile(self._cache_path):
+            return
+
+        try:
+            with open(self._cache_path, 'r') as file:
+                dirs = json.load(file)
+        except:
+            # cache file load failed and this is really not strong
+            return
+
+        if not isinstance(dirs, dict):
+            return
+
+        for dir_cache in dirs.values():
+            for entry in dir_cache.get('entries', ()):
+                if 'executables' not in entry:
+                    # cache written by an older version
+                    return
+
+        self._dirs = dirs
+
+    def save_cache_file(self):
+        cache_dir = dirname(self._cache_path)
+        if not os.path.exists(cache_dir):
+            try:
+                os.makedirs(cache_dir)
+            except:
+                # can't save cache file, this is really not strong
+                return
+
+        try:
+            with open(self._cache_path, 'w') as file:
+                json.dump(self._dirs, file)
+        except:
+            # cache file save failed, not strong
+            pass
+
+    @staticmethod
+    def _parse_desktop_file(full_desk_file: str):
+        try:
+            with open(full_desk_file, 'r') as file:
+                contents = file.read()
+        except:
+            return None
+
+        entry = {'desktop_file': os.path.basename(full_desk_file),
+                 'executable': '',
+                 'executables': [],
+                 'nsm_capable': None,
+                 'fields': {}}
+
+        in_entry_section = False
+
+        for line in contents.splitlines():
+            if line.startswith('['):
+                if in_entry_section:
+                    break
+                in_entry_section = bool(line == '[Desktop Entry]')
+                continue
+
+            if not in_entry_section or '=' not in line:
+                continue
+
+            var, egal, value = line.partition('=')
+
+            if var == 'Exec':
+                entry['executable'] = value.strip().partition(' ')[0]
+
+                # ignore field codes (%f, %U...) and env variables
+                commands = [word.strip('"') for word in value.split()
+                            if not word.startswith('%') and '=' not in word]
+                if commands:
+                    entry['executables'] = list(
+                        dict.fromkeys((commands[0], commands[-1])))
+            elif var.lower() == 'x-nsm-capable':
+                entry['nsm_capable'] = bool(value.strip().lower() == 'true')
+            elif var.partition('[')[0] in KEPT_KEYS:
+                entry['fields'][var] = value.strip()
+
+        return entry
+
+    def _update_dir(self, full_path: str, changed: list):
+        try:
+            modified = os.stat(full_path).st_mtime_ns
+        except OSError:
+            if self._dirs.pop(full_path, None) is not None:
+                changed.append(full_path)
+            return
+
+        dir_cache = self._dirs.get(full_path)
+
+        if dir_cache is None or dir_cache['modified'] != modified:
+            subdirs = []
+            entries = []
+
+            try:
+                file_names = sorted(os.listdir(full_path))
+            except OSError:
+                file_names = []
+
+            for file_name in file_names:
+                full_file = os.path.join(full_path, file_name)
+
+                if os.path.isdir(full_file):
+                    # symlinks to dirs are not followed, they may loop
+                    if not os.path.islink(full_file):
+                        subdirs.append(file_name)
+                    continue
+
+                if not file_name.endswith('.desktop'):
+                    continue
+
+                entry = self._parse_desktop_file(full_file)
+                if entry is not None:
+                    entries.append(entry)
+
+            dir_cache = {'modified': modified,
+                         'subdirs': subdirs,
+                         'entries': entries}
+            self._dirs[full_path] = dir_cache
+            changed.append(full_path)
+
+        for subdir in dir_cache['subdirs']:
+            self._update_dir(os.path.join(full_path, subdir), changed)
+
+    def _walk(self, full_path: str):
+        dir_cache = self._dirs.get(full_path)
+        if dir_cache is None:
+            return
+
+        yield from dir_cache['entries']
+
+        for subdir in dir_cache['subdirs']:
+            yield from self._walk(os.path.join(full_path, subdir))
+
+    def refresh(self):
+        ''' read again the directories changed since last refresh,
+            only stats directories if nothing changed '''
+        changed = []
+
+        for root in self._roots:
+            if os.path.isdir(root) and os.access(root, os.R_OK):
+                self._update_dir(root, changed)
+            elif self._dirs.pop(root, None) is not None:
+                changed.append(root)
+
+        if self._up_to_date and not changed:
+            return
+
+        # forget removed directories
+        known_dirs = set()
+        for root in self._roots:
+            stack = [root]
+            while stack:
+                dir_path = stack.pop()
+                dir_cache = self._dirs.get(dir_path)
+                if dir_cache is None:
+                    continue
+                known_dirs.add(dir_path)
+                stack += [os.path.join(dir_path, subdir)
+                          for subdir in dir_cache['subdirs']]
+
+        for dir_path in [d for d in self._dirs if d not in known_dirs]:
+            self._dirs.pop(dir_path)
+
+        # first found wins, in roots order
+        self._by_file.clear()
+        self._by_executable.clear()
+        self._template_entries.clear()
+        template_files = set()
+
+        for root in self._roots:
+            for entry in self._walk(root):
+                desktop_file = entry['desktop_file']
+
+                if desktop_file not in self._by_file:
+                    self._by_file[desktop_file] = entry
+
+                for executable in entry['executables']:
+                    # Exec may contain the full path of the executable
+                    for exec_key in (executable, os.path.basename(executable)):
+                        if exec_key not in self._by_executable:
+                            self._by_executable[exec_key] = entry
+
+                # RaySession desktop files don't provide templates
+                if (root != self._roots[0]
+                        and desktop_file not in template_files):
+                    template_files.add(desktop_file)
+                    self._template_entries.append(entry)
+
+        self._up_to_date = True
+
+    def get_entry_from_file(self, desktop_file: str):
+        for org_prefix in ('', 'org.gnome.', 'org.kde.'):
+            entry = self._by_file.get(org_prefix + desktop_file)
+            if entry is not None:
+                return entry
+
+    def get_entry_from_executable(self, executable: str):
+        return self._by_executable.get(executable)
+
+    def template_entries(self) -> list:
+        ''' entries (one per desktop file name) which may provide
+            a client template (not from RaySession data) '''
+        return self._template_entries
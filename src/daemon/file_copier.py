@@ -1,18 +1,285 @@
+import errno
+import fcntl
 import os
 import shutil
-import subprocess
-import warnings
+import stat
+import sys
+import threading
 
-from PyQt5.QtCore import QProcess, QTimer
+from PyQt5.QtCore import QTimer, QCoreApplication
 from osc_server_thread import OscServerThread
 from server_sender import ServerSender
+from daemon_tools import RS
 import ray
 
+_translate = QCoreApplication.translate
+
+# size of each read/write while copying a file
+COPY_CHUNK_SIZE = 8 * 1024**2
+
+# ioctl to share file data extents (btrfs, XFS...), from linux/fs.h
+FICLONE = 0x40049409
+
+
+class CopyMode:
+    # reflink if possible, else copy
+    AUTO = 'auto'
+    # reflink or fail, as 'cp --reflink=always'
+    REFLINK = 'reflink'
+    COPY = 'copy'
+
+
 class CopyFile:
     orig_path = ""
     dest_path = ""
     state = 0
     size = 0
+    copied = 0
+
+
+class CopyAborted(Exception):
+    pass
+
+
+class _CopyThread(threading.Thread):
+    ''' Copies all CopyFile entries outside of the main thread.
+        Entries sizes are computed first, then entries are copied by
+        'n_jobs' workers. Main thread only reads progress values. '''
+
+    def __init__(self, copy_files: list, n_jobs: int,
+                 copy_mode=CopyMode.AUTO, hardlink_exts=()):
+        threading.Thread.__init__(self, daemon=True)
+        self.copy_files = copy_files
+        self.n_jobs = max(1, n_jobs)
+
+        # reflink is tried until it fails once
+        self.reflink_supported = bool(copy_mode != CopyMode.COPY)
+        self.reflink_only = bool(copy_mode == CopyMode.REFLINK)
+        # file which can't be reflinked in reflink only mode
+        self.reflink_failed_path = ''
+        self.hardlink_exts = tuple(hardlink_exts)
+        self.n_reflinked = 0
+        self.n_hardlinked = 0
+        self.n_copied = 0
+        self.abort_event = threading.Event()
+        self.sizes_known = False
+        self.removal_errors = []
+
+        self._lock = threading.Lock()
+        self._to_copy = []
+
+    @staticmethod
+    def _nice():
+        # copy should not disturb running audio programs
+        try:
+            os.setpriority(os.PRIO_PROCESS, threading.get_native_id(), 15)
+        except BaseException:
+            pass
+
+    @staticmethod
+    def _get_size(path: str) -> int:
+        try:
+            st = os.lstat(path)
+        except OSError:
+            return 0
+
+        if not stat.S_ISDIR(st.st_mode):
+            return st.st_size if stat.S_ISREG(st.st_mode) else 0
+
+        total = 0
+        for root, dirs, files in os.walk(path):
+            for file_name in files:
+                try:
+                    st = os.lstat(os.path.join(root, file_name))
+                except OSError:
+                    continue
+
+                if stat.S_ISREG(st.st_mode):
+                    total += st.st_size
+        return total
+
+    def _try_hardlink(self, copy_file: CopyFile,
+                      src_path: str, dest_path: str)->bool:
+        if not (self.hardlink_exts
+                and src_path.lower().endswith(self.hardlink_exts)):
+            return False
+
+        try:
+            os.link(src_path, dest_path)
+        except OSError:
+            # probably not the same filesystem
+            return False
+
+        copy_file.copied += os.path.getsize(src_path)
+        with self._lock:
+            self.n_hardlinked += 1
+        return True
+
+    def _try_reflink(self, copy_file: CopyFile, src_fd: int,
+                     dest_fd: int, src_path: str)->bool:
+        if not self.reflink_supported:
+            return False
+
+        try:
+            fcntl.ioctl(dest_fd, FICLONE, src_fd)
+        except OSError as e:
+            if e.errno in (errno.EOPNOTSUPP, errno.ENOTTY, errno.EXDEV,
+                           errno.EINVAL, errno.ENOSYS):
+                # filesystem can't do it, don't try again
+                self.reflink_supported = False
+            return False
+
+        copy_file.copied += os.path.getsize(src_path)
+        with self._lock:
+            self.n_reflinked += 1
+        return True
+
+    def _copy_file_contents(self, copy_file: CopyFile,
+                            src_path: str, dest_path: str):
+        if self._try_hardlink(copy_file, src_path, dest_path):
+            return
+
+        with open(src_path, 'rb') as src, open(dest_path, 'wb') as dest:
+            src_fd = src.fileno()
+            dest_fd = dest.fileno()
+
+            if self._try_reflink(copy_file, src_fd, dest_fd, src_path):
+                shutil.copymode(src_path, dest_path)
+                return
+
+            if self.reflink_only:
+                # abort all the copy, copied files will be removed
+                with self._lock:
+                    if not self.reflink_failed_path:
+                        self.reflink_failed_path = src_path
+                self.abort_event.set()
+                raise CopyAborted
+
+            with self._lock:
+                self.n_copied += 1
+
+            use_copy_range = hasattr(os, 'copy_file_range')
+            use_sendfile = True
+
+            while True:
+                if self.abort_event.is_set():
+                    raise CopyAborted
+
+                n_bytes = 0
+
+                if use_copy_range:
+                    try:
+                        n_bytes = os.copy_file_range(
+                            src_fd, dest_fd, COPY_CHUNK_SIZE)
+                    except OSError:
+                        # not supported here (cross device, old kernel...)
+                        use_copy_range = False
+                        continue
+                elif use_sendfile:
+                    try:
+                        n_bytes = os.sendfile(
+                            dest_fd, src_fd, None, COPY_CHUNK_SIZE)
+                    except OSError:
+                        use_sendfile = False
+                        continue
+                else:
+                    data = src.read(COPY_CHUNK_SIZE)
+                    n_bytes = len(data)
+                    if n_bytes:
+                        dest.write(data)
+
+                if not n_bytes:
+                    break
+
+                copy_file.copied += n_bytes
+
+        shutil.copymode(src_path, dest_path)
+
+    def _copy_path(self, copy_file: CopyFile, src_path: str, dest_path: str):
+        if self.abort_event.is_set():
+            raise CopyAborted
+
+        try:
+            if os.path.islink(src_path):
+                # as 'cp -R', do not follow symlinks
+                os.symlink(os.readlink(src_path), dest_path)
+
+            elif os.path.isdir(src_path):
+                if not os.path.isdir(dest_path):
+                    os.mkdir(dest_path)
+                    shutil.copymode(src_path, dest_path)
+
+                for entry_name in os.listdir(src_path):
+                    self._copy_path(copy_file,
+                                    os.path.join(src_path, entry_name),
+                                    os.path.join(dest_path, entry_name))
+
+            elif os.path.isfile(src_path):
+                self._copy_file_contents(copy_file, src_path, dest_path)
+
+        except OSError as e:
+            sys.stderr.write('unable to copy %s: %s\n' % (src_path, str(e)))
+
+    def _worker(self):
+        self._nice()
+
+        while True:
+            with self._lock:
+                if not self._to_copy or self.abort_event.is_set():
+                    return
+                copy_file = self._to_copy.pop(0)
+                copy_file.state = 1
+
+            try:
+                self._copy_path(copy_file, copy_file.orig_path,
+                                copy_file.dest_path)
+            except CopyAborted:
+                return
+
+            copy_file.state = 2
+
+    def _remove_copied(self):
+        for copy_file in self.copy_files:
+            if copy_file.state == 0:
+                continue
+
+            file_to_remove = copy_file.dest_path
+
+            if not os.path.lexists(file_to_remove):
+                continue
+
+            try:
+                if (os.path.isdir(file_to_remove)
+                        and not os.path.islink(file_to_remove)):
+                    shutil.rmtree(file_to_remove)
+                else:
+                    os.remove(file_to_remove)
+            except BaseException:
+                self.removal_errors.append(file_to_remove)
+
+    def run(self):
+        self._nice()
+
+        for copy_file in self.copy_files:
+            if self.abort_event.is_set():
+                break
+            copy_file.size = self._get_size(copy_file.orig_path)
+
+        self.sizes_known = True
+        self._to_copy = self.copy_files.copy()
+
+        workers = [threading.Thread(target=self._worker, daemon=True)
+                   for i in range(min(self.n_jobs, len(self.copy_files)))]
+
+        for worker in workers:
+            worker.start()
+
+        for worker in workers:
+            worker.join()
+
+        if self.abort_event.is_set():
+            self._remove_copied()
+
 
 class FileCopier(ServerSender):
     def __init__(self, session):
@@ -24,56 +291,26 @@ class FileCopier(ServerSender):
         self._abort_function = None
         self._next_args = []
         self._copy_files = []
-        self._copy_size = 0
         self._aborted = False
         self._is_active = False
-
-        self._process = QProcess()
-        self._process.finished.connect(self._process_finished)
-        if ray.QT_VERSION >= (5, 6):
-            self._process.errorOccurred.connect(self._error_occurred)
+        self._thread = None
 
         self._timer = QTimer()
         self._timer.setInterval(250)
-        self._timer.setSingleShot(True)
-        self._timer.timeout.connect(self._check_progress_size)
+        self._timer.timeout.connect(self._check_progress)
 
         self._abort_src_addr = None
         self._abort_src_path = ''
 
-    def _get_file_size(self, filepath):
-        if not os.path.exists(filepath):
-            return 0
-
-        try:
-            du_full = subprocess.check_output(
-                ['nice', '-n', '15', 'du', '-sb', filepath]).decode()
-        except:
-            warnings.warn('unable to decode size of file %s' % filepath)
-            du_full = ""
-
-        if not du_full:
-            return 0
-
-        du_str = du_full.split('\t')[0]
-        if not du_str.isdigit():
-            return 0
-
-        return int(du_str)
-
-    def _check_progress_size(self):
-        current_size = 0
-        self._timer.stop()
+    def _send_progress(self):
+        if self._thread is None or not self._thread.sizes_known:
+            return
 
-        for copy_file in self._copy_files:
-            if copy_file.state == 2:
-                current_size += copy_file.size
-            elif copy_file.state == 1:
-                current_size += self._get_file_size(copy_file.dest_path)
-                break
+        copy_size = sum([cf.size for cf in self._copy_files])
+        current_size = sum([cf.copied for cf in self._copy_files])
 
-        if current_size and self._copy_size:
-            progress = float(current_size/self._copy_size)
+        if current_size and copy_size:
+            progress = min(float(current_size/copy_size), 1.0)
 
             if self._client_id:
                 self.send_gui('/ray/gui/client/progress',
@@ -86,71 +323,77 @@ class FileCopier(ServerSender):
 
             self.session.osc_reply('/ray/net_daemon/duplicate_state', progress)
 
-        self._timer.start()
+    def _check_progress(self):
+        if self._thread is None:
+            self._timer.stop()
+            return
+
+        if self._thread.is_alive():
+            self._send_progress()
+            return
 
-    def _process_finished(self, exit_code, exit_status):
         self._timer.stop()
+        self._copy_finished()
 
-        for copy_file in self._copy_files:
-            if copy_file.state == 1:
-                copy_file.state = 2
-                break
+    def _copy_finished(self):
+        thread = self._thread
+        self._thread = None
+        self._is_active = False
+
+        if thread.reflink_failed_path and not self._aborted:
+            self.session.send_gui_message(
+                _translate('GUIMSG', 'copy aborted: unable to reflink %s')
+                % thread.reflink_failed_path)
+            self._aborted = True
 
         if self._aborted:
-            ##remove all created files
-            for copy_file in self._copy_files:
-                if copy_file.state > 0:
-                    file_to_remove = copy_file.dest_path
-
-                    if os.path.exists(file_to_remove):
-                        try:
-                            if os.path.isfile(file_to_remove):
-                                os.remove(file_to_remove)
-                            elif os.path.isdir(file_to_remove):
-                                shutil.rmtree(file_to_remove)
-                        except:
-                            if self._abort_src_addr and self._abort_src_path:
-                                self.send(self._abort_src_addr,
-                                          '/error_minor',
-                                          self._abort_src_path,
-                                          ray.Err.SUBPROCESS_CRASH,
-                                          "%s hasn't been removed !")
-
-            self._is_active = False
-            self._send_copy_state_to_gui(0)
-            self._abort_function(*self._next_args)
-            return
+            for file_path in thread.removal_errors:
+                if self._abort_src_addr and self._abort_src_path:
+                    self.send(self._abort_src_addr,
+                              '/error_minor',
+                              self._abort_src_path,
+                              ray.Err.SUBPROCESS_CRASH,
+                              "%s hasn't been removed !" % file_path)
 
-        # run next_function if copy is terminated
-        for copy_file in self._copy_files:
-            if copy_file.state != 2:
-                break
-        else:
-            self._is_active = False
             self._send_copy_state_to_gui(0)
-
-            if self._next_function:
-                self._next_function(*self._next_args)
-
+            self._abort_function(*self._next_args)
             return
 
-        self._next_process()
+        self._send_copy_state_to_gui(0)
+        self._send_copy_mode_message(thread)
 
-    def _error_occurred(self):
-        #todo make something else
-        self._process_finished(0, 0)
+        if self._next_function:
+            self._next_function(*self._next_args)
 
-    def _next_process(self):
+    def _send_copy_mode_message(self, thread: _CopyThread):
+        modes = []
+        if thread.n_reflinked:
+            modes.append(_translate('GUIMSG', '%i files reflinked')
+                         % thread.n_reflinked)
+        if thread.n_hardlinked:
+            modes.append(_translate('GUIMSG', '%i files hardlinked')
+                         % thread.n_hardlinked)
+        if thread.n_copied:
+            modes.append(_translate('GUIMSG', '%i files copied')
+                         % thread.n_copied)
+
+        if modes:
+            self.session.send_gui_message(
+                _translate('GUIMSG', 'copy done: %s') % ', '.join(modes))
+
+    def _start_thread(self):
         self._is_active = True
 
-        for copy_file in self._copy_files:
-            if copy_file.state == 0:
-                copy_file.state = 1
-                self._process.start('nice',
-                                   ['-n', '+15', 'cp', '-R',
-                                    copy_file.orig_path, copy_file.dest_path])
-                break
+        n_jobs = RS.settings.value('daemon/parallel_copy_jobs', 1, type=int)
+        copy_mode = RS.settings.value(
+            'daemon/copy_mode', CopyMode.AUTO, type=str)
+        hardlink_exts = ['.%s' % ext.lower().lstrip('.') for ext in
+                         RS.settings.value(
+                             'daemon/hardlink_extensions', '', type=str).split()]
 
+        self._thread = _CopyThread(self._copy_files, n_jobs,
+                                   copy_mode, hardlink_exts)
+        self._thread.start()
         self._timer.start()
 
     def _start(self, src_list, dest_dir, next_function,
@@ -160,8 +403,7 @@ class FileCopier(ServerSender):
         self._next_args = next_args
 
         self._aborted = False
-        self._copy_size = 0
-        self._copy_files.clear()
+        self._copy_files = []
 
         dest_path_exists = bool(os.path.exists(dest_dir))
         if dest_path_exists:
@@ -198,13 +440,12 @@ class FileCopier(ServerSender):
                     self._abort_function(*self._next_args)
                     return
 
+                dest_path_exists = True
+
         for orig_path in src_list:
             copy_file = CopyFile()
             copy_file.state = 0
             copy_file.orig_path = orig_path
-            copy_file.size = self._get_file_size(orig_path)
-
-            self._copy_size += copy_file.size
 
             if dest_path_exists:
                 copy_file.dest_path = "%s/%s" % (dest_dir,
@@ -217,7 +458,7 @@ class FileCopier(ServerSender):
 
         if self._copy_files:
             self._send_copy_state_to_gui(1)
-            self._next_process()
+            self._start_thread()
         else:
             self._next_function(*self._next_args)
 
@@ -245,11 +486,9 @@ class FileCopier(ServerSender):
             self._abort_function = abort_function
             self._next_args = next_args
 
-        self._timer.stop()
-
-        if self._process.state() == QProcess.Running:
+        if self._thread is not None and self._thread.is_alive():
             self._aborted = True
-            self._process.terminate()
+            self._thread.abort_event.set()
 
     def is_active(self, client_id=''):
         if client_id and client_id != self._client_id:
@@ -0,0 +1,169 @@
+import os
+import threading
+from PyQt5.QtCore import QTimer
+
+
+# sizes returned instead of a real size
+SIZE_UNKNOWN = -1
+SIZE_UNREADABLE = -2
+
+
+class _CalculationAborted(Exception):
+    pass
+
+
+class FolderSizeCalculator:
+    ''' Calculates folder sizes in a thread.
+        For each directory, its modification time, the size of its files
+        and its subdirectories are kept in a tree (also saved in cache file),
+        used to give immediately an estimated size.
+        A file can grow without changing its directory modification time,
+        so the real calculation always stats all files again.
+        Symlinks are not counted.
+        Only the last requested calculation is kept,
+        its callback is called from the main thread. '''
+
+    def __init__(self, cache: dict):
+        # dir path -> [mtime_ns, files_size, subdirs, unreadable]
+        self._dirs = cache
+
+        self._lock = threading.Lock()
+        self._thread = None
+        self._abort_event = threading.Event()
+        self._path = ''
+        self._callback = None
+        self._result = 0
+        self._pending = None
+
+        self._timer = QTimer()
+        self._timer.setInterval(50)
+        self._timer.timeout.connect(self._check_thread)
+
+    def _forget_dir(self, path: str):
+        prefix = path + '/'
+        for dir_path in [p for p in self._dirs
+                         if p == path or p.startswith(prefix)]:
+            self._dirs.pop(dir_path)
+
+    def _read_dir(self, path: str, mtime_ns: int) -> list:
+        files_size = 0
+        subdirs = []
+        unreadable = False
+
+        with os.scandir(path) as entries:
+            for entry in entries:
+                try:
+                    if entry.is_symlink():
+                        continue
+                    if entry.is_dir():
+                        subdirs.append(entry.name)
+                    else:
+                        files_size += entry.stat().st_size
+                except OSError:
+                    unreadable = True
+
+        return [mtime_ns, files_size, subdirs, unreadable]
+
+    def _dir_size(self, path: str) -> int:
+        if self._abort_event.is_set():
+            raise _CalculationAborted
+
+        try:
+            mtime_ns = os.stat(path).st_mtime_ns
+            dir_cache = self._read_dir(path, mtime_ns)
+        except OSError:
+            return SIZE_UNREADABLE
+
+        with self._lock:
+            old_cache = self._dirs.get(path)
+            if old_cache is not None:
+                for subdir in old_cache[2]:
+                    if subdir not in dir_cache[2]:
+                        self._forget_dir(os.path.join(path, subdir))
+            self._dirs[path] = dir_cache
+
+        if dir_cache[3]:
+            return SIZE_UNREADABLE
+
+        total_size = dir_cache[1]
+        for subdir in dir_cache[2]:
+            size = self._dir_size(os.path.join(path, subdir))
+            if size < 0:
+                return size
+            total_size += size
+
+        return total_size
+
+    def _run(self, path: str):
+        try:
+            self._result = self._dir_size(path)
+        except _CalculationAborted:
+            self._result = SIZE_UNKNOWN
+
+    def _start_thread(self, path: str, callback):
+        self._path = path
+        self._callback = callback
+        self._abort_event.clear()
+        self._thread = threading.Thread(
+            target=self._run, args=(path,), daemon=True)
+        self._thread.start()
+        self._timer.start()
+
+    def _check_thread(self):
+        if self._thread is None or self._thread.is_alive():
+            return
+
+        self._thread = None
+
+        if self._pending is not None:
+            self._start_thread(*self._pending)
+            self._pending = None
+            return
+
+        self._timer.stop()
+        if not self._abort_event.is_set() and self._callback is not None:
+            self._callback(self._result)
+        self._callback = None
+
+    def _estimate(self, path: str):
+        dir_cache = self._dirs.get(path)
+        if dir_cache is None:
+            return None
+
+        if dir_cache[3]:
+            return SIZE_UNREADABLE
+
+        total_size = dir_cache[1]
+        for subdir in dir_cache[2]:
+            size = self._estimate(os.path.join(path, subdir))
+            if size is None or size < 0:
+                return size
+            total_size += size
+
+        return total_size
+
+    def estimate(self, path: str):
+        ''' returns the size known from the tree without reading anything,
+            None if path size has never been calculated '''
+        with self._lock:
+            return self._estimate(path)
+
+    def calculate(self, path: str, callback):
+        ''' calculate path size in a thread,
+            callback(size) is called when done
+            (size is SIZE_UNREADABLE if unreadable).
+            An older unfinished calculation is aborted. '''
+        if self._thread is not None:
+            if path == self._path and not self._abort_event.is_set():
+                self._callback = callback
+                return
+
+            self._abort_event.set()
+            self._pending = (path, callback)
+            return
+
+        self._start_thread(path, callback)
+
+    def get_cache(self) -> dict:
+        with self._lock:
+            return dict(self._dirs)
@@ -3,6 +3,7 @@ import sys
 import random
 import shutil
 import subprocess
+import threading
 import time
 import liblo
 
@@ -70,6 +71,9 @@ class ClientCommunicating(liblo.ServerThread):
         self._list_asker_addr = None
 
         self.gui_list = []
+        # GUI url -> address of its TCP server for bulk transfers
+        self._gui_bulk_addrs = {}
+        self._bulk_lock = threading.Lock()
         self.controller_list = []
         self.monitor_list = []
         self.server_status = ray.ServerStatus.OFF
@@ -331,6 +335,9 @@ class ClientCommunicating(liblo.ServerThread):
 
 
 class OscServerThread(ClientCommunicating):
+    # max number of messages in one bundle sent to a GUI TCP server
+    bulk_max_messages = 100
+
     def __init__(self, session, osc_num=0):
         ClientCommunicating.__init__(self, session, osc_num)
 
@@ -401,6 +408,16 @@ class OscServerThread(ClientCommunicating):
 
         self.announce_gui(src_addr.url, nsm_locked, is_net_free, gui_pid)
 
+    @ray_method('/ray/server/gui_bulk_url', 's')
+    def rayGuiGui_bulk_url(self, path, args, types, src_addr):
+        # GUI has a TCP server for big amounts of data,
+        # sent just before /ray/server/gui_announce
+        try:
+            self._gui_bulk_addrs[src_addr.url] = liblo.Address(args[0])
+        except liblo.AddressError:
+            sys.stderr.write('invalid bulk url %s\n' % args[0])
+        return False
+
     @ray_method('/ray/server/gui_disannounce', '')
     def rayGuiGui_disannounce(self, path, args, types, src_addr):
         for addr in self.gui_list:
@@ -410,6 +427,7 @@ class OscServerThread(ClientCommunicating):
             return False
 
         self.gui_list.remove(addr)
+        self._gui_bulk_addrs.pop(addr.url, None)
 
         if src_addr.url == self._nsm_locker_url:
             self.net_daemon_id = random.randint(1, 999999999)
@@ -463,8 +481,13 @@ class OscServerThread(ClientCommunicating):
                             'port given for patchbay %s is not a valid osc port')
 
                     if good_port:
-                        self.send(patchbay_addr, '/ray/patchbay/add_gui',
-                                  src_addr.url)
+                        bulk_url = self.get_gui_bulk_url(src_addr.url)
+                        if bulk_url:
+                            self.send(patchbay_addr, '/ray/patchbay/add_gui',
+                                      src_addr.url, bulk_url)
+                        else:
+                            self.send(patchbay_addr, '/ray/patchbay/add_gui',
+                                      src_addr.url)
                         return False
                     break
 
@@ -1083,6 +1106,10 @@ class OscServerThread(ClientCommunicating):
     def rayServerListSnapshots(self, path, args, types, src_addr):
         pass
 
+    @ray_method('/ray/session/list_snapshots', 'ii')
+    def rayServerListSnapshotsPaged(self, path, args, types, src_addr):
+        pass
+
     @ray_method('/ray/session/set_auto_snapshot', 'i')
     def rayServerSetAutoSnapshot(self, path, args, types, src_addr):
         pass
@@ -1239,6 +1266,10 @@ class OscServerThread(ClientCommunicating):
     def rayClientListSnapshots(self, path, args, types, src_addr):
         pass
 
+    @ray_method('/ray/client/list_snapshots', 'sii')
+    def rayClientListSnapshotsPaged(self, path, args, types, src_addr):
+        pass
+
     @ray_method('/ray/client/open_snapshot', 'ss')
     def rayClientLoadSnapshot(self, path, args, types, src_addr):
         pass
@@ -1350,6 +1381,42 @@ class OscServerThread(ClientCommunicating):
         for gui_addr in self.gui_list:
             self.send(gui_addr, *args)
 
+    def get_gui_bulk_url(self, gui_url: str) -> str:
+        bulk_addr = self._gui_bulk_addrs.get(gui_url)
+        if bulk_addr is None:
+            return ''
+        return bulk_addr.url
+
+    def send_bulk(self, gui_addr, messages: list) -> bool:
+        ''' send messages (tuples (path, *args)) grouped in bundles
+            to the TCP server of the GUI, without any risk of packet loss.
+            returns False if this GUI has no TCP server,
+            then messages have to be sent the usual way. '''
+        bulk_addr = self._gui_bulk_addrs.get(gui_addr.url)
+        if bulk_addr is None:
+            return False
+
+        if CommandLineArgs.debug:
+            sys.stderr.write(
+                '\033[96mOSC::daemon sends\033[0m %i messages to %s\n'
+                % (len(messages), bulk_addr.url))
+
+        # liblo.send (without server) uses the TCP socket of the address.
+        # Lock prevents bundles of main and server threads to be mixed.
+        with self._bulk_lock:
+            try:
+                for i in range(0, len(messages), self.bulk_max_messages):
+                    bundle = liblo.Bundle()
+                    for message in messages[i:i + self.bulk_max_messages]:
+                        bundle.add(liblo.Message(*message))
+                    liblo.send(bulk_addr, bundle)
+            except IOError:
+                # GUI TCP server is not reachable, forget it
+                self._gui_bulk_addrs.pop(gui_addr.url, None)
+                return False
+
+        return True
+
     def set_server_status(self, server_status:int):
         self.server_status = server_status
         self.send_gui('/ray/gui/server/status', server_status)
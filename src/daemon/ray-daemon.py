@@ -145,6 +145,8 @@ if __name__ == '__main__':
     
     # save sessions infos in cache
     session.save_folder_sizes_cache_file()
+    session.session_index.save_cache_file()
+    session.desktop_file_index.save_cache_file()
 
     RS.settings.sync()
 
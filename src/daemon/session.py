@@ -21,8 +21,10 @@ from signaler import Signaler
 from server_sender import ServerSender
 from file_copier import FileCopier
 from client import Client
+from client_launcher import ClientLauncher
 from scripter import StepScripter
 from canvas_saver import CanvasSaver
+from desktop_file_index import DesktopFileIndex, localized_values
 from daemon_tools import (
     TemplateRoots, RS, Terminal, get_git_default_un_and_ignored,
     dirname, basename, highlight_text)
@@ -628,99 +630,53 @@ class Session(ServerSender):
     
     def _rebuild_templates_database(self, base):        
         def get_nsm_capable_execs_from_desktop_files()->list:
-            ''' returns a list of tuples 
+            ''' returns a list of dicts
                 {'executable': str,
                  'name': str,
                  'desktop_file': str,
                  'nsm_capable': True,
                  'skipped': False} '''
 
-            desk_path_list = (
-                '%s/.local' % os.getenv('HOME'),
-                '/usr/local',
-                '/usr')
+            desktop_index = DesktopFileIndex.get_instance()
+            if desktop_index is None:
+                return []
+
+            desktop_index.refresh()
 
             application_dicts = []
-            
-            lang = os.getenv('LANG')
-            lang_strs = ("[%s]" % lang[0:5], "[%s]" % lang[0:2], "")
+            executables = set()
 
-            for desk_path in desk_path_list:
-                full_desk_path = "%s/share/applications" % desk_path
+            for entry in desktop_index.template_entries():
+                executable = entry['executable']
 
-                if not os.path.isdir(full_desk_path):
-                    # applications folder doesn't exists
+                if (entry['nsm_capable'] is None
+                        or not executable
+                        or executable in executables):
+                    # prevent several desktop files with same executable
                     continue
 
-                if not os.access(full_desk_path, os.R_OK):
-                    # no permission to read this applications folder
+                if not shutil.which(executable):
                     continue
 
-                for root, dirs, files in os.walk(full_desk_path):
-                    for f in files:
-                        if not f.endswith('.desktop'):
-                            continue
+                executables.add(executable)
 
-                        if f in [apd['desktop_file'] for apd in application_dicts]:
-                            # desktop file already seen in a prior desk_path
-                            continue
+                name = executable
+                for value in localized_values(entry['fields'], 'Name'):
+                    if value:
+                        name = value
+                        break
 
-                        full_desk_file = os.path.join(root, f)
-                        
-                        try:
-                            file = open(full_desk_file, 'r')
-                            contents = file.read()
-                        except:
-                            continue
+                # 'skipped' key may be set to True later,
+                # if a template does not want to be erased
+                # by the template created
+                # with this .desktop file.
+                application_dicts.append(
+                    {'executable': executable,
+                     'name': name,
+                     'desktop_file': entry['desktop_file'],
+                     'nsm_capable': entry['nsm_capable'],
+                     'skipped': False})
 
-                        executable = ''
-                        has_nsm_mention = False
-                        nsm_capable = True
-                        name = ''
-                        
-                        for line in contents.splitlines():
-                            if line.startswith('Exec='):
-                                executable_and_args = line.partition('=')[2].strip()
-                                executable = executable_and_args.partition(' ')[0]
-                            
-                            elif line.lower().startswith('x-nsm-capable='):
-                                has_nsm_mention = True
-                                value = line.partition('=')[2]
-                                nsm_capable = bool(value.strip().lower() == 'true')
-                            
-                            elif line.startswith('Name='):
-                                name = line.partition('=')[2].strip()
-
-                        if (has_nsm_mention and executable
-                                and shutil.which(executable)):
-                            # prevent several desktop files with same executable
-                            if executable in [apd['executable']
-                                              for apd in application_dicts]:
-                                continue
-
-                            name = executable
-                            name_found = False
-                            
-                            for lang_str in lang_strs:
-                                for line in contents.splitlines():
-                                    if line.startswith('Name%s=' % lang_str):
-                                        name = line.partition('=')[2].strip()
-                                        name_found = True
-                                        break
-                                if name_found:
-                                    break
-
-                            # 'skipped' key may be set to True later,
-                            # if a template does not want to be erased
-                            # by the template created
-                            # with this .desktop file.
-                            application_dicts.append(
-                                {'executable': executable,
-                                 'name': name,
-                                 'desktop_file': f,
-                                 'nsm_capable': nsm_capable,
-                                 'skipped': False})
-            
             return [a for a in application_dicts if a['nsm_capable']]
         
         # discovery start
@@ -975,14 +931,8 @@ class OperatingSession(Session):
         self.timer_redondant = False
         self.expected_clients = []
 
-        self.timer_launch = QTimer()
-        self.timer_launch.setInterval(100)
-        self.timer_launch.timeout.connect(self._timer_launch_timeout)
+        self.launcher = ClientLauncher(self)
         self.clients_to_launch = []
-
-        self.timer_quit = QTimer()
-        self.timer_quit.setInterval(100)
-        self.timer_quit.timeout.connect(self._timer_quit_timeout)
         self.clients_to_quit = []
 
         self.timer_waituser_progress = QTimer()
@@ -1178,21 +1128,13 @@ class OperatingSession(Session):
         self.steps_order.__delitem__(0)
         next_function(*arguments)
 
-    def _timer_launch_timeout(self):
-        if self.clients_to_launch:
-            self.clients_to_launch[0].start()
-            self.clients_to_launch.__delitem__(0)
+    def _launch_clients(self):
+        self.launcher.launch(self.clients_to_launch)
+        self.clients_to_launch.clear()
 
-        if not self.clients_to_launch:
-            self.timer_launch.stop()
-
-    def _timer_quit_timeout(self):
-        if self.clients_to_quit:
-            client = self.clients_to_quit.pop(0)
-            client.stop()
-
-        if not self.clients_to_quit:
-            self.timer_quit.stop()
+    def _quit_clients(self):
+        self.launcher.stop(self.clients_to_quit)
+        self.clients_to_quit.clear()
 
     def _timer_wait_user_progress_timeOut(self):
         if not self.expected_clients:
@@ -1449,11 +1391,28 @@ class OperatingSession(Session):
                  force=False, outing=False):
         if not force:
             if not (self.has_server_option(ray.Option.SNAPSHOTS)
-                    and not self.snapshoter.is_auto_snapshot_prevented()
-                    and self.snapshoter.has_changes()):
+                    and not self.snapshoter.is_auto_snapshot_prevented()):
                 self.next_function()
                 return
 
+            # changes are counted without blocking the event loop
+            self.snapshoter.check_changes(
+                lambda has_changes: self._snapshot_if_changes(
+                    has_changes, snapshot_name, rewind_snapshot, outing))
+            return
+
+        self._snapshot_start(snapshot_name, rewind_snapshot, outing)
+
+    def _snapshot_if_changes(self, has_changes: bool, snapshot_name: str,
+                             rewind_snapshot: str, outing: bool):
+        if not has_changes:
+            self.next_function()
+            return
+
+        self._snapshot_start(snapshot_name, rewind_snapshot, outing)
+
+    def _snapshot_start(self, snapshot_name: str, rewind_snapshot: str,
+                        outing: bool):
         if outing:
             self.set_server_status(ray.ServerStatus.OUT_SNAPSHOT)
         else:
@@ -1554,6 +1513,9 @@ class OperatingSession(Session):
             self.next_function()
             return
 
+        # do not start clients not launched yet
+        self.launcher.clear()
+
         keep_client_list = [] # clients we will keep alive
         byebye_client_list = [] # stopped clients we will remove immediately
 
@@ -1605,7 +1567,7 @@ class OperatingSession(Session):
 
             for client in self.expected_clients.__reversed__():
                 self.clients_to_quit.append(client)
-            self.timer_quit.start()
+            self._quit_clients()
 
         self.trashed_clients.clear()
         self.send_gui('/ray/gui/trash/clear')
@@ -1693,8 +1655,8 @@ for better organization.""")
 
     def init_snapshot(self, spath, snapshot):
         self.set_server_status(ray.ServerStatus.REWIND)
-        if self.snapshoter.load(spath, snapshot, self.init_snapshot_error):
-            self.next_function()
+        self.snapshoter.load(spath, snapshot, self.next_function,
+                             self.init_snapshot_error)
 
     def init_snapshot_error(self, err, info_str=''):
         m = _translate('Snapshot Error', "Snapshot error")
@@ -2268,7 +2230,7 @@ for better organization.""")
             else:
                 client.switch_state = ray.SwitchState.NEEDED
 
-        self.timer_quit.start()
+        self._quit_clients()
         self._wait_and_go_to(5000, (self.load_substep2, open_off), ray.WaitFor.QUIT)
 
     def load_substep2(self, open_off):
@@ -2379,7 +2341,7 @@ for better organization.""")
         #* dumb clients will never send an 'announce message', so we need
         #* to give up waiting on them fairly soon. */
 
-        self.timer_launch.start()
+        self._launch_clients()
 
         wait_time = 4000 + len(self.expected_clients) * 1000
 
@@ -2598,10 +2560,13 @@ for better organization.""")
 
     def load_client_snapshot(self, client_id, snapshot):
         self.set_server_status(ray.ServerStatus.REWIND)
-        if self.snapshoter.load_client_exclusive(
-                client_id, snapshot, self.load_client_snapshot_error):
-            self.set_server_status(ray.ServerStatus.READY)
-            self.next_function()
+        self.snapshoter.load_client_exclusive(
+            client_id, snapshot, self.load_client_snapshot_substep1,
+            self.load_client_snapshot_error)
+
+    def load_client_snapshot_substep1(self):
+        self.set_server_status(ray.ServerStatus.READY)
+        self.next_function()
 
     def load_client_snapshot_error(self, err, info_str=''):
         m = _translate('Snapshot Error', "Snapshot error")
@@ -2658,7 +2623,7 @@ for better organization.""")
                 self.clients_to_quit.append(client)
                 self.expected_clients.append(client)
 
-        self.timer_quit.start()
+        self._quit_clients()
 
         self._wait_and_go_to(
             5000,
@@ -2677,111 +2642,67 @@ for better organization.""")
     def clear_clients_substep3(self, src_addr, src_path):
         self.answer(src_addr, src_path, 'Clients cleared')
         
-    def send_preview(self, src_addr, folder_sizes:list):
+    def send_preview(self, src_addr, size_calculator):
         # prevent long list of OSC sends if preview order already changed
         server = self.get_server_even_dummy()
         if server and server.session_to_preview != self.get_short_path():
             return
         
-        self.send_even_dummy(src_addr, '/ray/gui/preview/clear')
-        self.send_even_dummy(src_addr, '/ray/gui/preview/notes', self.notes)
+        messages = [('/ray/gui/preview/clear',),
+                    ('/ray/gui/preview/notes', self.notes)]
 
         for client in self.clients:
-            self.send_even_dummy(
-                src_addr, '/ray/gui/preview/client/update',
-                *client.spread())
-            
-            self.send_even_dummy(
-                src_addr, '/ray/gui/preview/client/is_started',
-                client.client_id, int(client.auto_start))
-            
+            messages.append(
+                ('/ray/gui/preview/client/update', *client.spread()))
+            messages.append(
+                ('/ray/gui/preview/client/is_started',
+                 client.client_id, int(client.auto_start)))
+
             if client.protocol == ray.Protocol.RAY_HACK:
-                self.send_even_dummy(
-                    src_addr, '/ray/gui/preview/client/ray_hack_update',
-                    client.client_id, *client.ray_hack.spread())
+                messages.append(
+                    ('/ray/gui/preview/client/ray_hack_update',
+                     client.client_id, *client.ray_hack.spread()))
 
             elif client.protocol == ray.Protocol.RAY_NET:
-                self.send_even_dummy(
-                    src_addr, '/ray/gui/preview/client/ray_net_update',
-                    client.client_id, *client.ray_net.spread())
+                messages.append(
+                    ('/ray/gui/preview/client/ray_net_update',
+                     client.client_id, *client.ray_net.spread()))
 
-        i = 0
         for snapshot in self.snapshoter.list():
-            self.send_even_dummy(
-                src_addr, '/ray/gui/preview/snapshot', snapshot)
-            
-            i += 1
-            if i == 100:
-                # slow package send to try to prevent UDP loss
-                # and check if preview is still wanted on this session
-                if server and server.session_to_preview != self.get_short_path():
-                    return
-                time.sleep(0.010)
-                i = 0
+            messages.append(('/ray/gui/preview/snapshot', snapshot))
+
+        # send the size known from last calculation,
+        # then the real size once calculated in a thread
+        short_path = self.get_short_path()
+        estimated_size = size_calculator.estimate(self.path)
+        if estimated_size is not None:
+            messages.append(('/ray/gui/preview/session_size', estimated_size))
+
+        messages.append(('/reply', '/ray/server/get_session_preview'))
+
+        if server is None or not server.send_bulk(src_addr, messages):
+            for i, message in enumerate(messages):
+                self.send_even_dummy(src_addr, *message)
+
+                if i % 100 == 99:
+                    # slow package send to try to prevent UDP loss
+                    # and check if preview is still wanted on this session
+                    if (server and server.session_to_preview
+                            != self.get_short_path()):
+                        return
+                    time.sleep(0.010)
 
         # re check here if preview didn't change before calculate session size
-        if server and server.session_to_preview != self.get_short_path():
+        if server and server.session_to_preview != short_path:
             return
 
-        total_size = 0
-        size_unreadable = False
-
-        # get last modified session folder to prevent recalculate
-        # if we already know its size
-        modified = int(os.path.getmtime(self.path))
-
-        # check if size is already in memory
-        for folder_size in folder_sizes:
-            if folder_size['path'] == self.path:
-                if folder_size['modified'] == modified:
-                    total_size = folder_size['size']
-                break
-
-        # calculate session size
-        if not total_size:
-            for root, dirs, files in os.walk(self.path):
-                # check each loop if it is still pertinent to walk
-                if server and server.session_to_preview != self.get_short_path():
-                    return
-
-                # exclude symlinks directories from count
-                dirs[:] = [dir for dir in dirs
-                        if not os.path.islink(os.path.join(root, dir))]
-
-                for file_path in files:
-                    full_file_path = os.path.join(root, file_path)
-                    
-                    # ignore file if it is a symlink
-                    if os.path.islink(os.path.join(root, file_path)):
-                        continue
-
-                    file_size = 0
-                    try:
-                        file_size = os.path.getsize(full_file_path)
-                    except:
-                        sys.stderr.write("Unable to read %s size\n"
-                                        % full_file_path)
-                        size_unreadable = True
-                        break
-
-                    total_size += os.path.getsize(full_file_path)
-                
-                if size_unreadable:
-                    total_size = -1
-                    break
-        
-        for folder_size in folder_sizes:
-            if folder_size['path'] == self.path:
-                folder_size['modified'] = modified
-                folder_size['size'] = total_size
-                break
-        else:
-            folder_sizes.append(
-                {'path': self.path, 'modified': modified, 'size': total_size})
+        def size_calculated(total_size: int):
+            if server and server.session_to_preview != short_path:
+                return
 
-        self.send_even_dummy(
-            src_addr, '/ray/gui/preview/session_size', total_size)
+            if total_size != estimated_size:
+                self.send_even_dummy(
+                    src_addr, '/ray/gui/preview/session_size', total_size)
 
-        self.send_even_dummy(
-            src_addr, '/reply', '/ray/server/get_session_preview')
+        size_calculator.calculate(self.path, size_calculated)
         del self
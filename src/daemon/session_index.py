@@ -0,0 +1,264 @@
+import json
+import os
+import xdg.BaseDirectory
+from PyQt5.QtCore import QObject, QFileSystemWatcher
+
+import ray
+
+from daemon_tools import dirname
+
+instance = None
+
+SESSION_FILES = ('raysession.xml', 'session.nsm')
+
+
+class SessionIndex(QObject):
+    ''' Keeps in memory (and in cache file) the tree of folders
+        under the session root, with for each session its notes state,
+        its last modification and its scripts dir.
+        Directories are watched with QFileSystemWatcher (inotify),
+        only changed directories are read again.
+        If some directories can't be watched (inotify limits, NFS...)
+        the index is refreshed with a rescan which only reads the
+        directories whose modification time changed. '''
+
+    def __init__(self, root: str):
+        QObject.__init__(self)
+        self._root = ''
+
+        # relative dir path ('' for root) -> dict with keys
+        # 'modified', 'session', 'notes', 'scripts', 'subdirs'
+        self._dirs = {}
+        self._dirty = set()
+        self._watched = set()
+        self._scanned = False
+        self._watch_complete = True
+
+        self._watcher = QFileSystemWatcher()
+        self._watcher.directoryChanged.connect(self._directory_changed)
+
+        self._cache_path = \
+            xdg.BaseDirectory.xdg_cache_home + "/RaySession/sessions_index.json"
+
+        global instance
+        instance = self
+
+        self._load_cache_file(root)
+        self.set_root(root)
+
+    @staticmethod
+    def get_instance():
+        return instance
+
+    def _load_cache_file(self, root: str):
+        if not os.path.isfile(self._cache_path):
+            return
+
+        try:
+            with open(self._cache_path, 'r') as file:
+                cache = json.load(file)
+        except:
+            # cache file load failed and this is really not strong
+            return
+
+        if not isinstance(cache, dict) or cache.get('root') != root:
+            return
+
+        dirs = cache.get('dirs')
+        if isinstance(dirs, dict):
+            self._root = root
+            self._dirs = dirs
+
+    def save_cache_file(self):
+        if not self._root:
+            return
+
+        cache_dir = dirname(self._cache_path)
+        if not os.path.exists(cache_dir):
+            try:
+                os.makedirs(cache_dir)
+            except:
+                # can't save cache file, this is really not strong
+                return
+
+        try:
+            with open(self._cache_path, 'w') as file:
+                json.dump({'root': self._root, 'dirs': self._dirs}, file)
+        except:
+            # cache file save failed, not strong
+            pass
+
+    def _full_path(self, rel_path: str) -> str:
+        if not rel_path:
+            return self._root
+        return self._root + '/' + rel_path
+
+    def _rel_path(self, full_path: str) -> str:
+        if full_path == self._root:
+            return ''
+        return full_path.replace(self._root + '/', '', 1)
+
+    def set_root(self, root: str):
+        if root == self._root and self._scanned:
+            return
+
+        if self._watched:
+            self._watcher.removePaths(list(self._watched))
+            self._watched.clear()
+
+        if root != self._root:
+            self._dirs.clear()
+
+        self._root = root
+        self._dirty.clear()
+        self._scanned = False
+        self._watch_complete = True
+
+    def _directory_changed(self, full_path: str):
+        if self._root and full_path.startswith(self._root):
+            self._dirty.add(self._rel_path(full_path))
+
+    def _watch(self, full_path: str):
+        if not self._watch_complete:
+            return
+
+        if full_path in self._watched:
+            return
+
+        if self._watcher.addPath(full_path):
+            self._watched.add(full_path)
+        else:
+            # from now, we will need rescans
+            self._watch_complete = False
+
+    def _forget(self, rel_path: str):
+        prefix = rel_path + '/'
+        forgotten = [rel for rel in self._dirs
+                     if rel == rel_path or rel.startswith(prefix)]
+
+        for rel in forgotten:
+            self._dirs.pop(rel)
+            self._dirty.discard(rel)
+
+        watched = [self._full_path(rel) for rel in forgotten]
+        watched = [path for path in watched if path in self._watched]
+        if watched:
+            self._watcher.removePaths(watched)
+            self._watched -= set(watched)
+
+    def _read_dir(self, rel_path: str, full_path: str, modified: float) -> dict:
+        files = []
+        subdirs = []
+        has_scripts = False
+
+        try:
+            with os.scandir(full_path) as it:
+                for entry in it:
+                    # exclude hidden files and dirs
+                    if entry.name.startswith('.'):
+                        continue
+
+                    if entry.is_dir():
+                        if entry.name == ray.SCRIPTS_DIR:
+                            has_scripts = True
+
+                        # like os.walk, do not follow symlinks dirs
+                        if not entry.is_symlink():
+                            subdirs.append(entry.name)
+                    else:
+                        files.append(entry.name)
+        except OSError:
+            pass
+
+        is_session = bool(
+            rel_path and [f for f in files if f in SESSION_FILES])
+
+        if is_session:
+            # prevent search in sub directories
+            subdirs.clear()
+
+        return {'modified': modified,
+                'session': is_session,
+                'notes': bool(ray.NOTES_PATH in files),
+                'scripts': has_scripts,
+                'subdirs': sorted(subdirs)}
+
+    def _update_dir(self, rel_path: str, deep: bool):
+        full_path = self._full_path(rel_path)
+
+        try:
+            modified = os.stat(full_path).st_mtime
+        except OSError:
+            self._forget(rel_path)
+            return
+
+        entry = self._dirs.get(rel_path)
+
+        if (entry is None
+                or rel_path in self._dirty
+                or entry['modified'] != modified):
+            self._dirty.discard(rel_path)
+            old_subdirs = set(entry['subdirs']) if entry else set()
+            entry = self._read_dir(rel_path, full_path, modified)
+            self._dirs[rel_path] = entry
+
+            for subdir in old_subdirs - set(entry['subdirs']):
+                self._forget(os.path.join(rel_path, subdir))
+
+        self._watch(full_path)
+
+        for subdir in entry['subdirs']:
+            sub_rel = os.path.join(rel_path, subdir)
+            if deep or sub_rel not in self._dirs:
+                self._update_dir(sub_rel, deep)
+
+    def refresh(self):
+        ''' update the index, reading only what changed '''
+        if not self._root:
+            return
+
+        if not self._scanned or not self._watch_complete:
+            self._update_dir('', True)
+            self._scanned = True
+            return
+
+        while self._dirty:
+            rel_path = self._dirty.pop()
+            if rel_path in self._dirs:
+                # force directory read
+                self._dirty.add(rel_path)
+                self._update_dir(rel_path, False)
+
+    def list_sessions(self) -> list:
+        self.refresh()
+        return sorted([rel for rel, entry in self._dirs.items()
+                       if entry['session']])
+
+    def list_scripted_dirs(self) -> list:
+        ''' returns a list of tuples (relative_path, script_files)
+            for all non root dirs containing a scripts dir '''
+        scripted_dirs = []
+
+        for rel_path, entry in self._dirs.items():
+            if not rel_path or not entry['scripts']:
+                continue
+
+            script_files = ray.ScriptFile.PREVENT
+            for action in ('load', 'save', 'close'):
+                if os.access("%s/%s/%s.sh" % (self._full_path(rel_path),
+                                              ray.SCRIPTS_DIR, action),
+                             os.X_OK):
+                    script_files += ray.ScriptFile.by_string(action)
+
+            scripted_dirs.append((rel_path, script_files))
+
+        return scripted_dirs
+
+    def get_session_infos(self, rel_path: str):
+        ''' returns tuple (has_notes, last_modified) for the session
+            or None if this is not a known session '''
+        entry = self._dirs.get(rel_path)
+        if entry is None or not entry['session']:
+            return None
+
+        return (entry['notes'], int(entry['modified']))
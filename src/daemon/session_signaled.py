@@ -14,6 +14,9 @@ import ray
 
 from client import Client
 from multi_daemon_file import MultiDaemonFile
+from session_index import SessionIndex
+from folder_size_calculator import FolderSizeCalculator
+from desktop_file_index import DesktopFileIndex
 from signaler import Signaler
 from daemon_tools import (Terminal, RS, dirname,
                           is_pid_child_of, highlight_text)
@@ -91,18 +94,26 @@ class SignaledSession(OperatingSession):
         self.dummy_sessions = []
         self._next_session_id = 1
         
-        self._folder_sizes_and_dates = []
+        self._folder_sizes_and_dates = {}
         
         self._cache_folder_sizes_path = \
             xdg.BaseDirectory.xdg_cache_home + "/RaySession/folder_sizes.json"
 
         if os.path.isfile(self._cache_folder_sizes_path):
             try:
-                self._folder_sizes_and_dates = json.load(
-                    self._cache_folder_sizes_path)
+                with open(self._cache_folder_sizes_path, 'r') as file:
+                    folder_sizes = json.load(file)
+                if isinstance(folder_sizes, dict):
+                    self._folder_sizes_and_dates = folder_sizes
             except:
                 # cache file load failed and this is really not strong
                 pass
+
+        self.folder_size_calculator = FolderSizeCalculator(
+            self._folder_sizes_and_dates)
+
+        self.session_index = SessionIndex(self.root)
+        self.desktop_file_index = DesktopFileIndex()
     
     def _get_new_dummy_session_id(self)->int:
         to_return = self._next_session_id
@@ -125,7 +136,7 @@ class SignaledSession(OperatingSession):
         
         try:
             file = open(self._cache_folder_sizes_path, 'w')
-            json.dump(self._folder_sizes_and_dates, file)
+            json.dump(self.folder_size_calculator.get_cache(), file)
             file.close()
         except:
             # cache file save failed, not strong
@@ -287,8 +298,13 @@ class SignaledSession(OperatingSession):
         server = self.get_server()
         if server is None:
             return
-        QProcess.startDetached('ray-jackpatch_to_osc',
-                               [str(server.port), src_addr.url])
+        patchbay_args = [str(server.port), src_addr.url]
+        bulk_url = server.get_gui_bulk_url(src_addr.url)
+        if bulk_url:
+            # tcp url following the GUI url is its bulk url
+            patchbay_args.append(bulk_url)
+
+        QProcess.startDetached('ray-jackpatch_to_osc', patchbay_args)
 
     def _ray_server_abort_copy(self, path, args, src_addr):
         self.file_copier.abort()
@@ -327,6 +343,7 @@ class SignaledSession(OperatingSession):
             return
 
         self.root = session_root
+        self.session_index.set_root(self.root)
 
         multi_daemon_file = MultiDaemonFile.get_instance()
         if multi_daemon_file:
@@ -451,34 +468,19 @@ class SignaledSession(OperatingSession):
             return
 
         session_list = []
-        sessions_set = set()
         n = 0
+        all_sessions = self.session_index.list_sessions()
 
-        for root, dirs, files in os.walk(self.root):
-            #exclude hidden files and dirs
-            files = [f for f in files if not f.startswith('.')]
-            dirs[:] = [d for d in dirs  if not d.startswith('.')]
+        for basefolder in all_sessions:
+            session_list.append(basefolder)
+            n += len(basefolder)
 
-            if root == self.root:
-                continue
+            if n >= 10000 or time.time() - last_sent_time > 0.300:
+                last_sent_time = time.time()
+                self.send(src_addr, "/reply", path, *session_list)
 
-            for file in files:
-                if file in ('raysession.xml', 'session.nsm'):
-                    # prevent search in sub directories
-                    dirs.clear()
-
-                    basefolder = root.replace(self.root + '/', '', 1)
-                    session_list.append(basefolder)
-                    sessions_set.add(basefolder)
-                    n += len(basefolder)
-
-                    if n >= 10000 or time.time() - last_sent_time > 0.300:
-                        last_sent_time = time.time()
-                        self.send(src_addr, "/reply", path, *session_list)
-
-                        session_list.clear()
-                        n = 0
-                    break
+                session_list.clear()
+                n = 0
 
         if session_list:
             self.send(src_addr, "/reply", path, *session_list)
@@ -494,63 +496,32 @@ class SignaledSession(OperatingSession):
                 break
             search_scripts_dir = dirname(search_scripts_dir)
 
+        if has_general_scripts:
+            self.send(src_addr, '/ray/gui/listed_session/scripted_dir',
+                      '', ray.ScriptFile.PARENT)
+
+        for basefolder, script_files in \
+                self.session_index.list_scripted_dirs():
+            self.send(src_addr, '/ray/gui/listed_session/scripted_dir',
+                      basefolder, script_files)
+
         locked_sessions = []
         multi_daemon_file = MultiDaemonFile.get_instance()
         if multi_daemon_file is not None:
             locked_sessions = multi_daemon_file.get_all_session_paths()
 
-        for root, dirs, files in os.walk(self.root):
-            #exclude hidden files and dirs
-            files = [f for f in files if not f.startswith('.')]
-            dirs[:] = [d for d in dirs  if not d.startswith('.')]
-
-            if root == self.root:
-                if has_general_scripts:
-                    self.send(src_addr, '/ray/gui/listed_session/scripted_dir',
-                              '', ray.ScriptFile.PARENT)
-                continue
-            
-            basefolder = root.replace(self.root + '/', '', 1)
-            
-            if ray.SCRIPTS_DIR in dirs:
-                script_files = ray.ScriptFile.PREVENT
-                
-                for action in ('load', 'save', 'close'):
-                    if os.access(
-                            "%s/%s/%s.sh" % (root, ray.SCRIPTS_DIR, action),
-                            os.X_OK):
-                        script_files += ray.ScriptFile.by_string(action)
-
-                self.send(src_addr, '/ray/gui/listed_session/scripted_dir',
-                          basefolder, script_files)
-            
-            if basefolder not in sessions_set:
-                continue
-
-            has_notes = bool(ray.NOTES_PATH in files)
-            last_modified = int(os.path.getmtime(root))
-            locked = bool(root in locked_sessions)
+        for basefolder in all_sessions:
+            has_notes, last_modified = \
+                self.session_index.get_session_infos(basefolder)
+            locked = bool(self.root + '/' + basefolder in locked_sessions)
 
             self.send(src_addr, '/ray/gui/listed_session/details',
                       basefolder, int(has_notes), last_modified, int(locked))
 
-            # prevent search in sub directories
-            dirs.clear()        
-
     def _nsm_server_list(self, path, args, src_addr):
         if self.root:
-            for root, dirs, files in os.walk(self.root):
-                #exclude hidden files and dirs
-                files = [f for f in files if not f.startswith('.')]
-                dirs[:] = [d for d in dirs  if not d.startswith('.')]
-
-                if root == self.root:
-                    continue
-
-                for file in files:
-                    if file in ('raysession.xml', 'session.nsm'):
-                        basefolder = root.replace(self.root + '/', '', 1)
-                        self.send(src_addr, '/reply', path, basefolder)
+            for basefolder in self.session_index.list_sessions():
+                self.send(src_addr, '/reply', path, basefolder)
 
         self.send(src_addr, '/reply', path, "")
 
@@ -713,7 +684,7 @@ class SignaledSession(OperatingSession):
         del self.preview_dummy_session
         self.preview_dummy_session = DummySession(self.root)
         self.preview_dummy_session.ray_server_get_session_preview(
-            path, args, src_addr, self._folder_sizes_and_dates)
+            path, args, src_addr, self.folder_size_calculator)
 
     def _ray_server_set_option(self, path, args, src_addr):
         option = args[0]
@@ -1202,20 +1173,26 @@ class SignaledSession(OperatingSession):
         auto_snapshot = not self.snapshoter.is_auto_snapshot_prevented()
         self.send_gui('/ray/gui/session/auto_snapshot', int(auto_snapshot))
 
-        snapshots = self.snapshoter.list(client_id)
+        offset = 0
+        count = 0
+        if len(args) >= 2:
+            offset, count = args[:2]
+
+        snapshots = self.snapshoter.list(client_id, max(offset, 0),
+                                         max(count, 0))
 
         i = 0
         snap_send = []
 
         for snapshot in snapshots:
+            snap_send.append(snapshot)
+            i += 1
+
             if i == 20:
                 self.send(src_addr, '/reply', path, *snap_send)
 
                 snap_send.clear()
                 i = 0
-            else:
-                snap_send.append(snapshot)
-                i += 1
 
         if snap_send:
             self.send(src_addr, '/reply', path, *snap_send)
@@ -1601,7 +1578,7 @@ class SignaledSession(OperatingSession):
                 "client is not running, impossible to get its pid")
 
     def _ray_client_list_snapshots(self, path, args, src_addr):
-        self._ray_session_list_snapshots(path, [], src_addr, args[0])
+        self._ray_session_list_snapshots(path, args[1:], src_addr, args[0])
 
     @session_operation
     def _ray_client_open_snapshot(self, path, args, src_addr):
@@ -1894,12 +1871,12 @@ class DummySession(OperatingSession):
         self.next_function()
     
     def ray_server_get_session_preview(self, path, args, src_addr,
-                                       folder_sizes:list):
+                                       size_calculator):
         session_name = args[0]
         self.steps_order = [(self.preload, session_name, False),
                             self.take_place,
                             self.load,
-                            (self.send_preview, src_addr, folder_sizes)]
+                            (self.send_preview, src_addr, size_calculator)]
         self.next_function()
     
     def dummy_load(self, session_name):
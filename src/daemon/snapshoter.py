@@ -1,7 +1,8 @@
 
+import json
 import os
 import socket
-from PyQt5.QtCore import QProcess, QObject, QDateTime
+from PyQt5.QtCore import QProcess, QObject, QDateTime, QTimer
 from PyQt5.QtXml import QDomDocument
 
 import ray
@@ -23,6 +24,17 @@ def full_ref_for_gui(ref, name, rw_ref, rw_name='', ss_name=''):
     return "%s:%s\n%s:%s" % (ref, name, rw_ref, rw_name)
 
 
+class HistoryEntry:
+    ref = ''
+    name = ''
+    rw_ref = ''
+    session_name = ''
+
+    def __init__(self):
+        # dict client_id -> list of client files
+        self.client_files = {}
+
+
 class Snapshoter(QObject):
     def __init__(self, session):
         QObject.__init__(self)
@@ -31,6 +43,7 @@ class Snapshoter(QObject):
         self._gitdir = '.ray-snapshots'
         self._exclude_path = 'info/exclude'
         self._history_path = "session_history.xml"
+        self._files_cache_path = "files_cache.json"
         self._max_file_size = 50 #in Mb
 
         self._next_snapshot_name = ''
@@ -39,23 +52,74 @@ class Snapshoter(QObject):
         self._changes_checker = QProcess()
         self._changes_checker.readyReadStandardOutput.connect(
             self._changes_checker_standard_output)
+        self._changes_checker.finished.connect(
+            self._changes_checker_finished)
 
         self._adder_process = QProcess()
-        self._adder_process.finished.connect(self._save_step_1)
+        self._adder_process.finished.connect(self._adder_process_finished)
         self._adder_process.readyReadStandardOutput.connect(
             self._adder_standard_output)
+        if ray.QT_VERSION >= (5, 6):
+            self._adder_process.errorOccurred.connect(
+                self._adder_process_error)
 
         self._adder_aborted = False
+        self._adder_buffer = b''
+        self._adder_incremental = False
+
+        self._ignore_checker = QProcess()
+        self._ignore_checker.finished.connect(self._ignore_checker_finished)
+
+        if ray.QT_VERSION >= (5, 6):
+            self._changes_checker.errorOccurred.connect(
+                self._changes_checker_error)
+            self._ignore_checker.errorOccurred.connect(
+                self._ignore_checker_error)
+
+        # changes are counted asynchronously, functions waiting the count
+        self._changes_waiters = []
+        self._changes_candidates = []
+        self._changes_failed = False
+
+        self._changes_timer = QTimer()
+        self._changes_timer.setSingleShot(True)
+        self._changes_timer.timeout.connect(self._changes_timer_timeout)
 
         self._git_process = QProcess()
         self._git_process.readyReadStandardOutput.connect(self._standard_output)
         self._git_process.readyReadStandardError.connect(self._standard_error)
+        self._git_process.finished.connect(self._git_process_finished)
+        if ray.QT_VERSION >= (5, 6):
+            self._git_process.errorOccurred.connect(self._git_process_error)
         self._git_command = ''
 
+        # git commands waiting to be run one after the other,
+        # without blocking the event loop
+        self._git_jobs = []
+        self._git_jobs_path = ''
+        self._git_jobs_next = None
+        self._git_timed_out = False
+
+        self._git_timer = QTimer()
+        self._git_timer.setSingleShot(True)
+        self._git_timer.timeout.connect(self._git_timer_timeout)
+
         self._n_file_changed = 0
         self._n_file_treated = 0
+        self._n_file_staged = 0
         self._changes_counted = False
 
+        # relative path -> [size, mtime_ns, is_link] of all session files
+        # at last scan. _changed_paths is None when we don't know
+        # which paths changed since last snapshot.
+        self._scanned_files = {}
+        self._changed_paths = None
+
+        # parsed history, only re-read when history file changes
+        self._history_key = None
+        self._history = []
+        self._history_lists = {}
+
         self._next_function = None
         self._error_function = None
 
@@ -67,6 +131,13 @@ class Snapshoter(QObject):
         standard_output = self._adder_process.readAllStandardOutput().data()
         Terminal.snapshoter_message(standard_output, ' add -A -v')
 
+        # count really staged files, a line can be cut between two reads
+        lines = (self._adder_buffer + standard_output).split(b'\n')
+        self._adder_buffer = lines.pop()
+        for line in lines:
+            if line.startswith((b"add '", b"remove '")):
+                self._n_file_staged += 1
+
         if not self._n_file_changed:
             return
 
@@ -83,31 +154,75 @@ class Snapshoter(QObject):
         standard_output = self._git_process.readAllStandardOutput().data()
         Terminal.snapshoter_message(standard_output, self._git_command)
 
-    def _run_git_process(self, *all_args):
-        return self._run_git_process_at(self.session.path, *all_args)
+    def _get_git_timeout(self)->int:
+        ''' returns the timeout in ms for a git command,
+            it grows with the number of session files
+            and the number of staged files. '''
+        return 2000 + len(self._scanned_files) + 20 * self._n_file_staged
+
+    def _run_git_jobs(self, jobs: list, next_function, spath=''):
+        ''' run git commands (list of args tuples) one after the other.
+            next_function is called when all commands succeed,
+            else self._error_function is called. '''
+        self._git_jobs = list(jobs)
+        self._git_jobs_path = spath if spath else self.session.path
+        self._git_jobs_next = next_function
+        self._run_next_git_job()
+
+    def _run_next_git_job(self):
+        if not self._git_jobs:
+            next_function = self._git_jobs_next
+            self._git_jobs_next = None
+            if next_function is not None:
+                next_function()
+            return
+
+        all_args = self._git_jobs.pop(0)
 
-    def _run_git_process_at(self, spath, *all_args):
         self._git_command = ''
         for arg in all_args:
             self._git_command += ' %s' % arg
 
+        self._git_timed_out = False
+        self._git_timer.start(self._get_git_timeout())
+        self._git_process.start(
+            self._git_exec,
+            self._get_git_command_list_at(self._git_jobs_path, *all_args))
+
+    def _git_jobs_error(self, err):
+        self._git_jobs.clear()
+        self._git_jobs_next = None
+
+        if self._error_function:
+            self._error_function(err, self._git_command.strip())
+
+    def _git_timer_timeout(self):
+        self._git_timed_out = True
+        self._git_process.kill()
+
+    def _git_process_error(self, error):
+        if error == QProcess.FailedToStart:
+            # finished signal will not be emitted
+            self._git_timer.stop()
+            self._git_jobs_error(ray.Err.SUBPROCESS_CRASH)
+
+    def _git_process_finished(self, exit_code, exit_status):
+        self._git_timer.stop()
+
         err = ray.Err.OK
 
-        git_args = self._get_git_command_list_at(spath, *all_args)
-        self._git_process.start(self._git_exec, git_args)
-        if not self._git_process.waitForFinished(2000):
-            self._git_process.kill()
+        if self._git_timed_out:
             err = ray.Err.SUBPROCESS_UNTERMINATED
-        else:
-            if self._git_process.exitStatus():
-                err = ray.Err.SUBPROCESS_CRASH
-            elif self._git_process.exitCode():
-                err = ray.Err.SUBPROCESS_EXITCODE
+        elif exit_status:
+            err = ray.Err.SUBPROCESS_CRASH
+        elif exit_code:
+            err = ray.Err.SUBPROCESS_EXITCODE
 
-        if err and self._error_function:
-            self._error_function(err, ' '.join(all_args))
+        if err:
+            self._git_jobs_error(err)
+            return
 
-        return not bool(err)
+        self._run_next_git_job()
 
     def _get_git_command_list(self, *args):
         return self._get_git_command_list_at(self.session.path, *args)
@@ -143,6 +258,59 @@ class Snapshoter(QObject):
 
         return SNS_xml
 
+    def _update_history(self)->bool:
+        ''' parse history file if it changed since last parse.
+            returns False if there is no history. '''
+        try:
+            stat = os.stat(self._get_history_full_path())
+        except BaseException:
+            self._history_key = None
+            self._history.clear()
+            self._history_lists.clear()
+            return False
+
+        history_key = (self._get_history_full_path(),
+                       stat.st_mtime_ns, stat.st_size)
+        if history_key == self._history_key:
+            return bool(self._history_key is not None and self._history)
+
+        self._history_key = history_key
+        self._history.clear()
+        self._history_lists.clear()
+
+        SNS_xml = self._get_history_xml_document_element()
+        if not SNS_xml:
+            return False
+
+        nodes = SNS_xml.childNodes()
+
+        for i in range(nodes.count()):
+            node = nodes.at(i)
+            el = node.toElement()
+
+            entry = HistoryEntry()
+            entry.ref = el.attribute('ref')
+            entry.name = el.attribute('name')
+            entry.rw_ref = el.attribute('rewind_snapshot')
+            entry.session_name = el.attribute('session_name')
+
+            client_nodes = node.childNodes()
+            for j in range(client_nodes.count()):
+                client_node = client_nodes.at(j)
+                client_el = client_node.toElement()
+                client_files = entry.client_files.setdefault(
+                    client_el.attribute('client_id'), [])
+
+                file_nodes = client_node.childNodes()
+                for k in range(file_nodes.count()):
+                    file_path = file_nodes.at(k).toElement().attribute('path')
+                    if file_path:
+                        client_files.append(file_path)
+
+            self._history.append(entry)
+
+        return bool(self._history)
+
     def _get_tag_date(self)->str:
         date_time = QDateTime.currentDateTimeUtc()
         date = date_time.date()
@@ -211,9 +379,81 @@ class Snapshoter(QObject):
         return "%s/%s/%s" % (
                         self.session.path, self._gitdir, self._exclude_path)
 
+    def _get_files_cache_full_path(self)->str:
+        return "%s/%s/%s" % (
+                        self.session.path, self._gitdir, self._files_cache_path)
+
+    def _scan_files(self)->dict:
+        ''' returns a dict with relative path as key and
+            [size, mtime_ns, is_link] as value for all session files. '''
+        files = {}
+        git_dir = "%s/%s" % (self.session.path, self._gitdir)
+        folders = [self.session.path]
+
+        while folders:
+            folder = folders.pop()
+            try:
+                with os.scandir(folder) as it:
+                    for entry in it:
+                        if entry.is_dir(follow_symlinks=False):
+                            if entry.path != git_dir:
+                                folders.append(entry.path)
+                            continue
+
+                        # symlinks to dirs are not followed, as os.walk does
+                        if entry.is_symlink() and entry.is_dir():
+                            continue
+
+                        try:
+                            stat = entry.stat(follow_symlinks=False)
+                        except OSError:
+                            continue
+
+                        rel_path = entry.path.replace(
+                            self.session.path + '/', '', 1)
+                        files[rel_path] = [stat.st_size, stat.st_mtime_ns,
+                                           entry.is_symlink()]
+            except OSError:
+                continue
+
+        return files
+
+    def _read_files_cache(self):
+        try:
+            with open(self._get_files_cache_full_path(), 'r') as cache_file:
+                files_cache = json.load(cache_file)
+        except BaseException:
+            return None
+
+        if not isinstance(files_cache, dict):
+            return None
+
+        return files_cache
+
+    def _write_files_cache(self):
+        try:
+            with open(self._get_files_cache_full_path(), 'w') as cache_file:
+                json.dump(self._scanned_files, cache_file)
+        except BaseException:
+            # no cache means next snapshot will check all files
+            pass
+
+    def _remove_files_cache(self):
+        try:
+            os.remove(self._get_files_cache_full_path())
+        except BaseException:
+            pass
+
     def _write_exclude_file(self)->int:
         file_path = self._get_exclude_file_full_path()
 
+        try:
+            exclude_file = open(file_path, 'r')
+            old_contents = exclude_file.read()
+            exclude_file.close()
+        except BaseException:
+            old_contents = ''
+
         try:
             exclude_file = open(file_path, 'w')
         except:
@@ -276,44 +516,23 @@ class Snapshoter(QObject):
         contents += '\n'
         contents += "# Too big Files\n"
 
-        no_check_list = (self._gitdir)
         # check too big files
-        for foldername, subfolders, filenames in os.walk(self.session.path):
-            subfolders[:] = [d for d in subfolders if d not in no_check_list]
-
-            if foldername == "%s/%s" % (self.session.path, self._gitdir):
+        for rel_path, file_stat in sorted(self._scanned_files.items()):
+            size, mtime_ns, is_link = file_stat
+
+            if rel_path.endswith(session_ign_list):
+                if is_link:
+                    contents += '!%s\n' % git_stringer(rel_path)
+                # file with extension globally ignored but
+                # unignored by its client will not be ignored
+                # and that is well as this.
                 continue
 
-            for filename in filenames:
-                if filename.endswith(session_ign_list):
-                    if os.path.islink(filename):
-                        short_folder = foldername.replace(
-                                        self.session.path + '/', '', 1)
-                        line = git_stringer("%s/%s" % (short_folder, filename))
-                        contents += '!%s\n' % line
-                    # file with extension globally ignored but
-                    # unignored by its client will not be ignored
-                    # and that is well as this.
-                    continue
-
-                if os.path.islink(filename):
-                    continue
-
-                try:
-                    file_size = os.path.getsize(os.path.join(foldername,
-                                                             filename))
-                except:
-                    continue
-
-                if file_size > self._max_file_size*1024**2:
-                    if foldername == self.session.path:
-                        line = git_stringer(filename)
-                    else:
-                        short_folder = foldername.replace(
-                                        self.session.path + '/', '', 1)
-                        line = git_stringer("%s/%s" % (short_folder, filename))
+            if is_link:
+                continue
 
-                    contents += "%s\n" % line
+            if size > self._max_file_size*1024**2:
+                contents += "%s\n" % git_stringer(rel_path)
 
         try:
             exclude_file.write(contents)
@@ -321,6 +540,12 @@ class Snapshoter(QObject):
         except:
             return ray.Err.CREATE_FAILED
 
+        if contents != old_contents:
+            # ignored files changed, changed paths are not enough
+            self._changed_paths = None
+            self._changes_counted = False
+            self._remove_files_cache()
+
         return ray.Err.OK
 
     def _is_init(self)->bool:
@@ -330,72 +555,88 @@ class Snapshoter(QObject):
         return os.path.isfile("%s/%s/%s" % (
                 self.session.path, self._gitdir, self._exclude_path))
 
-    def _can_save(self):
-        if not self.session.path:
-            return False
-
-        if not self._is_init():
-            if not self._run_git_process('init'):
-                return False
-
-            user_name = os.getenv('USER')
-            if not user_name:
-                user_name = 'someone'
-
-            machine_name = socket.gethostname()
-            if not machine_name:
-                machine_name = 'somewhere'
-
-            if not self._run_git_process(
-                'config', 'user.email', '%s@%s' % (user_name, machine_name)):
-                return False
-
-            user_name = os.getenv('USER')
-            if not user_name:
-                user_name = 'someone'
+    def _get_init_jobs(self)->list:
+        if self._is_init():
+            return []
 
-            if not self._run_git_process('config', 'user.name', user_name):
-                return False
+        user_name = os.getenv('USER')
+        if not user_name:
+            user_name = 'someone'
 
-        if not self._is_init():
-            return False
+        machine_name = socket.gethostname()
+        if not machine_name:
+            machine_name = 'somewhere'
 
-        return True
+        return [('init',),
+                ('config', 'user.email', '%s@%s' % (user_name, machine_name)),
+                ('config', 'user.name', user_name)]
 
     def _error_quit(self, err):
         if self._error_function:
             self._error_function(err)
         self._error_function = None
 
+    def _adder_process_error(self, error):
+        if error == QProcess.FailedToStart:
+            # finished signal will not be emitted
+            self._error_quit(ray.Err.SUBPROCESS_CRASH)
+
+    def _adder_process_finished(self, exit_code, exit_status):
+        if (exit_code and not exit_status and not self._adder_aborted
+                and self._adder_incremental):
+            # a path may have been removed since scan,
+            # or git is too old for --pathspec-from-file (git < 2.25).
+            self._start_adder(None)
+            return
+
+        if not self._adder_aborted:
+            # files not staged must not be written in files cache,
+            # else they would not be snapshoted until they change again.
+            if exit_status:
+                self._error_quit(ray.Err.SUBPROCESS_CRASH)
+                return
+
+            if exit_code:
+                self._error_quit(ray.Err.SUBPROCESS_EXITCODE)
+                return
+
+        self._save_step_1()
+
     def _save_step_1(self):
         if self._adder_aborted:
             if self._next_function:
                 self._next_function(aborted=True)
             return
 
-        if self._n_file_changed:
-            if not self._run_git_process('commit', '-m', 'ray'):
-                return
-
+        jobs = []
+        ref = ''
 
+        if self._n_file_staged:
+            jobs.append(('commit', '-m', 'ray'))
 
-        if (self._n_file_changed
+        if (self._n_file_staged
                 or self._next_snapshot_name or self._rw_snapshot):
             ref = self._get_tag_date()
+            jobs.append(('tag', '-a', ref, '-m', 'ray'))
 
-            if not self._run_git_process('tag', '-a', ref, '-m', 'ray'):
-                return
+        self._run_git_jobs(jobs, lambda: self._save_step_2(ref))
 
+    def _save_step_2(self, ref: str):
+        if ref:
             err = self._write_history_file(ref, self._next_snapshot_name,
                                     self._rw_snapshot)
             if err:
                 if self._error_function:
                     self._error_function(err)
 
-            # not really a reply, not strong.
-            self.session.send_gui('/reply', '/ray/session/list_snapshots',
+            # not a reply, GUI snapshots list pages are not affected
+            self.session.send_gui('/ray/gui/session/snapshot_added',
                                 full_ref_for_gui(ref, self._next_snapshot_name,
                                             self._rw_snapshot))
+
+        # next snapshot will only check files changed since now
+        self._write_files_cache()
+
         self._error_function = None
         self._next_snapshot_name = ''
         self._rw_snapshot = ''
@@ -403,44 +644,50 @@ class Snapshoter(QObject):
         if self._next_function:
             self._next_function()
 
-    def list(self, client_id=""):
-        SNS_xml = self._get_history_xml_document_element()
-        if not SNS_xml:
+    def list(self, client_id="", offset=0, count=0)->list:
+        ''' returns snapshots, the most recent first.
+            if count is set, returns only count snapshots from offset. '''
+        if not self._update_history():
             return []
 
-        nodes = SNS_xml.childNodes()
+        filter_prefix = False
+        if client_id:
+            client = self.session.get_client(client_id)
+            filter_prefix = bool(
+                client and client.prefix_mode == ray.PrefixMode.SESSION_NAME)
+
+        list_key = (client_id, self.session.name, filter_prefix)
+        all_tags = self._history_lists.get(list_key)
 
+        if all_tags is None:
+            all_tags = self._make_list(client_id, filter_prefix)
+            self._history_lists[list_key] = all_tags
+
+        if count:
+            return all_tags[offset:offset+count]
+        return all_tags[offset:]
+
+    def _make_list(self, client_id: str, filter_prefix: bool)->list:
         all_tags = []
-        all_snaps = []
+        # ref -> name of snapshots listed before, rewind snapshot name
+        # is only searched in them.
+        listed_names = {}
         prv_session_name = self.session.name
 
-        for i in range(nodes.count()):
-            node = nodes.at(i)
-            el = node.toElement()
-
-            if client_id:
-                client_nodes = node.childNodes()
-                for j in range(client_nodes.count()):
-                    client_node = client_nodes.at(j)
-                    client_el = client_node.toElement()
-                    if client_el.attribute('client_id') == client_id:
-                        break
-                else:
-                    continue
+        for entry in self._history:
+            if client_id and not client_id in entry.client_files:
+                continue
 
-            ref = el.attribute('ref')
-            name = el.attribute('name')
-            rw_sn = el.attribute('rewind_snapshot')
+            ref = entry.ref
+            name = entry.name
+            rw_sn = entry.rw_ref
             rw_name = ""
-            session_name = el.attribute('session_name')
+            session_name = entry.session_name
 
             # don't list snapshot from client before session renamed
-            if client_id and session_name != self.session.name:
-                client = self.session.get_client(client_id)
-                if (client
-                        and (client.prefix_mode
-                             == ray.PrefixMode.SESSION_NAME)):
-                    continue
+            if (client_id and session_name != self.session.name
+                    and filter_prefix):
+                continue
 
             ss_name = ""
             if session_name != prv_session_name:
@@ -458,38 +705,138 @@ class Snapshoter(QObject):
                 rw_sn = ""
 
             if rw_sn:
-                for snap in all_snaps:
-                    if snap[0] == rw_sn and not '\n' in snap[1]:
-                        rw_name = snap[1]
-                        break
+                rw_name = listed_names.get(rw_sn, '')
 
-            all_snaps.append((ref, name))
-            snapsss = full_ref_for_gui(ref, name, rw_sn, rw_name, ss_name)
-            all_tags.append(snapsss)
+            listed_names.setdefault(ref, name)
+            all_tags.append(
+                full_ref_for_gui(ref, name, rw_sn, rw_name, ss_name))
 
         all_tags.reverse()
         return all_tags
 
-    def has_changes(self):
-        if not self.session.path:
-            return False
+    def _count_changes(self, next_function):
+        ''' count changed files without blocking the event loop,
+            next_function is called once changes are counted. '''
+        self._changes_waiters.append(next_function)
+        if len(self._changes_waiters) > 1:
+            # a count is already running, wait for it
+            return
 
-        if not self._is_init():
-            return True
+        self._n_file_changed = 0
+        self._n_file_treated = 0
+        self._changes_counted = True
+        self._changes_failed = False
+
+        files_cache = self._read_files_cache()
+
+        if files_cache is None:
+            # we don't know what changed, ask git for the whole tree
+            self._changed_paths = None
+
+            args = self._get_git_command_list(
+                'ls-files', '--exclude-standard', '--others', '--modified')
+            self._changes_timer.start(self._get_git_timeout())
+            self._changes_checker.start(self._git_exec, args)
+            # self._changes_checker.finished is connected to
+            # self._changes_checker_finished
+            return
+
+        changed_paths = [path for path, file_stat in self._scanned_files.items()
+                         if files_cache.get(path) != file_stat]
+        changed_paths += [path for path in files_cache
+                          if path not in self._scanned_files]
+
+        if not changed_paths:
+            self._changes_candidates = []
+            self._ignore_checker_finished(0, QProcess.NormalExit)
+            return
 
+        if any(os.path.basename(p) == '.gitignore' for p in changed_paths):
+            # files with unchanged stats may be un-ignored now,
+            # 'git add -A' will be run on the whole tree.
+            self._changed_paths = None
+            self._n_file_changed = len(changed_paths)
+            self._changes_counted_done()
+            return
+
+        # remove paths ignored by git
+        self._changes_candidates = changed_paths
+        self._changes_timer.start(self._get_git_timeout())
+        self._ignore_checker.start(
+            self._git_exec,
+            self._get_git_command_list('check-ignore', '--stdin', '-z'))
+        self._ignore_checker.write(
+            b'\0'.join([os.fsencode(p) for p in changed_paths]) + b'\0')
+        self._ignore_checker.closeWriteChannel()
+        # self._ignore_checker.finished is connected to
+        # self._ignore_checker_finished
+
+    def _changes_timer_timeout(self):
+        self._changes_failed = True
         if self._changes_checker.state():
             self._changes_checker.kill()
+        if self._ignore_checker.state():
+            self._ignore_checker.kill()
+
+    def _changes_checker_error(self, error):
+        if error == QProcess.FailedToStart:
+            # finished signal will not be emitted
+            self._changes_checker_finished(0, QProcess.CrashExit)
+
+    def _ignore_checker_error(self, error):
+        if error == QProcess.FailedToStart:
+            # finished signal will not be emitted
+            self._ignore_checker_finished(0, QProcess.CrashExit)
+
+    def _changes_checker_finished(self, exit_code, exit_status):
+        if exit_status or exit_code or self._changes_failed:
+            # we don't know, consider there are changes,
+            # 'git add -A' will be run on the whole tree.
+            self._n_file_changed = max(self._n_file_changed, 1)
+
+        self._changes_counted_done()
+
+    def _ignore_checker_finished(self, exit_code, exit_status):
+        changed_paths = self._changes_candidates
+        self._changes_candidates = []
+
+        # check-ignore exits with 1 if no path is ignored
+        if (changed_paths and not exit_status and exit_code in (0, 1)
+                and not self._changes_failed):
+            ignored = set(
+                os.fsdecode(self._ignore_checker.readAllStandardOutput().data(
+                    )).split('\0'))
+            changed_paths = [p for p in changed_paths if p not in ignored]
+
+        self._changed_paths = changed_paths
+        self._n_file_changed = len(changed_paths)
+        self._changes_counted_done()
+
+    def _changes_counted_done(self):
+        self._changes_timer.stop()
+
+        waiters = self._changes_waiters
+        self._changes_waiters = []
+        for next_function in waiters:
+            next_function()
+
+    def check_changes(self, next_function):
+        ''' calls next_function(has_changes: bool)
+            without blocking the event loop. '''
+        if not self.session.path:
+            next_function(False)
+            return
 
-        self._n_file_changed = 0
-        self._n_file_treated = 0
-        self._changes_counted = True
+        if not self._is_init():
+            next_function(True)
+            return
 
-        args = self._get_git_command_list(
-            'ls-files', '--exclude-standard', '--others', '--modified')
-        self._changes_checker.start(self._git_exec, args)
-        self._changes_checker.waitForFinished(2000)
+        if not self._changes_waiters:
+            # else a count is running, files are already scanned
+            self._scanned_files = self._scan_files()
 
-        return bool(self._n_file_changed)
+        self._count_changes(
+            lambda: next_function(bool(self._n_file_changed)))
 
     def save(self, name='', rewind_snapshot='',
              next_function=None, error_function=None):
@@ -498,87 +845,112 @@ class Snapshoter(QObject):
         self._next_function = next_function
         self._error_function = error_function
 
-        if not self._can_save():
+        if not self.session.path:
+            Terminal.message("can't snapshot")
+            return
+
+        self._run_git_jobs(self._get_init_jobs(), self._save_step_0)
+
+    def _save_step_0(self):
+        if not self._is_init():
             Terminal.message("can't snapshot")
             return
 
+        if not self._changes_counted:
+            self._scanned_files = self._scan_files()
+
         err = self._write_exclude_file()
         if err:
             self._error_quit(err)
             return
 
         self._adder_aborted = False
+        self._adder_buffer = b''
+        self._n_file_staged = 0
 
         if not self._changes_counted:
-            self.has_changes()
+            self._count_changes(self._save_add)
+            return
+
+        self._save_add()
 
+    def _save_add(self):
         self._changes_counted = False
 
-        if self._n_file_changed:
+        if not self._n_file_changed:
+            self._save_step_1()
+            return
+
+        changed_paths = self._changed_paths
+        if changed_paths is not None:
+            # git fails on a pathspec matching nothing,
+            # keep only existing paths and paths snapshoted before.
+            files_cache = self._read_files_cache()
+            if files_cache is None:
+                changed_paths = None
+            else:
+                changed_paths = [
+                    p for p in changed_paths
+                    if p in files_cache or os.path.lexists(
+                        os.path.join(self.session.path, p))]
+
+        if changed_paths is not None and not changed_paths:
+            self._save_step_1()
+            return
+
+        self._start_adder(changed_paths)
+
+    def _start_adder(self, changed_paths):
+        ''' stage changed_paths, or all the session tree
+            if changed_paths is None. '''
+        self._adder_buffer = b''
+        self._n_file_staged = 0
+        self._n_file_treated = 0
+        self._adder_incremental = changed_paths is not None
+
+        if changed_paths is None:
             all_args = self._get_git_command_list('add', '-A', '-v')
             self._adder_process.start(self._git_exec, all_args)
         else:
-            self._save_step_1()
+            # stage only changed paths, given on stdin
+            all_args = self._get_git_command_list(
+                '--literal-pathspecs', 'add', '-A', '-v',
+                '--pathspec-from-file=-', '--pathspec-file-nul')
+            self._adder_process.start(self._git_exec, all_args)
+            self._adder_process.write(
+                b'\0'.join([os.fsencode(p) for p in changed_paths]) + b'\0')
+            self._adder_process.closeWriteChannel()
 
-        # self.adder_process.finished is connected to self._save_step_1
+        # self.adder_process.finished is connected to
+        # self._adder_process_finished
 
-    def load(self, spath, snapshot, error_function):
+    def load(self, spath, snapshot, next_function, error_function):
         self._error_function = error_function
 
         snapshot_ref = snapshot.partition('\n')[0].partition(':')[0]
 
-        if not self._run_git_process_at(spath, 'reset', '--hard'):
-            return False
-
-        if not self._run_git_process_at(spath, 'checkout', snapshot_ref):
-            return False
-        return True
+        self._run_git_jobs([('reset', '--hard'),
+                            ('checkout', snapshot_ref)],
+                           next_function, spath)
 
-    def load_client_exclusive(self, client_id, snapshot, error_function):
+    def load_client_exclusive(self, client_id, snapshot,
+                              next_function, error_function):
         self._error_function = error_function
 
-        SNS_xml = self._get_history_xml_document_element()
-        if not SNS_xml:
+        if not self._update_history():
             self._error_function(ray.Err.NO_SUCH_FILE,
                                 self._get_history_full_path())
-            return False
-
-        nodes = SNS_xml.childNodes()
+            return
 
         client_path_list = []
 
-        for i in range(nodes.count()):
-            node = nodes.at(i)
-            el = node.toElement()
-
-            if el.attribute('ref') != snapshot:
-                continue
-
-            client_nodes = node.childNodes()
-
-            for j in range(client_nodes.count()):
-                client_node = client_nodes.at(j)
-                client_el = client_node.toElement()
-
-                if client_el.attribute('client_id') != client_id:
-                    continue
-
-                file_nodes = client_node.childNodes()
-
-                for k in range(file_nodes.count()):
-                    file_node = file_nodes.at(k)
-                    file_el = file_node.toElement()
-                    file_path = file_el.attribute('path')
-                    if file_path:
-                        client_path_list.append(file_path)
-
-        if not self._run_git_process('reset', '--hard'):
-            return False
+        for entry in self._history:
+            if entry.ref == snapshot:
+                client_path_list += entry.client_files.get(client_id, [])
 
-        if not self._run_git_process('checkout', snapshot, '--',
-                                  *client_path_list):
-            return False
-        return True
+        self._run_git_jobs([('reset', '--hard'),
+                            ('checkout', snapshot, '--', *client_path_list)],
+                           next_function)
 
     def abort(self):
         if not self._adder_process.state():
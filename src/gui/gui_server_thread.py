@@ -3,7 +3,7 @@ import sys
 import liblo
 
 import ray
-from gui_tools import CommandLineArgs
+from gui_tools import CommandLineArgs, RS
 
 _instance = None
 
@@ -31,6 +31,17 @@ def ray_method(path, types):
     return decorated
 
 
+class GuiBulkServerThread(liblo.ServerThread):
+    ''' TCP server receiving the same messages than GuiServerThread.
+        Daemon and patchbay daemon send it big amounts of data
+        (patchbay, canvas positions, session preview) in bundles,
+        without UDP packet loss, so without slowing down the sends. '''
+    def __init__(self, gui_server):
+        liblo.ServerThread.__init__(self, proto=liblo.TCP, reg_methods=False)
+        # messages are treated by the methods of the UDP server
+        self.register_methods(gui_server)
+
+
 class GuiServerThread(liblo.ServerThread):
     def __init__(self):
         liblo.ServerThread.__init__(self)
@@ -40,6 +51,16 @@ class GuiServerThread(liblo.ServerThread):
 
         self.patchbay_addr = None
 
+        # opt-in TCP server for bulk transfers
+        self.bulk_server = None
+        if RS.settings.value('network/tcp_bulk_transfers', False, type=bool):
+            try:
+                self.bulk_server = GuiBulkServerThread(self)
+            except liblo.ServerError as e:
+                sys.stderr.write(
+                    'unable to start TCP server for bulk transfers: %s\n'
+                    % str(e))
+
         # Try to prevent impossibility to stop server
         # while receiving messages
         self.stopping = False
@@ -47,12 +68,20 @@ class GuiServerThread(liblo.ServerThread):
         self._parrallel_copy_id_queue = []
         self._parrallel_new_session_name = ''
 
+    def start(self):
+        liblo.ServerThread.start(self)
+        if self.bulk_server is not None:
+            self.bulk_server.start()
+
     def stop(self):
         self.stopping = True
 
         if self.patchbay_addr:
             self.send(self.patchbay_addr, '/ray/patchbay/gui_disannounce')
 
+        if self.bulk_server is not None:
+            self.bulk_server.stop()
+
         liblo.ServerThread.stop(self)
 
     def finish_init(self, session):
@@ -126,9 +155,15 @@ class GuiServerThread(liblo.ServerThread):
             ('/ray/gui/patchbay/server_lose', ''),
             ('/ray/gui/patchbay/fast_temp_file_memory', 's'),
             ('/ray/gui/patchbay/fast_temp_file_running', 's'),
+            ('/ray/gui/patchbay/fast_temp_file_shared', 'si'),
+            ('/ray/gui/patchbay/sequence', 'i'),
+            ('/ray/gui/patchbay/sequence_reset', 'i'),
             ('/ray/gui/patchbay/client_name_and_uuid', 'sh')):
                 self.add_method(path_types[0], path_types[1],
                                 self._generic_callback)
+                if self.bulk_server is not None:
+                    self.bulk_server.add_method(
+                        path_types[0], path_types[1], self._generic_callback)
 
     @staticmethod
     def instance():
@@ -246,6 +281,10 @@ class GuiServerThread(liblo.ServerThread):
     def _session_auto_snapshot(self, path, args, types, src_addr):
         self.signaler.reply_auto_snapshot.emit(bool(args[0]))
 
+    @ray_method('/ray/gui/session/snapshot_added', 's')
+    def _session_snapshot_added(self, path, args, types, src_addr):
+        self.signaler.snapshot_added.emit(args[0])
+
     @ray_method('/ray/gui/session/sort_clients', None)
     def _session_sort_clients(self, path, args, types, src_addr):
         if not ray.types_are_all_strings(types):
@@ -308,6 +347,11 @@ class GuiServerThread(liblo.ServerThread):
         if not NSM_URL:
             NSM_URL = ""
 
+        if self.bulk_server is not None:
+            # daemon has to know it before the announce
+            self.send(self.daemon_manager.address, '/ray/server/gui_bulk_url',
+                      self.bulk_server.url)
+
         self.send(self.daemon_manager.address, '/ray/server/gui_announce',
                   ray.VERSION, int(CommandLineArgs.under_nsm),
                   NSM_URL, os.getpid(),
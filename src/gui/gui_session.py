@@ -130,6 +130,17 @@ class Session:
         for client in self.client_list:
             client.widget.set_daemon_options(options)
 
+# patchbay messages sent in bundles with a sequence number,
+# ignored while the patchbay manager waits for the full graph.
+PATCHBAY_DELTA_PATHS = frozenset((
+    '/ray/gui/patchbay/port_added',
+    '/ray/gui/patchbay/port_removed',
+    '/ray/gui/patchbay/port_renamed',
+    '/ray/gui/patchbay/connection_added',
+    '/ray/gui/patchbay/connection_removed',
+    '/ray/gui/patchbay/metadata_updated'))
+
+
 class SignaledSession(Session):
     def __init__(self):
         Session.__init__(self)
@@ -147,6 +158,10 @@ class SignaledSession(Session):
         self.preview_size = -1
 
     def _osc_receive(self, path, args):
+        if (path in PATCHBAY_DELTA_PATHS
+                and self.patchbay_manager.deltas_ignored):
+            return
+
         func_path = path
         func_name = func_path.replace('/', '_')
 
@@ -462,6 +477,8 @@ class SignaledSession(Session):
 
     def _ray_gui_preview_session_size(self, path, args):
         self.preview_size = args[0]
+        # size can be updated after the preview reply
+        self.signaler.session_preview_size.emit(self.preview_size)
 
     def _ray_gui_script_info(self, path, args):
         text = args[0]
@@ -536,3 +553,12 @@ class SignaledSession(Session):
 
     def _ray_gui_patchbay_fast_temp_file_running(self, path, args):
         self.patchbay_manager.fast_temp_file_running(*args)
+
+    def _ray_gui_patchbay_fast_temp_file_shared(self, path, args):
+        self.patchbay_manager.fast_temp_file_shared(*args)
+
+    def _ray_gui_patchbay_sequence(self, path, args):
+        self.patchbay_manager.sequence(*args)
+
+    def _ray_gui_patchbay_sequence_reset(self, path, args):
+        self.patchbay_manager.sequence_reset(*args)
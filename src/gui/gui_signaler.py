@@ -15,6 +15,7 @@ class Signaler(QObject):
     user_client_template_found = pyqtSignal(list)
     factory_client_template_found = pyqtSignal(list)
     snapshots_found = pyqtSignal(list)
+    snapshot_added = pyqtSignal(str)
     reply_auto_snapshot = pyqtSignal(bool)
     server_progress = pyqtSignal(float)
     client_progress = pyqtSignal(str, float)
@@ -30,6 +31,7 @@ class Signaler(QObject):
     root_changed = pyqtSignal(str)
 
     session_preview_update = pyqtSignal()
+    session_preview_size = pyqtSignal('qint64')
     session_details = pyqtSignal(str, int, int, int)
     scripted_dir = pyqtSignal(str, int)
     parrallel_copy_state = pyqtSignal(int, int)
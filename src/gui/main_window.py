@@ -485,6 +485,10 @@ class MainWindow(QMainWindow):
             'Canvas/prevent_overlap', True, type=bool)
         options.max_port_width = RS.settings.value(
             'Canvas/max_port_width', 160, type=int)
+        options.low_detail_zoom = RS.settings.value(
+            'Canvas/low_detail_zoom', 0.4, type=float)
+        options.straight_lines_zoom = RS.settings.value(
+            'Canvas/straight_lines_zoom', 0.25, type=float)
 
         features = patchcanvas.features_t()
         features.group_info = False
@@ -321,6 +321,8 @@ class OpenSessionDialog(ChildDialog):
         self.signaler.root_changed.connect(self._root_changed)
         self.signaler.session_preview_update.connect(
             self._session_preview_update)
+        self.signaler.session_preview_size.connect(
+            self._session_preview_size)
         self.signaler.session_details.connect(
             self._update_session_details)
         self.signaler.scripted_dir.connect(
@@ -727,7 +729,8 @@ class OpenSessionDialog(ChildDialog):
 
         # do not allow to remove from GUI a too big session
         # totally arbitrary choice : 95.37 Mb
-        if self.session.preview_size >= 100000000:
+        if (self.session.preview_size < 0
+                or self.session.preview_size >= 100000000):
             return
         
         item = self.ui.sessionList.currentItem()
@@ -913,18 +916,31 @@ class OpenSessionDialog(ChildDialog):
         self.main_snap_group.snapshots.clear()
         self._add_snapshots(self.session.preview_snapshots)
         
-        locale = QLocale()
-        self.ui.labelSessionSize.setText(
-            locale.formattedDataSize(self.session.preview_size))
-        
-        # store size in item
+        self._session_preview_size(self.session.preview_size)
+
         item = self.ui.sessionList.currentItem()
         if item is not None:
-            item.setData(COLUMN_NAME, DATA_SIZE, self.session.preview_size)
             self._set_preview_scripted(
                 bool(item.text(COLUMN_SCRIPTS)))
         else:
             self._set_preview_scripted(False)
+
+    def _session_preview_size(self, size: int):
+        if size == -2:
+            # unreadable, see daemon folder_size_calculator
+            self.ui.labelSessionSize.setText(
+                _translate('open_session', 'unreadable'))
+        elif size < 0:
+            # not calculated yet
+            self.ui.labelSessionSize.setText('...')
+        else:
+            self.ui.labelSessionSize.setText(
+                QLocale().formattedDataSize(size))
+        
+        # store size in item
+        item = self.ui.sessionList.currentItem()
+        if item is not None:
+            item.setData(COLUMN_NAME, DATA_SIZE, size)
                 
         self._update_session_menu()
 
@@ -939,7 +955,7 @@ class OpenSessionDialog(ChildDialog):
         allow_remove = False
         remove_title = _translate('session_menu', 'Remove session')
         
-        if session_size is not None:
+        if session_size is not None and session_size >= 0:
             if session_size >= 100000000:
                 remove_title = _translate('session_menu', 'Remove session (too big)')
             else:
@@ -839,17 +839,18 @@ class Group:
         self.portgroups.append(portgroup)
 
     def change_port_types_view(self, port_types_view: int):
+        # items of other port types are only hidden by patchcanvas,
+        # here we just create the items missing in this view.
+        for port in self.ports:
+            if port_types_view & port.type:
+                break
+        else:
+            # no visible ports, nothing to add
+            return
+
         # first add group to canvas if not already
         self.add_to_canvas()
 
-        for portgroup in self.portgroups:
-            if not port_types_view & portgroup.port_type():
-                portgroup.remove_from_canvas()
-
-        for port in self.ports:
-            if not port_types_view & port.type:
-                port.remove_from_canvas()
-
         for port in self.ports:
             if port_types_view & port.type:
                 port.add_to_canvas()
@@ -858,13 +859,6 @@ class Group:
             if port_types_view & portgroup.port_type():
                 portgroup.add_to_canvas()
 
-        # remove group from canvas if no visible ports
-        for port in self.ports:
-            if port.in_canvas:
-                break
-        else:
-            self.remove_from_canvas()
-
     def stereo_detection(self, port):
         if port.type != PORT_TYPE_AUDIO:
             return
@@ -1042,23 +1036,9 @@ class Group:
     def sort_ports_in_canvas(self):
         PatchbayManager.optimize_operation(True)
 
-        conn_list = []
-
-        for conn in PatchbayManager.connections:
-            for port in self.ports:
-                if (port in (conn.port_out, conn.port_in)
-                        and conn not in conn_list):
-                    conn_list.append(conn)
-
-        for connection in conn_list:
-            connection.remove_from_canvas()
-
-        for portgroup in self.portgroups:
-            portgroup.remove_from_canvas()
-
-        for port in self.ports:
-            port.remove_from_canvas()
-
+        # ports, connections and portgroups still valid stay in canvas,
+        # ports are only re-ordered in place
+        old_port_ids = [port.port_id for port in self.ports]
         self.ports.sort()
 
         # search and remove existing portgroups with non consecutive ports
@@ -1201,16 +1181,18 @@ class Group:
                 elif founded_ports:
                     break
 
-        # ok for re-adding all items to canvas
-        for port in self.ports:
-            port.add_to_canvas()
+        # apply the new order in canvas, only if it changed
+        if (self.in_canvas
+                and [port.port_id for port in self.ports] != old_port_ids):
+            patchcanvas.reorderPorts(
+                self.group_id,
+                [port.port_id for port in self.ports if port.in_canvas],
+                fast=PatchbayManager.optimized_operation)
 
+        # add the new portgroups, the kept ones are already in canvas
         for portgroup in self.portgroups:
             portgroup.add_to_canvas()
 
-        for connection in conn_list:
-            connection.add_to_canvas()
-
         PatchbayManager.optimize_operation(False)
         self.redraw_in_canvas()
 
@@ -1242,7 +1224,6 @@ class PatchbayManager:
     port_types_view = PORT_TYPE_AUDIO + PORT_TYPE_MIDI
     optimized_operation = False
     groups = []
-    connections = []
     group_positions = []
     portgroups_memory = []
     _next_portgroup_id = 1
@@ -1266,6 +1247,27 @@ class PatchbayManager:
         self._wait_join_group_ids = []
         self.join_animation_connected = False
 
+        # lookup tables, kept consistent with groups, ports and connections
+        self._groups_by_name = {}
+        self._groups_by_id = {}
+        self._ports_by_name = {}
+        self._ports_by_uuid = {}
+        self._ports_by_id = {}
+        # insertion ordered, also gives self.connections
+        self._connections_by_ports = {}
+
+        # sequence number of the last bundle of changes
+        # received from patchbay daemon
+        self._patchbay_seq = None
+        self._waiting_resync = False
+        self.deltas_ignored = False
+
+    @property
+    def connections(self):
+        ''' connections in their creation order,
+            removing one from _connections_by_ports is O(1). '''
+        return self._connections_by_ports.values()
+
     def finish_init(self):
         self.canvas_menu = CanvasMenu(self)
         self.options_dialog = canvas_options.CanvasOptionsDialog(
@@ -1565,24 +1567,47 @@ class PatchbayManager:
         self.send_to_patchbay_daemon('/ray/patchbay/refresh')
 
     def get_port_from_name(self, port_name: str):
-        for group in self.groups:
-            for port in group.ports:
-                if port.full_name == port_name:
-                    return port
+        return self._ports_by_name.get(port_name)
 
     def get_port_from_uuid(self, uuid:int):
-        for group in self.groups:
-            for port in group.ports:
-                if port.uuid == uuid:
-                    return port
+        return self._ports_by_uuid.get(uuid)
 
     def get_port_from_id(self, group_id: int, port_id: int):
-        for group in self.groups:
-            if group.group_id == group_id:
-                for port in group.ports:
-                    if port.port_id == port_id:
-                        return port
-                break
+        return self._ports_by_id.get((group_id, port_id))
+
+    def get_group_from_name(self, group_name: str):
+        return self._groups_by_name.get(group_name)
+
+    def get_group_from_id(self, group_id: int):
+        return self._groups_by_id.get(group_id)
+
+    def _add_group(self, group):
+        self.groups.append(group)
+        self._groups_by_name[group.name] = group
+        self._groups_by_id[group.group_id] = group
+
+    def _remove_group(self, group):
+        self.groups.remove(group)
+        if self._groups_by_name.get(group.name) is group:
+            del self._groups_by_name[group.name]
+        self._groups_by_id.pop(group.group_id, None)
+
+    def _add_port_to_group(self, port, group):
+        group.add_port(port)
+        self._ports_by_name[port.full_name] = port
+        if port.uuid:
+            self._ports_by_uuid[port.uuid] = port
+        self._ports_by_id[(port.group_id, port.port_id)] = port
+
+    def _remove_port_from_group(self, port, group, port_name: str):
+        ''' port_name is the name port is indexed with,
+            it can differ from port.full_name if a rename is waiting '''
+        group.remove_port(port)
+        if self._ports_by_name.get(port_name) is port:
+            del self._ports_by_name[port_name]
+        if self._ports_by_uuid.get(port.uuid) is port:
+            del self._ports_by_uuid[port.uuid]
+        self._ports_by_id.pop((port.group_id, port.port_id), None)
 
     def get_group_position(self, group_name):
         for gpos in self.group_positions:
@@ -1592,14 +1617,14 @@ class PatchbayManager:
 
         # prevent move to a new position in case of port_types_view change
         # if there is no remembered position for this group in new view
-        for group in self.groups:
-            if group.name == group_name:
-                # copy the group_position
-                gpos = ray.GroupPosition.new_from(
-                    *group.current_position.spread())
-                gpos.port_types_view = self.port_types_view
-                self.group_positions.append(gpos)
-                return gpos
+        group = self.get_group_from_name(group_name)
+        if group is not None:
+            # copy the group_position
+            gpos = ray.GroupPosition.new_from(
+                *group.current_position.spread())
+            gpos.port_types_view = self.port_types_view
+            self.group_positions.append(gpos)
+            return gpos
 
         # group position doesn't already exists, create one
         gpos = ray.GroupPosition()
@@ -1636,9 +1661,15 @@ class PatchbayManager:
 
         self.optimize_operation(False)
 
-        self.connections.clear()
         self.groups.clear()
 
+        self._groups_by_name.clear()
+        self._groups_by_id.clear()
+        self._ports_by_name.clear()
+        self._ports_by_uuid.clear()
+        self._ports_by_id.clear()
+        self._connections_by_ports.clear()
+
         patchcanvas.canvas.scene.clear()
 
         self._next_group_id = 0
@@ -1656,22 +1687,28 @@ class PatchbayManager:
         # because we may create a lot of ports here
         self.optimize_operation(True)
 
-        for connection in self.connections:
-            if (connection.in_canvas
-                    and not port_types_view & connection.port_type()):
-                connection.remove_from_canvas()
+        # Items of hidden port types stay in the canvas,
+        # so going back to a previous view does not re-create them.
+        for port_type, canvas_port_type in (
+                (PORT_TYPE_AUDIO, patchcanvas.PORT_TYPE_AUDIO_JACK),
+                (PORT_TYPE_MIDI, patchcanvas.PORT_TYPE_MIDI_JACK)):
+            patchcanvas.setPortTypeVisible(
+                canvas_port_type, bool(port_types_view & port_type),
+                fast=True)
 
         for group in self.groups:
-            in_canvas = group.in_canvas
             group.change_port_types_view(port_types_view)
-            gpos = self.get_group_position(group.name)
-            group.set_group_position(gpos)
 
         for connection in self.connections:
             if (not connection.in_canvas
                     and port_types_view & connection.port_type()):
                 connection.add_to_canvas()
 
+        # apply the group positions of this view,
+        # once all boxes have their final ports
+        for group in self.groups:
+            group.set_group_position(self.get_group_position(group.name))
+
         self.optimize_operation(False)
         patchcanvas.redrawAllGroups()
         self.session.signaler.port_types_view_changed.emit(
@@ -1698,10 +1735,9 @@ class PatchbayManager:
         return new_dict
 
     def client_name_and_uuid(self, client_name: str, uuid: int):
-        for group in self.groups:
-            if group.name == client_name:
-                group.uuid = uuid
-                break
+        group = self.get_group_from_name(client_name)
+        if group is not None:
+            group.uuid = uuid
 
     def add_port(self, name: str, port_type: int, flags: int, uuid: int):
         port = Port(self._next_port_id, name, port_type, flags, uuid)
@@ -1732,10 +1768,8 @@ class PatchbayManager:
             if port.flags & PORT_IS_PHYSICAL:
                 a2j_group = True
 
-        for group in self.groups:
-            if group.name == group_name:
-                break
-        else:
+        group = self.get_group_from_name(group_name)
+        if group is None:
             # port is an non existing group, create the group
             gpos = self.get_group_position(group_name)
             group = Group(self._next_group_id, group_name, gpos)
@@ -1757,10 +1791,10 @@ class PatchbayManager:
                     break
 
             self._next_group_id += 1
-            self.groups.append(group)
+            self._add_group(group)
             group_is_new = True
 
-        group.add_port(port)
+        self._add_port_to_group(port, group)
         group.graceful_port(port)
 
         if group_is_new and self.port_types_view & port_type:
@@ -1780,23 +1814,24 @@ class PatchbayManager:
         if port is None:
             return
 
-        for group in self.groups:
-            if group.group_id == port.group_id:
-                # remove portgroup first if port is in a portgroup
-                if port.portgroup_id:
-                    for portgroup in group.portgroups:
-                        if portgroup.portgroup_id == port.portgroup_id:
-                            group.portgroups.remove(portgroup)
-                            portgroup.remove_from_canvas()
-                            break
+        group = self.get_group_from_id(port.group_id)
+        if group is None:
+            return
 
-                group.remove_port(port)
-                port.remove_from_canvas()
+        # remove portgroup first if port is in a portgroup
+        if port.portgroup_id:
+            for portgroup in group.portgroups:
+                if portgroup.portgroup_id == port.portgroup_id:
+                    group.portgroups.remove(portgroup)
+                    portgroup.remove_from_canvas()
+                    break
 
-                if not group.ports:
-                    group.remove_from_canvas()
-                    self.groups.remove(group)
-                break
+        self._remove_port_from_group(port, group, name)
+        port.remove_from_canvas()
+
+        if not group.ports:
+            group.remove_from_canvas()
+            self._remove_group(group)
 
     def rename_port(self, name: str, new_name: str):
         port = self.get_port_from_name(name)
@@ -1812,20 +1847,18 @@ class PatchbayManager:
 
         # In case a port rename implies another group for the port
         if group_name != new_group_name:
-            for group in self.groups:
-                if group.name == group_name:
-                    group.remove_port(port)
-                    if not group.ports:
-                        self.groups.remove(group)
-                    break
+            group = self.get_group_from_id(port.group_id)
+            if group is not None:
+                self._remove_port_from_group(port, group, name)
+                if not group.ports:
+                    self._remove_group(group)
 
             port.remove_from_canvas()
             port.full_name = new_name
 
-            for group in self.groups:
-                if group.name == new_group_name:
-                    group.add_port(port)
-                    break
+            group = self.get_group_from_name(new_group_name)
+            if group is not None:
+                self._add_port_to_group(port, group)
             else:
                 # copy the group_position to not move the group
                 # because group has been renamed
@@ -1835,7 +1868,8 @@ class PatchbayManager:
 
                 group = Group(self._next_group_id, new_group_name, gpos)
                 self._next_group_id += 1
-                group.add_port(port)
+                self._add_group(group)
+                self._add_port_to_group(port, group)
                 if self.port_types_view & port.type:
                     group.add_to_canvas()
 
@@ -1843,15 +1877,20 @@ class PatchbayManager:
                 port.add_to_canvas()
             return
 
-        for group in self.groups:
-            if group.group_id == port.group_id:
-                # because many ports may be renamed quicky
-                # It is prefferable to rename all theses ports together.
-                # It prevents too much widget update in canvas,
-                # renames now could also prevent to find stereo detected portgroups
-                # if one of the two ports has been renamed and not the other one.
-                group.rename_port_later(port, new_name)
-                break
+        group = self.get_group_from_id(port.group_id)
+        if group is not None:
+            # port.full_name will change with the rename in group,
+            # but the port has to be found with its new name right now.
+            if self._ports_by_name.get(name) is port:
+                del self._ports_by_name[name]
+            self._ports_by_name[new_name] = port
+
+            # because many ports may be renamed quicky
+            # It is prefferable to rename all theses ports together.
+            # It prevents too much widget update in canvas,
+            # renames now could also prevent to find stereo detected portgroups
+            # if one of the two ports has been renamed and not the other one.
+            group.rename_port_later(port, new_name)
 
     def optional_gui_state_changed(self, client_id: str, visible: bool):
         for client in self.session.client_list:
@@ -1880,10 +1919,9 @@ class PatchbayManager:
             # we may receive this message as many times as there are ports.
             # So, canvas redraw will be done 20ms after the last message.
             if not self.optimized_operation:
-                for group in self.groups:
-                    if group.group_id == port.group_id:
-                        group.sort_ports_later()
-                        break
+                group = self.get_group_from_id(port.group_id)
+                if group is not None:
+                    group.sort_ports_later()
 
         elif key == JACK_METADATA_PRETTY_NAME:
             port = self.get_port_from_uuid(uuid)
@@ -1901,10 +1939,9 @@ class PatchbayManager:
             port.mdata_portgroup = value
 
             if not self.optimized_operation:
-                for group in self.groups:
-                    if group.group_id == port.group_id:
-                        group.sort_ports_later()
-                        break
+                group = self.get_group_from_id(port.group_id)
+                if group is not None:
+                    group.sort_ports_later()
 
         elif key == JACK_METADATA_ICON_NAME:
             for group in self.groups:
@@ -1918,14 +1955,12 @@ class PatchbayManager:
         if port_out is None or port_in is None:
             return
 
-        for connection in self.connections:
-            if (connection.port_out == port_out
-                    and connection.port_in == port_in):
-                return
+        if (port_out, port_in) in self._connections_by_ports:
+            return
 
         connection = Connection(self._next_connection_id, port_out, port_in)
         self._next_connection_id += 1
-        self.connections.append(connection)
+        self._connections_by_ports[(port_out, port_in)] = connection
         if connection.port_type() & self.port_types_view:
             connection.add_to_canvas()
 
@@ -1936,12 +1971,9 @@ class PatchbayManager:
         if port_out is None or port_in is None:
             return
 
-        for connection in self.connections:
-            if (connection.port_out == port_out
-                    and connection.port_in == port_in):
-                self.connections.remove(connection)
-                connection.remove_from_canvas()
-                break
+        connection = self._connections_by_ports.pop((port_out, port_in), None)
+        if connection is not None:
+            connection.remove_from_canvas()
 
     def update_group_position(self, *args):
         # remember group position and move boxes if needed
@@ -1955,19 +1987,17 @@ class PatchbayManager:
             self.group_positions.append(gpos)
 
         if gpos.port_types_view == self.port_types_view:
-            for group in self.groups:
-                if group.name == gpos.group_name:
-                    group.set_group_position(gpos)
-                    break
+            group = self.get_group_from_name(gpos.group_name)
+            if group is not None:
+                group.set_group_position(gpos)
 
     def update_portgroup(self, *args):
         portgroup_mem = ray.PortGroupMemory.new_from(*args)
         self.add_portgroup_memory(portgroup_mem)
 
-        for group in self.groups:
-            if group.name == portgroup_mem.group_name:
-                group.portgroup_memory_added(portgroup_mem)
-                break
+        group = self.get_group_from_name(portgroup_mem.group_name)
+        if group is not None:
+            group.portgroup_memory_added(portgroup_mem)
 
     def disannounce(self):
         self.send_to_patchbay_daemon('/ray/patchbay/gui_disannounce')
@@ -2112,16 +2142,7 @@ class PatchbayManager:
 
         os.remove(temp_path)
 
-    def fast_temp_file_running(self, temp_path):
-        ''' receives a .json file path from patchbay daemon with all ports, connections
-            and jack metadatas'''
-        patchbay_data = self.get_json_contents_from_path(temp_path)
-        if not patchbay_data:
-            sys.stderr.write(
-                "RaySession::Failed to load tmp file %s to get JACK ports\n"
-                % temp_path)
-            return
-
+    def _load_patchbay_data(self, patchbay_data: dict):
         # optimize_operation allow to not redraw group at each port added.
         # however, if there is no group position
         # (i.e. if there is no config at all), it is prefferable to
@@ -2155,8 +2176,66 @@ class PatchbayManager:
 
         self.optimize_operation(False)
         patchcanvas.redrawAllGroups()
+
+    def fast_temp_file_running(self, temp_path):
+        ''' receives a .json file path from patchbay daemon with all ports, connections
+            and jack metadatas'''
+        patchbay_data = self.get_json_contents_from_path(temp_path)
+        if not patchbay_data:
+            sys.stderr.write(
+                "RaySession::Failed to load tmp file %s to get JACK ports\n"
+                % temp_path)
+            return
+
+        self._load_patchbay_data(patchbay_data)
         os.remove(temp_path)
 
+    def fast_temp_file_shared(self, snapshot_path: str, seq: int):
+        ''' receives the path of the .json file shared by all local GUIs,
+            containing the graph state at sequence number seq.
+            This file must not be removed. '''
+        if self.groups:
+            # we were waiting a resync, but some changes
+            # have been applied meanwhile
+            self.clear_all()
+
+        patchbay_data = self.get_json_contents_from_path(snapshot_path)
+        if not patchbay_data:
+            sys.stderr.write(
+                "RaySession::Failed to load file %s to get JACK ports\n"
+                % snapshot_path)
+            return
+
+        self.sequence_reset(patchbay_data.get('seq', seq))
+        self._load_patchbay_data(patchbay_data)
+
+    def sequence_reset(self, seq: int):
+        ''' full graph is sent, its state is at sequence number seq '''
+        self._patchbay_seq = seq
+        self._waiting_resync = False
+        self.deltas_ignored = False
+
+    def sequence(self, seq: int):
+        ''' a bundle of changes starts, check that none has been lost '''
+        if self._waiting_resync:
+            self.deltas_ignored = True
+            return
+
+        if self._patchbay_seq is None or seq == self._patchbay_seq + 1:
+            self._patchbay_seq = seq
+            self.deltas_ignored = False
+
+        elif seq <= self._patchbay_seq:
+            # changes already included in the graph we have
+            self.deltas_ignored = True
+
+        else:
+            # some changes have been lost, ask the full graph
+            self.clear_all()
+            self._waiting_resync = True
+            self.deltas_ignored = True
+            self.send_to_patchbay_daemon('/ray/patchbay/resync')
+
     def patchbay_announce(self, jack_running: int, samplerate: int,
                           buffer_size: int):
         self.tools_widget.set_samplerate(samplerate)
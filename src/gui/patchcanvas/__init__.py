@@ -130,7 +130,9 @@ class options_t(object):
         'inline_displays',
         'elastic',
         'prevent_overlap',
-        'max_port_width'
+        'max_port_width',
+        'low_detail_zoom',
+        'straight_lines_zoom'
     ]
 
 # Canvas features
@@ -151,10 +153,11 @@ class Canvas(object):
         self.theme = None
         self.initiated = False
 
-        self.group_list = []
-        self.port_list = []
-        self.portgrp_list = []
-        self.connection_list = []
+        # registry of groups, ports, portgroups and connections
+        # indexed by their ids. group_list, port_list, portgrp_list and
+        # connection_list are list views of it (in insertion order).
+        self.clear_registry()
+
         self.animation_list = []
         self.clipboard = []
         self.clipboard_cut = True
@@ -171,10 +174,176 @@ class Canvas(object):
         self.is_line_mov = False
         self.semi_hide_opacity = 0.17
 
+        # port types whose ports and connections are kept in the canvas
+        # but not shown, see setPortTypeVisible()
+        self.hidden_port_types = set()
+
     def callback(self, action, value1, value2, value_str):
         print("Canvas::callback({}, {}, {}, {})".format(
             action, value1, value2, value_str))
 
+    def clear_registry(self):
+        # group_id -> group_dict_t
+        self._groups = {}
+        # (group_id, port_id) -> port_dict_t
+        self._ports = {}
+        # group_id -> {port_id: port_dict_t}
+        self._group_ports = {}
+        # (group_id, portgrp_id) -> portgrp_dict_t
+        self._portgrps = {}
+        # group_id -> {portgrp_id: portgrp_dict_t}
+        self._group_portgrps = {}
+        # connection_id -> connection_dict_t
+        self._connections = {}
+        # (group_id, port_id) -> {connection_id: connection_dict_t}
+        self._port_connections = {}
+
+        self._group_list = None
+        self._port_list = None
+        self._portgrp_list = None
+        self._connection_list = None
+
+    # list views, rebuilt only after a change.
+    # They must not be modified, use add_* and remove_* methods.
+    @property
+    def group_list(self) -> list:
+        if self._group_list is None:
+            self._group_list = list(self._groups.values())
+        return self._group_list
+
+    @property
+    def port_list(self) -> list:
+        if self._port_list is None:
+            self._port_list = list(self._ports.values())
+        return self._port_list
+
+    @property
+    def portgrp_list(self) -> list:
+        if self._portgrp_list is None:
+            self._portgrp_list = list(self._portgrps.values())
+        return self._portgrp_list
+
+    @property
+    def connection_list(self) -> list:
+        if self._connection_list is None:
+            self._connection_list = list(self._connections.values())
+        return self._connection_list
+
+    def add_group(self, group):
+        self._groups[group.group_id] = group
+        self._group_list = None
+
+    def remove_group(self, group):
+        if self._groups.pop(group.group_id, None) is not None:
+            self._group_list = None
+
+    def get_group(self, group_id: int):
+        return self._groups.get(group_id)
+
+    def add_port(self, port):
+        self._ports[(port.group_id, port.port_id)] = port
+        self._group_ports.setdefault(port.group_id, {})[port.port_id] = port
+        self._port_list = None
+
+    def remove_port(self, port):
+        if self._ports.pop((port.group_id, port.port_id), None) is None:
+            return
+
+        group_ports = self._group_ports[port.group_id]
+        del group_ports[port.port_id]
+        if not group_ports:
+            del self._group_ports[port.group_id]
+
+        self._port_list = None
+
+    def get_port(self, group_id: int, port_id: int):
+        return self._ports.get((group_id, port_id))
+
+    def get_group_ports(self, group_id: int) -> list:
+        ''' ports of the group, in the order they were added '''
+        return list(self._group_ports.get(group_id, {}).values())
+
+    def reorder_group_ports(self, group_id: int, port_id_list: list):
+        ''' set the order of the group ports,
+            ports not in port_id_list are kept after the others '''
+        group_ports = self._group_ports.get(group_id)
+        if not group_ports:
+            return
+
+        ordered = {}
+        for port_id in port_id_list:
+            port = group_ports.get(port_id)
+            if port is not None:
+                ordered[port_id] = port
+
+        for port_id, port in group_ports.items():
+            if port_id not in ordered:
+                ordered[port_id] = port
+
+        self._group_ports[group_id] = ordered
+
+        # keep port_list in the same order, group ports go at the end
+        # as if they were removed and re-added.
+        for port_id, port in ordered.items():
+            del self._ports[(group_id, port_id)]
+            self._ports[(group_id, port_id)] = port
+        self._port_list = None
+
+    def add_portgrp(self, portgrp):
+        self._portgrps[(portgrp.group_id, portgrp.portgrp_id)] = portgrp
+        self._group_portgrps.setdefault(
+            portgrp.group_id, {})[portgrp.portgrp_id] = portgrp
+        self._portgrp_list = None
+
+    def remove_portgrp(self, portgrp):
+        if self._portgrps.pop(
+                (portgrp.group_id, portgrp.portgrp_id), None) is None:
+            return
+
+        group_portgrps = self._group_portgrps[portgrp.group_id]
+        del group_portgrps[portgrp.portgrp_id]
+        if not group_portgrps:
+            del self._group_portgrps[portgrp.group_id]
+
+        self._portgrp_list = None
+
+    def get_portgrp(self, group_id: int, portgrp_id: int):
+        return self._portgrps.get((group_id, portgrp_id))
+
+    def get_group_portgrps(self, group_id: int) -> list:
+        ''' portgroups of the group, in the order they were added '''
+        return list(self._group_portgrps.get(group_id, {}).values())
+
+    def add_connection(self, connection):
+        self._connections[connection.connection_id] = connection
+        for port_key in ((connection.group_out_id, connection.port_out_id),
+                         (connection.group_in_id, connection.port_in_id)):
+            self._port_connections.setdefault(
+                port_key, {})[connection.connection_id] = connection
+        self._connection_list = None
+
+    def remove_connection(self, connection):
+        if self._connections.pop(connection.connection_id, None) is None:
+            return
+
+        for port_key in ((connection.group_out_id, connection.port_out_id),
+                         (connection.group_in_id, connection.port_in_id)):
+            port_connections = self._port_connections.get(port_key)
+            if port_connections is None:
+                continue
+
+            port_connections.pop(connection.connection_id, None)
+            if not port_connections:
+                del self._port_connections[port_key]
+
+        self._connection_list = None
+
+    def get_connection(self, connection_id: int):
+        return self._connections.get(connection_id)
+
+    def get_port_connections(self, group_id: int, port_id: int) -> list:
+        return list(self._port_connections.get((group_id, port_id), {}).values())
+
 # ------------------------------------------------------------------------------------------------------------
 
 # object lists
@@ -324,6 +493,8 @@ options.inline_displays = False
 options.elastic = True
 options.prevent_overlap = True
 options.max_port_width = 160
+options.low_detail_zoom = 0.4
+options.straight_lines_zoom = 0.25
 
 features = features_t()
 features.group_info   = False
@@ -19,7 +19,7 @@
 # ------------------------------------------------------------------------------------------------------------
 # Imports (Global)
 from math import log, sqrt
-from PyQt5.QtCore import Qt, QPointF
+from PyQt5.QtCore import Qt, QPointF, QRectF
 from PyQt5.QtGui import QColor, QLinearGradient, QPainter, QPainterPath, QPen
 from PyQt5.QtWidgets import QGraphicsPathItem
 
@@ -56,6 +56,7 @@ class CanvasBezierLine(QGraphicsPathItem):
         self.m_lineSelected = False
         self.m_ready_to_disc = False
         self.m_is_semi_hidden = False
+        self._pen_key = None
 
         self.setBrush(QColor(0, 0, 0, 0))
         self.setGraphicsEffect(None)
@@ -90,8 +91,10 @@ class CanvasBezierLine(QGraphicsPathItem):
         self.updateLineGradient()
 
     def triggerDisconnect(self):
-        for connection in canvas.connection_list:
-            if (connection.port_out_id == self.item1.getPortId() and connection.port_in_id == self.item2.getPortId()):
+        for connection in canvas.get_port_connections(
+                self.item1.getGroupId(), self.item1.getPortId()):
+            if (connection.group_in_id == self.item2.getGroupId()
+                    and connection.port_in_id == self.item2.getPortId()):
                 canvas.callback(ACTION_PORTS_DISCONNECT, connection.connection_id, 0, "")
                 break
 
@@ -150,6 +153,14 @@ class CanvasBezierLine(QGraphicsPathItem):
             item1_new_x = item1_x + mid_x
             item2_new_x = item2_x - mid_x
 
+            ctrl_xs = (item1_x, item1_new_x, item2_new_x, item2_x)
+            if self._is_out_of_view(
+                    min(ctrl_xs), min(item1_y, item2_y),
+                    max(ctrl_xs), max(item1_y, item2_y)):
+                # the path will be built when the line becomes visible
+                self.scene().add_offscreen_line(self)
+                return
+
             path = QPainterPath(QPointF(item1_x, item1_y))
             path.cubicTo(item1_new_x, item1_y, item2_new_x, item2_y, item2_x, item2_y)
             self.setPath(path)
@@ -157,46 +168,44 @@ class CanvasBezierLine(QGraphicsPathItem):
             self.m_lineSelected = False
             self.updateLineGradient()
 
+    def _is_out_of_view(self, left, top, right, bottom)->bool:
+        ''' True if the new line hull (its bezier control points)
+            and the current path are both out of the view '''
+        scene = self.scene()
+        if scene is None:
+            return False
+
+        visible_rect = scene.get_visible_rect()
+        hull = QRectF(QPointF(left, top), QPointF(right, bottom))
+
+        return not (
+            hull.adjusted(-2, -2, 2, 2).intersects(visible_rect)
+            or self.path().boundingRect().adjusted(
+                -2, -2, 2, 2).intersects(visible_rect))
+
     def type(self):
         return CanvasBezierLineType
 
-    def updateLineGradient(self):
-        pos_top = self.boundingRect().top()
-        pos_bot = self.boundingRect().bottom()
-        if self.item2.scenePos().y() >= self.item1.scenePos().y():
-            pos1 = 0
-            pos2 = 1
-        else:
-            pos1 = 1
-            pos2 = 0
-
-        port_type1 = self.item1.getPortType()
-        port_type2 = self.item2.getPortType()
-        port_gradient = QLinearGradient(0, pos_top, 0, pos_bot)
+    def _get_gradient_stops(self, port_type: int)->list:
+        ''' returns gradient stops for current line state,
+            shared by all lines of the same type and state '''
+        stops_key = (CanvasBezierLineType, port_type == PORT_TYPE_MIDI_JACK,
+                     self.m_lineSelected, self.m_ready_to_disc,
+                     canvas.semi_hide_opacity if self.m_is_semi_hidden else 1.0)
+        stops = canvas.theme.line_pen_cache.get(stops_key)
+        if stops is not None:
+            return stops
 
-        #if port_type1 == PORT_TYPE_AUDIO_JACK:
-            #port_gradient.setColorAt(pos1, canvas.theme.line_audio_jack_sel if self.m_lineSelected else canvas.theme.line_audio_jack)
-        #elif port_type1 == PORT_TYPE_MIDI_JACK:
-            #port_gradient.setColorAt(pos1, canvas.theme.line_midi_jack_sel if self.m_lineSelected else canvas.theme.line_midi_jack)
-        #elif port_type1 == PORT_TYPE_MIDI_ALSA:
-            #port_gradient.setColorAt(pos1, canvas.theme.line_midi_alsa_sel if self.m_lineSelected else canvas.theme.line_midi_alsa)
-        #elif port_type1 == PORT_TYPE_PARAMETER:
-            #port_gradient.setColorAt(pos1, canvas.theme.line_parameter_sel if self.m_lineSelected else canvas.theme.line_parameter)
-
-        #if port_type2 == PORT_TYPE_AUDIO_JACK:
-            #port_gradient.setColorAt(pos2, canvas.theme.line_audio_jack_sel if self.m_lineSelected else canvas.theme.line_audio_jack)
-        #elif port_type2 == PORT_TYPE_MIDI_JACK:
-            #port_gradient.setColorAt(pos2, canvas.theme.line_midi_jack_sel if self.m_lineSelected else canvas.theme.line_midi_jack)
-        #elif port_type2 == PORT_TYPE_MIDI_ALSA:
-            #port_gradient.setColorAt(pos2, canvas.theme.line_midi_alsa_sel if self.m_lineSelected else canvas.theme.line_midi_alsa)
-        #elif port_type2 == PORT_TYPE_PARAMETER:
-            #port_gradient.setColorAt(pos2, canvas.theme.line_parameter_sel if self.m_lineSelected else canvas.theme.line_parameter)
+        if self.m_ready_to_disc:
+            stops = [(0.0, QColor(34, 34, 34)), (1.0, QColor(34, 34, 34))]
+            canvas.theme.line_pen_cache[stops_key] = stops
+            return stops
 
         base_color = canvas.theme.line_audio_jack
         if self.m_lineSelected:
             base_color = canvas.theme.line_audio_jack_sel
 
-        if port_type1 == PORT_TYPE_MIDI_JACK:
+        if port_type == PORT_TYPE_MIDI_JACK:
             base_color = canvas.theme.port_midi_jack_bg
             if self.m_lineSelected:
                 base_color = canvas.theme.port_midi_jack_bg_sel
@@ -206,20 +215,45 @@ class CanvasBezierLine(QGraphicsPathItem):
                                 int(base_color.green() * canvas.semi_hide_opacity + 0.5),
                                 int(base_color.blue() * canvas.semi_hide_opacity + 0.5))
 
-        if self.m_ready_to_disc:
-            port_gradient.setColorAt(pos1, QColor(34, 34, 34))
-            port_gradient.setColorAt(pos2, QColor(34, 34, 34))
-            self.setPen(QPen(port_gradient, 2, Qt.DotLine))
-        else:
-            port_gradient.setColorAt(0, base_color.lighter(130))
-            port_gradient.setColorAt(0.5, base_color.darker(130))
-            port_gradient.setColorAt(1, base_color.lighter(130))
+        stops = [(0.0, base_color.lighter(130)),
+                 (0.5, base_color.darker(130)),
+                 (1.0, base_color.lighter(130))]
+        canvas.theme.line_pen_cache[stops_key] = stops
+        return stops
 
+    def updateLineGradient(self):
+        pos_top = self.boundingRect().top()
+        pos_bot = self.boundingRect().bottom()
+        stops = self._get_gradient_stops(self.item1.getPortType())
+
+        # the gradient follows the line geometry,
+        # rebuild the pen only if geometry or state changed
+        pen_key = (stops, pos_top, pos_bot)
+        if (self._pen_key is not None
+                and self._pen_key[0] is stops
+                and self._pen_key[1:] == pen_key[1:]):
+            return
+        self._pen_key = pen_key
+
+        port_gradient = QLinearGradient(0, pos_top, 0, pos_bot)
+        port_gradient.setStops(stops)
         self.setPen(QPen(port_gradient, 1.750001, Qt.SolidLine, Qt.FlatCap))
 
     def paint(self, painter, option, widget):
         if canvas.scene.loading_items:
             return
+
+        if (option.levelOfDetailFromTransform(painter.worldTransform())
+                < options.straight_lines_zoom):
+            # low zoom, a straight segment is enough
+            path = self.path()
+            if path.elementCount() > 0:
+                painter.save()
+                painter.setPen(self.pen())
+                painter.drawLine(QPointF(path.elementAt(0).x, path.elementAt(0).y),
+                                 path.currentPosition())
+                painter.restore()
+            return
         
         painter.save()
         painter.setRenderHint(QPainter.Antialiasing, bool(options.antialiasing))
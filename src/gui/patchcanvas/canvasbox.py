@@ -85,7 +85,7 @@ from .utils import (CanvasItemFX,
                     CanvasGetPortGroupPosition,
                     CanvasGetPortPrintName,
                     CanvasCallback,
-                    CanvasConnectionConcerns,
+                    CanvasGetPortsConnections,
                     CanvasGetIcon,
                     is_dark_theme)
 
@@ -177,6 +177,11 @@ class CanvasBox(QGraphicsItem):
         self.m_port_list_ids = []
         self.m_connection_lines = []
 
+        # port ids of this box, bucketed by (port_type, is_alternate)
+        # in adding order, so that layout does not scan all canvas ports
+        self._port_buckets = {}
+        self._port_bucket_keys = {}
+
         # Set Font
         self.m_font_name = QFont()
         self.m_font_name.setFamily(canvas.theme.box_font_name)
@@ -236,7 +241,12 @@ class CanvasBox(QGraphicsItem):
         # Final touches
         self.setFlags(QGraphicsItem.ItemIsFocusable
                       | QGraphicsItem.ItemIsMovable
-                      | QGraphicsItem.ItemIsSelectable)
+                      | QGraphicsItem.ItemIsSelectable
+                      | QGraphicsItem.ItemSendsGeometryChanges)
+
+        # keep the painting in a pixmap cache, re-rendered only on update()
+        # or zoom change, so panning does not redo all the vector drawing
+        self.setCacheMode(QGraphicsItem.DeviceCoordinateCache)
 
         # Wait for at least 1 port
         if options.auto_hide_groups:
@@ -253,6 +263,7 @@ class CanvasBox(QGraphicsItem):
         self.updatePositions()
 
         canvas.scene.addItem(self)
+        canvas.scene.box_index.update_box(self)
         QTimer.singleShot(0, self.fixPos)
 
     def getGroupId(self):
@@ -331,6 +342,7 @@ class CanvasBox(QGraphicsItem):
     def set_optional_gui_state(self, visible: bool):
         self.m_can_handle_gui = True
         self.m_gui_visible = visible
+        self.update()
 
     def setSplit(self, split, mode=PORT_MODE_NULL):
         self.m_splitted = split
@@ -376,43 +388,84 @@ class CanvasBox(QGraphicsItem):
 
     def addPortFromGroup(self, port_id, port_mode, port_type,
                          port_name, is_alternate):
-        if len(self.m_port_list_ids) == 0:
-            if options.auto_hide_groups:
+        if (port_type not in canvas.hidden_port_types
+                and not self.has_shown_ports()):
+            # box was hidden because it had no port, or only hidden ones
+            if options.auto_hide_groups or self.m_port_list_ids:
                 if options.eyecandy == EYECANDY_FULL:
                     CanvasItemFX(self, True, False)
                 self.setVisible(True)
 
         new_widget = CanvasPort(self.m_group_id, port_id, port_name, port_mode,
                                 port_type, is_alternate, self)
-        if self._wrapped:
+        if self._wrapped or port_type in canvas.hidden_port_types:
             new_widget.setVisible(False)
 
         self.m_port_list_ids.append(port_id)
 
+        bucket_key = (port_type, is_alternate)
+        self._port_buckets.setdefault(bucket_key, []).append(port_id)
+        self._port_bucket_keys[port_id] = bucket_key
+
         return new_widget
 
     def removePortFromGroup(self, port_id):
-        if port_id in self.m_port_list_ids:
-            self.m_port_list_ids.remove(port_id)
-        else:
+        bucket_key = self._port_bucket_keys.pop(port_id, None)
+        if bucket_key is None:
             qCritical("PatchCanvas::CanvasBox.removePort(%i) - unable to find port to remove" % port_id)
             return
 
-        if len(self.m_port_list_ids) > 0:
+        self.m_port_list_ids.remove(port_id)
+        bucket = self._port_buckets[bucket_key]
+        bucket.remove(port_id)
+        if not bucket:
+            del self._port_buckets[bucket_key]
+
+        if self.has_shown_ports():
             self.updatePositions()
 
         elif self.isVisible():
-            if options.auto_hide_groups:
+            if options.auto_hide_groups or self.m_port_list_ids:
                 if options.eyecandy == EYECANDY_FULL:
                     CanvasItemFX(self, False, False)
                 else:
                     self.setVisible(False)
 
+    def reorderPorts(self, port_id_list: list):
+        ''' set the order of the box ports,
+            ports not in port_id_list are kept after the others '''
+        order = dict([(port_id, i) for i, port_id in enumerate(port_id_list)])
+
+        def sort_key(port_id):
+            return order.get(port_id, len(order))
+
+        self.m_port_list_ids.sort(key=sort_key)
+        for bucket in self._port_buckets.values():
+            bucket.sort(key=sort_key)
+
+    def has_shown_ports(self)->bool:
+        ''' True if the box has at least one port
+            whose type is not hidden '''
+        for port_type, is_alternate in self._port_buckets.keys():
+            if port_type not in canvas.hidden_port_types:
+                return True
+        return False
+
+    def update_port_types_visibility(self):
+        ''' show or hide ports, portgroups and the box itself
+            after a change of canvas.hidden_port_types '''
+        self.hide_ports_for_wrap(self._wrapped or self._unwrapping)
+
+        if self.has_shown_ports():
+            self.setVisible(True)
+        elif options.auto_hide_groups or self.m_port_list_ids:
+            self.setVisible(False)
+
     def addPortGroupFromGroup(self, portgrp_id, port_mode, port_type, port_id_list):
         new_widget = CanvasPortGroup(self.m_group_id, portgrp_id, port_mode,
                                      port_type, port_id_list, self)
 
-        if self._wrapped:
+        if self._wrapped or port_type in canvas.hidden_port_types:
             new_widget.setVisible(False)
 
         return new_widget
@@ -472,23 +525,25 @@ class CanvasBox(QGraphicsItem):
         self.updatePositions()
 
     def hide_ports_for_wrap(self, hide: bool):
-        for portgrp in canvas.portgrp_list:
-            if portgrp.group_id == self.m_group_id:
-                if (self.m_splitted
-                        and self.m_splitted_mode != portgrp.port_mode):
-                    continue
+        portgrp_ids = set()
 
-                if portgrp.widget is not None:
-                    portgrp.widget.setVisible(not hide)
+        for port_id in self.m_port_list_ids:
+            port = canvas.get_port(self.m_group_id, port_id)
+            if port is None:
+                continue
 
-        for port in canvas.port_list:
-            if port.group_id == self.m_group_id:
-                if (self.m_splitted
-                        and self.m_splitted_mode != port.port_mode):
-                    continue
+            # ports of hidden types stay hidden, even in an unwrapped box
+            shown = bool(not hide
+                         and port.port_type not in canvas.hidden_port_types)
+
+            if port.widget is not None:
+                port.widget.setVisible(shown)
 
-                if port.widget is not None:
-                    port.widget.setVisible(not hide)
+            if port.portgrp_id and port.portgrp_id not in portgrp_ids:
+                portgrp_ids.add(port.portgrp_id)
+                portgrp = canvas.get_portgrp(self.m_group_id, port.portgrp_id)
+                if portgrp is not None and portgrp.widget is not None:
+                    portgrp.widget.setVisible(shown)
 
     def is_wrapped(self)->bool:
         return self._wrapped
@@ -625,23 +680,41 @@ class CanvasBox(QGraphicsItem):
 
         self.prepareGeometryChange()
 
-        # Get Port List
+        # Get Port List, sorted by port type and alternate.
+        # Ports of hidden types take no place in the box.
+        port_types = [port_type for port_type in (
+                          PORT_TYPE_AUDIO_JACK, PORT_TYPE_MIDI_JACK,
+                          PORT_TYPE_MIDI_ALSA, PORT_TYPE_PARAMETER)
+                      if port_type not in canvas.hidden_port_types]
         port_list = []
+        portgrp_list = []
+        portgrp_ids = set()
         self.m_current_port_mode = PORT_MODE_NULL
 
-        for port in canvas.port_list:
-            if port.group_id == self.m_group_id and port.port_id in self.m_port_list_ids:
-                port_list.append(port)
+        for port_type in port_types:
+            for alternate in (False, True):
+                for port_id in self._port_buckets.get(
+                        (port_type, alternate), ()):
+                    port = canvas.get_port(self.m_group_id, port_id)
+                    if port is None:
+                        continue
+
+                    port_list.append(port)
 
-                # used to know present port modes (INPUT or OUTPUT)
-                self.m_current_port_mode |= port.port_mode
+                    # used to know present port modes (INPUT or OUTPUT)
+                    self.m_current_port_mode |= port.port_mode
+
+                    if port.portgrp_id and port.portgrp_id not in portgrp_ids:
+                        portgrp = canvas.get_portgrp(
+                            self.m_group_id, port.portgrp_id)
+                        if portgrp is not None:
+                            portgrp_ids.add(port.portgrp_id)
+                            portgrp_list.append(portgrp)
 
         max_in_width = max_out_width = 0
         port_spacing = canvas.theme.port_height + canvas.theme.port_spacing
 
         # Get Max Box Width, vertical ports re-positioning
-        port_types = [PORT_TYPE_AUDIO_JACK, PORT_TYPE_MIDI_JACK,
-                      PORT_TYPE_MIDI_ALSA, PORT_TYPE_PARAMETER]
         last_in_type = last_out_type = PORT_TYPE_NULL
         last_in_alter = last_out_alter = False
         
@@ -659,18 +732,20 @@ class CanvasBox(QGraphicsItem):
         # check if we can align port types
         # eg, align first midi input to first midi output
         for port_type in port_types:
-            aligner_item = []
             for alternate in (False, True):
                 n_ins = 0
                 n_outs = 0
 
-                for port in port_list:
-                    if (port.port_type == port_type
-                            and port.is_alternate == alternate):
-                        if port.port_mode == PORT_MODE_INPUT:
-                            n_ins += 1
-                        elif port.port_mode == PORT_MODE_OUTPUT:
-                            n_outs += 1
+                for port_id in self._port_buckets.get(
+                        (port_type, alternate), ()):
+                    port = canvas.get_port(self.m_group_id, port_id)
+                    if port is None:
+                        continue
+
+                    if port.port_mode == PORT_MODE_INPUT:
+                        n_ins += 1
+                    elif port.port_mode == PORT_MODE_OUTPUT:
+                        n_outs += 1
 
                 port_types_aligner.append((n_ins, n_outs))
 
@@ -688,12 +763,17 @@ class CanvasBox(QGraphicsItem):
                 winner = PORT_MODE_OUTPUT
 
         # ports Y positioning, and get width informations
+        port_index = 0
+
         for port_type in port_types:
             for alternate in (False, True):
-                for port in port_list:
+                while port_index < len(port_list):
+                    port = port_list[port_index]
                     if (port.port_type != port_type
                             or port.is_alternate != alternate):
-                        continue
+                        break
+
+                    port_index += 1
                     
                     ## uncomment this block to enable
                     ## inputs and outputs in down order
@@ -709,11 +789,9 @@ class CanvasBox(QGraphicsItem):
                     max_pwidth = options.max_port_width
 
                     if port.portgrp_id:
-                        for portgrp in canvas.portgrp_list:
-                            if not (portgrp.group_id == self.m_group_id
-                                    and portgrp.portgrp_id == port.portgrp_id):
-                                continue
-                            
+                        portgrp = canvas.get_portgrp(
+                            self.m_group_id, port.portgrp_id)
+                        if portgrp is not None:
                             if port.port_id == portgrp.port_id_list[0]:
                                 portgrp_name = CanvasGetPortGroupName(
                                     self.m_group_id, portgrp.port_id_list)
@@ -735,7 +813,6 @@ class CanvasBox(QGraphicsItem):
                             size = portgrp.widget.get_text_width() \
                                    + max(port.widget.get_text_width() + 6,
                                          canvas.theme.port_in_portgrp_width)
-                            break
                     else:
                         port.widget.set_print_name(port.port_name, max_pwidth)
                         size = max(port.widget.get_text_width(), 20)
@@ -762,16 +839,13 @@ class CanvasBox(QGraphicsItem):
                         else:
                             port.widget.setY(last_in_pos)
 
-                        if port.portgrp_id and first_of_portgrp:
-                            for portgrp in canvas.portgrp_list:
-                                if (portgrp.group_id == self.m_group_id
-                                        and portgrp.portgrp_id == port.portgrp_id):
-                                    if portgrp.widget is not None:
-                                        if self._wrapped:
-                                            portgrp.widget.setY(wrapped_port_pos)
-                                        else:
-                                            portgrp.widget.setY(last_in_pos)
-                                    break
+                        if (port.portgrp_id and first_of_portgrp
+                                and portgrp is not None
+                                and portgrp.widget is not None):
+                            if self._wrapped:
+                                portgrp.widget.setY(wrapped_port_pos)
+                            else:
+                                portgrp.widget.setY(last_in_pos)
 
                         if last_of_portgrp:
                             last_in_pos += port_spacing
@@ -800,16 +874,13 @@ class CanvasBox(QGraphicsItem):
                         else:
                             port.widget.setY(last_out_pos)
 
-                        if port.portgrp_id and first_of_portgrp:
-                            for portgrp in canvas.portgrp_list:
-                                if (portgrp.group_id == self.m_group_id
-                                        and portgrp.portgrp_id == port.portgrp_id):
-                                    if portgrp.widget is not None:
-                                        if self._wrapped:
-                                            portgrp.widget.setY(wrapped_port_pos)
-                                        else:
-                                            portgrp.widget.setY(last_out_pos)
-                                    break
+                        if (port.portgrp_id and first_of_portgrp
+                                and portgrp is not None
+                                and portgrp.widget is not None):
+                            if self._wrapped:
+                                portgrp.widget.setY(wrapped_port_pos)
+                            else:
+                                portgrp.widget.setY(last_out_pos)
 
                         if last_of_portgrp:
                             last_out_pos += port_spacing
@@ -917,11 +988,9 @@ class CanvasBox(QGraphicsItem):
                 port.widget.setY(port.widget.y() + more_height)
 
             # down portgroups
-            for portgrp in canvas.portgrp_list:
-                if (portgrp.group_id == self.m_group_id
-                        and self.m_current_port_mode & portgrp.port_mode):
-                    if portgrp.widget is not None:
-                        portgrp.widget.setY(portgrp.widget.y() + more_height)
+            for portgrp in portgrp_list:
+                if portgrp.widget is not None:
+                    portgrp.widget.setY(portgrp.widget.y() + more_height)
 
             last_in_pos += more_height
             last_out_pos += more_height
@@ -943,11 +1012,7 @@ class CanvasBox(QGraphicsItem):
                 port.widget.setPortWidth(max_out_width)
 
         # Horizontal portgroups and ports in portgroup re-positioning
-        for portgrp in canvas.portgrp_list:
-            if (portgrp.group_id != self.m_group_id
-                    or not self.m_current_port_mode & portgrp.port_mode):
-                continue
-
+        for portgrp in portgrp_list:
             if portgrp.widget is not None:
                 if portgrp.port_mode == PORT_MODE_INPUT:
                     portgrp.widget.setPortGroupWidth(max_in_width)
@@ -958,10 +1023,9 @@ class CanvasBox(QGraphicsItem):
 
             max_port_in_pg_width = canvas.theme.port_in_portgrp_width
 
-            for port in canvas.port_list:
-                if (port.group_id == self.m_group_id
-                        and port.port_id in portgrp.port_id_list
-                        and port.widget is not None):
+            for port_id in portgrp.port_id_list:
+                port = canvas.get_port(self.m_group_id, port_id)
+                if port is not None and port.widget is not None:
                     port_print_width = port.widget.get_text_width()
 
                     # change port in portgroup width only if
@@ -976,10 +1040,9 @@ class CanvasBox(QGraphicsItem):
 
             portgrp.widget.set_ports_width(max_port_in_pg_width)
 
-            for port in canvas.port_list:
-                if (port.group_id == self.m_group_id
-                        and port.port_id in portgrp.port_id_list
-                        and port.widget is not None):
+            for port_id in portgrp.port_id_list:
+                port = canvas.get_port(self.m_group_id, port_id)
+                if port is not None and port.widget is not None:
                     port.widget.setPortWidth(max_port_in_pg_width)
                     if port.port_mode == PORT_MODE_INPUT:
                         port.widget.setX(inX)
@@ -1040,6 +1103,7 @@ class CanvasBox(QGraphicsItem):
         self.p_ex_width = self.p_width
         self.p_ex_height = self.p_height
         self.p_ex_scene_pos = self.scenePos()
+        canvas.scene.box_index.update_box(self)
 
         self.repaintLines(forced=True)
         if not (self._wrapping or self._unwrapping) and self.isVisible():
@@ -1049,7 +1113,9 @@ class CanvasBox(QGraphicsItem):
     def repaintLines(self, forced=False):
         if forced or self.pos() != self.m_last_pos:
             for connection in self.m_connection_lines:
-                connection.line.updateLinePos()
+                # hidden lines are updated when they are shown again
+                if connection.line.isVisible():
+                    connection.line.updateLinePos()
 
         self.m_last_pos = self.pos()
 
@@ -1084,16 +1150,26 @@ class CanvasBox(QGraphicsItem):
             self.setOpacity(canvas.semi_hide_opacity)
         else:
             self.setOpacity(1.0)
+        self.update()
 
     def update_opacity(self):
         if not self.m_is_semi_hidden:
             return
         
         self.setOpacity(canvas.semi_hide_opacity)
+        self.update()
 
     def type(self):
         return CanvasBoxType
 
+    def itemChange(self, change, value):
+        if (change == QGraphicsItem.ItemPositionHasChanged
+                and self.scene() is canvas.scene):
+            canvas.scene.box_index.update_box(self)
+            # painting is cached, paint() is not called for a simple move
+            self.repaintLines()
+        return QGraphicsItem.itemChange(self, change, value)
+
     def contextMenuEvent(self, event):
         if canvas.is_line_mov:
             return
@@ -1113,93 +1189,93 @@ class CanvasBox(QGraphicsItem):
         conn_list_ids = []
         disconnect_list = [] # will contains disconnect_element dicts
 
-        for connection in canvas.connection_list:
-            if CanvasConnectionConcerns(
-                    connection, self.m_group_id, self.m_port_list_ids):
-                conn_list_ids.append(connection.connection_id)
-                other_group_id = connection.group_in_id
-                group_port_mode = PORT_MODE_INPUT
+        for connection in CanvasGetPortsConnections(
+                self.m_group_id, self.m_port_list_ids):
+            conn_list_ids.append(connection.connection_id)
+            other_group_id = connection.group_in_id
+            group_port_mode = PORT_MODE_INPUT
 
-                if self.m_splitted:
-                    if self.m_splitted_mode == PORT_MODE_INPUT:
-                        other_group_id = connection.group_out_id
-                        group_port_mode = PORT_MODE_OUTPUT
-                else:
-                    if other_group_id == self.m_group_id:
-                        other_group_id = connection.group_out_id
-                        group_port_mode = PORT_MODE_OUTPUT
-
-                for disconnect_element in disconnect_list:
-                    if disconnect_element['group_id'] == other_group_id:
-                        if group_port_mode == PORT_MODE_INPUT:
-                            disconnect_element['connection_in_ids'].append(
-                                connection.connection_id)
-                        else:
-                            disconnect_element['connection_out_ids'].append(
-                                connection.connection_id)
-                        break
-                else:
-                    disconnect_element = {'group_id': other_group_id,
-                                          'connection_in_ids': [],
-                                          'connection_out_ids': []}
+            if self.m_splitted:
+                if self.m_splitted_mode == PORT_MODE_INPUT:
+                    other_group_id = connection.group_out_id
+                    group_port_mode = PORT_MODE_OUTPUT
+            else:
+                if other_group_id == self.m_group_id:
+                    other_group_id = connection.group_out_id
+                    group_port_mode = PORT_MODE_OUTPUT
 
+            for disconnect_element in disconnect_list:
+                if disconnect_element['group_id'] == other_group_id:
                     if group_port_mode == PORT_MODE_INPUT:
                         disconnect_element['connection_in_ids'].append(
                             connection.connection_id)
                     else:
                         disconnect_element['connection_out_ids'].append(
                             connection.connection_id)
+                    break
+            else:
+                disconnect_element = {'group_id': other_group_id,
+                                      'connection_in_ids': [],
+                                      'connection_out_ids': []}
+
+                if group_port_mode == PORT_MODE_INPUT:
+                    disconnect_element['connection_in_ids'].append(
+                        connection.connection_id)
+                else:
+                    disconnect_element['connection_out_ids'].append(
+                        connection.connection_id)
 
-                    disconnect_list.append(disconnect_element)
+                disconnect_list.append(disconnect_element)
 
         if disconnect_list:
             for disconnect_element in disconnect_list:
-                for group in canvas.group_list:
-                    if group.group_id == disconnect_element['group_id']:
-                        if (group.split
-                                and disconnect_element['connection_in_ids']
-                                and disconnect_element['connection_out_ids']):
-                            ins_label = " (inputs)"
-                            outs_label = " (outputs)"
-
-                            if group.icon_type == ICON_HARDWARE:
-                                ins_label = " (playbacks)"
-                                outs_label = " (captures)"
-
-                            act_x_disc1 = discMenu.addAction(
-                                group.group_name + outs_label)
-                            act_x_disc1.setIcon(CanvasGetIcon(
-                                group.icon_type, group.icon_name, PORT_MODE_OUTPUT))
-                            act_x_disc1.setData(
-                                disconnect_element['connection_out_ids'])
-                            act_x_disc1.triggered.connect(
-                                canvas.qobject.PortContextMenuDisconnect)
-
-                            act_x_disc2 = discMenu.addAction(
-                                group.group_name + ins_label)
-                            act_x_disc2.setIcon(CanvasGetIcon(
-                                group.icon_type, group.icon_name, PORT_MODE_INPUT))
-                            act_x_disc2.setData(
-                                disconnect_element['connection_in_ids'])
-                            act_x_disc2.triggered.connect(
-                                canvas.qobject.PortContextMenuDisconnect)
-                        else:
-                            port_mode = PORT_MODE_NULL
-                            if not disconnect_element['connection_in_ids']:
-                                port_mode = PORT_MODE_OUTPUT
-                            elif not disconnect_element['connection_out_ids']:
-                                port_mode = PORT_MODE_INPUT
-
-                            act_x_disc = discMenu.addAction(group.group_name)
-                            icon = CanvasGetIcon(
-                                group.icon_type, group.icon_name, port_mode)
-                            act_x_disc.setIcon(icon)
-                            act_x_disc.setData(
-                                disconnect_element['connection_out_ids']
-                                + disconnect_element['connection_in_ids'])
-                            act_x_disc.triggered.connect(
-                                canvas.qobject.PortContextMenuDisconnect)
-                        break
+                group = canvas.get_group(disconnect_element['group_id'])
+                if group is None:
+                    continue
+
+                if (group.split
+                        and disconnect_element['connection_in_ids']
+                        and disconnect_element['connection_out_ids']):
+                    ins_label = " (inputs)"
+                    outs_label = " (outputs)"
+
+                    if group.icon_type == ICON_HARDWARE:
+                        ins_label = " (playbacks)"
+                        outs_label = " (captures)"
+
+                    act_x_disc1 = discMenu.addAction(
+                        group.group_name + outs_label)
+                    act_x_disc1.setIcon(CanvasGetIcon(
+                        group.icon_type, group.icon_name, PORT_MODE_OUTPUT))
+                    act_x_disc1.setData(
+                        disconnect_element['connection_out_ids'])
+                    act_x_disc1.triggered.connect(
+                        canvas.qobject.PortContextMenuDisconnect)
+
+                    act_x_disc2 = discMenu.addAction(
+                        group.group_name + ins_label)
+                    act_x_disc2.setIcon(CanvasGetIcon(
+                        group.icon_type, group.icon_name, PORT_MODE_INPUT))
+                    act_x_disc2.setData(
+                        disconnect_element['connection_in_ids'])
+                    act_x_disc2.triggered.connect(
+                        canvas.qobject.PortContextMenuDisconnect)
+                else:
+                    port_mode = PORT_MODE_NULL
+                    if not disconnect_element['connection_in_ids']:
+                        port_mode = PORT_MODE_OUTPUT
+                    elif not disconnect_element['connection_out_ids']:
+                        port_mode = PORT_MODE_INPUT
+
+                    act_x_disc = discMenu.addAction(group.group_name)
+                    icon = CanvasGetIcon(
+                        group.icon_type, group.icon_name, port_mode)
+                    act_x_disc.setIcon(icon)
+                    act_x_disc.setData(
+                        disconnect_element['connection_out_ids']
+                        + disconnect_element['connection_in_ids'])
+                    act_x_disc.triggered.connect(
+                        canvas.qobject.PortContextMenuDisconnect)
         else:
             act_x_disc = discMenu.addAction("No connections")
             act_x_disc.setEnabled(False)
@@ -1260,12 +1336,15 @@ class CanvasBox(QGraphicsItem):
             act_p_replace = act_p_remove = None
 
         haveIns = haveOuts = False
-        for port in canvas.port_list:
-            if port.group_id == self.m_group_id and port.port_id in self.m_port_list_ids:
-                if port.port_mode == PORT_MODE_INPUT:
-                    haveIns = True
-                elif port.port_mode == PORT_MODE_OUTPUT:
-                    haveOuts = True
+        for port_id in self.m_port_list_ids:
+            port = canvas.get_port(self.m_group_id, port_id)
+            if port is None:
+                continue
+
+            if port.port_mode == PORT_MODE_INPUT:
+                haveIns = True
+            elif port.port_mode == PORT_MODE_OUTPUT:
+                haveOuts = True
 
         if not (self.m_splitted or bool(haveIns and haveOuts)):
             act_x_sep2.setVisible(False)
@@ -1479,17 +1558,16 @@ class CanvasBox(QGraphicsItem):
         CanvasCallback(ACTION_GROUP_MOVE, self.m_group_id,
                        self.m_splitted_mode, x_y_str)
 
-        for group in canvas.group_list:
-            if group.group_id == self.m_group_id:
-                pos = QPoint(round(self.x()), round(self.y()))
+        group = canvas.get_group(self.m_group_id)
+        if group is not None:
+            pos = QPoint(round(self.x()), round(self.y()))
 
-                if self.m_splitted_mode == PORT_MODE_NULL:
-                    group.null_pos = pos
-                elif self.m_splitted_mode == PORT_MODE_INPUT:
-                    group.in_pos = pos
-                elif self.m_splitted_mode == PORT_MODE_OUTPUT:
-                    group.out_pos = pos
-                break
+            if self.m_splitted_mode == PORT_MODE_NULL:
+                group.null_pos = pos
+            elif self.m_splitted_mode == PORT_MODE_INPUT:
+                group.in_pos = pos
+            elif self.m_splitted_mode == PORT_MODE_OUTPUT:
+                group.out_pos = pos
 
     def fixPosAfterMove(self):
         for item in canvas.scene.selectedItems():
@@ -1506,9 +1584,73 @@ class CanvasBox(QGraphicsItem):
                           self.p_height + 2 * hws)
         return QRectF(0, 0, self.p_width, self.p_height)
 
+    def _place_title_lines(self):
+        title_x_pos = 8
+        if self.has_top_icon():
+            title_x_pos += 25
+
+        for title_line in self._title_lines:
+            title_line.x = title_x_pos
+            title_line.y = canvas.theme.box_text_ypos
+
+        if len(self._title_lines) >= 2:
+            if self._title_lines[0].is_little:
+                self._title_lines[0].y -= 7
+                self._title_lines[1].y += 9
+                if len(self._title_lines) >= 3:
+                    self._title_lines[2].y += 24
+            else:
+                if len(self._title_lines) == 4:
+                    self._title_lines[0].y -= 9
+                    self._title_lines[1].y += 2
+                    self._title_lines[2].y += 13
+                    self._title_lines[3].y += 24
+                else:
+                    self._title_lines[0].y -= 6
+                    self._title_lines[1].y += 9
+                    if len(self._title_lines) >= 3:
+                        self._title_lines[2].y += 24
+
+    def _paint_low_detail(self, painter):
+        ''' paint only a rectangle and the title, used at low zoom '''
+        painter.save()
+
+        if self.isSelected():
+            painter.setPen(canvas.theme.box_pen_sel)
+        else:
+            painter.setPen(canvas.theme.box_pen)
+        painter.setBrush(canvas.theme.box_bg_1)
+        painter.drawRect(QRectF(0, 0, self.p_width, self.p_height))
+
+        self._place_title_lines()
+
+        if self._is_hardware:
+            painter.setPen(canvas.theme.box_text_hw)
+        elif self.isSelected():
+            painter.setPen(canvas.theme.box_text_sel)
+        else:
+            painter.setPen(canvas.theme.box_text)
+
+        if self.m_is_semi_hidden:
+            painter.setOpacity(canvas.semi_hide_opacity)
+
+        for title_line in self._title_lines:
+            painter.setFont(title_line.font)
+            painter.drawText(
+                int((self.p_width - title_line.size) / 2 + 0.5),
+                int(title_line.y + 0.5),
+                title_line.text)
+
+        painter.restore()
+
     def paint(self, painter, option, widget):
         if canvas.scene.loading_items:
             return
+
+        if (option.levelOfDetailFromTransform(painter.worldTransform())
+                < options.low_detail_zoom):
+            self._paint_low_detail(painter)
+            return
         
         painter.save()
         painter.setRenderHint(QPainter.Antialiasing,
@@ -1723,31 +1865,7 @@ class CanvasBox(QGraphicsItem):
             painter.drawTiledPixmap(rect, canvas.theme.box_header_pixmap, rect.topLeft())
         
         # Draw text
-        title_x_pos = 8
-        if self.has_top_icon():
-            title_x_pos += 25
-
-        for title_line in self._title_lines:
-            title_line.x = title_x_pos
-            title_line.y = canvas.theme.box_text_ypos
-
-        if len(self._title_lines) >= 2:
-            if self._title_lines[0].is_little:
-                self._title_lines[0].y -= 7
-                self._title_lines[1].y += 9
-                if len(self._title_lines) >= 3:
-                    self._title_lines[2].y += 24
-            else:
-                if len(self._title_lines) == 4:
-                    self._title_lines[0].y -= 9
-                    self._title_lines[1].y += 2
-                    self._title_lines[2].y += 13
-                    self._title_lines[3].y += 24
-                else:
-                    self._title_lines[0].y -= 6
-                    self._title_lines[1].y += 9
-                    if len(self._title_lines) >= 3:
-                        self._title_lines[2].y += 24
+        self._place_title_lines()
 
         max_title_size = 0
         for title_line in self._title_lines:
@@ -31,6 +31,7 @@ from PyQt5.QtWidgets import QGraphicsColorizeEffect, QGraphicsPixmapItem
 
 from . import (
     canvas,
+    options,
     icon2str,
     CanvasIconType,
     ICON_APPLICATION,
@@ -46,7 +47,44 @@ from . import (
 )
 
 # ------------------------------------------------------------------------------------------------------------
+
+# icons, pixmaps and svg renderers shared by all boxes,
+# so that theme lookups are not done again for each box
+_app_icons = {}
+_app_pixmaps = {}
+_svg_renderers = {}
+
+def clearIconCache():
+    _app_icons.clear()
+    _app_pixmaps.clear()
+    _svg_renderers.clear()
+
 def getAppIcon(icon_name):
+    icon = _app_icons.get(icon_name)
+    if icon is None:
+        icon = _findAppIcon(icon_name)
+        _app_icons[icon_name] = icon
+
+    return icon
+
+def getAppPixmap(icon_name, size: int):
+    key = (icon_name, size, canvas.scene.getDevicePixelRatioF())
+    pixmap = _app_pixmaps.get(key)
+    if pixmap is None:
+        pixmap = getAppIcon(icon_name).pixmap(size, size)
+        _app_pixmaps[key] = pixmap
+
+    return pixmap
+
+def getSvgRenderer(icon_path: str):
+    renderer = _svg_renderers.get(icon_path)
+    if renderer is None:
+        renderer = QSvgRenderer(icon_path, canvas.scene)
+        _svg_renderers[icon_path] = renderer
+
+    return renderer
+
+def _findAppIcon(icon_name):
     #dark = bool(
         #widget.palette().brush(
             #2, QPalette.WindowText).color().lightness() > 128)
@@ -86,6 +124,7 @@ class CanvasIconPixmap(QGraphicsPixmapItem):
 
         self.p_size = QRectF(0.0, 0.0, 24.0, 24.0)
         self.icon = None
+        self.icon_name = ''
         self.x_offset = 4
         self.y_offset = 4
 
@@ -94,8 +133,9 @@ class CanvasIconPixmap(QGraphicsPixmapItem):
 
     def setIcon(self, icon, name):
         self.icon = getAppIcon(name)
+        self.icon_name = name
         if not self.icon.isNull():
-            pixmap = self.icon.pixmap(24, 24)
+            pixmap = getAppPixmap(name, 24)
             self.setPixmap(pixmap)
             self.setOffset(4.0, 4.0)
 
@@ -103,7 +143,7 @@ class CanvasIconPixmap(QGraphicsPixmapItem):
         if self.icon is None or scale <= 0.0:
             return
 
-        pixmap = self.icon.pixmap(int(0.5 + 24 * scale), int(0.5 + 24 * scale))
+        pixmap = getAppPixmap(self.icon_name, int(0.5 + 24 * scale))
         self.setPixmap(pixmap)
         self.setScale(1.0 / scale)
         self.setOffset(float(self.x_offset * scale), float(self.y_offset * scale))
@@ -125,6 +165,15 @@ class CanvasIconPixmap(QGraphicsPixmapItem):
     def type(self):
         return CanvasIconType
 
+    def paint(self, painter, option, widget):
+        # item is scaled to follow zoom (see update_zoom),
+        # so check the view scale, not the painter transform
+        if canvas.scene.getScaleFactor() < options.low_detail_zoom:
+            # box is painted with its title only at low zoom
+            return
+
+        QGraphicsPixmapItem.paint(self, painter, option, widget)
+
 
 class CanvasSvgIcon(QGraphicsSvgItem):
     def __init__(self, icon_type, name, port_mode, parent):
@@ -210,7 +259,7 @@ class CanvasSvgIcon(QGraphicsSvgItem):
                       icon2str(icon), name.encode()))
             return
 
-        self.m_renderer = QSvgRenderer(icon_path, canvas.scene)
+        self.m_renderer = getSvgRenderer(icon_path)
         self.setSharedRenderer(self.m_renderer)
         self.update()
 
@@ -233,6 +282,10 @@ class CanvasSvgIcon(QGraphicsSvgItem):
         return self.p_size
 
     def paint(self, painter, option, widget):
+        if canvas.scene.getScaleFactor() < options.low_detail_zoom:
+            # box is painted with its title only at low zoom
+            return
+
         if not self.m_renderer:
             QGraphicsSvgItem.paint(self, painter, option, widget)
             return
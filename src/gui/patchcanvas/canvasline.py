@@ -20,7 +20,7 @@
 # Imports (Global)
 
 from PyQt5.QtCore import Qt, QLineF
-from PyQt5.QtGui import QLinearGradient, QPainter, QPen
+from PyQt5.QtGui import QColor, QPainter, QPen
 from PyQt5.QtWidgets import QGraphicsLineItem
 
 # ------------------------------------------------------------------------------------------------------------
@@ -80,8 +80,10 @@ class CanvasLine(QGraphicsLineItem):
         self.updateLineGradient()
 
     def triggerDisconnect(self):
-        for connection in canvas.connection_list:
-            if (connection.port_out_id == self.item1.getPortId() and connection.port_in_id == self.item2.getPortId()):
+        for connection in canvas.get_port_connections(
+                self.item1.getGroupId(), self.item1.getPortId()):
+            if (connection.group_in_id == self.item2.getGroupId()
+                    and connection.port_in_id == self.item2.getPortId()):
                 canvas.callback(ACTION_PORTS_DISCONNECT, connection.connection_id, 0, "")
                 break
 
@@ -130,38 +132,30 @@ class CanvasLine(QGraphicsLineItem):
         return CanvasLineType
 
     def updateLineGradient(self):
-        pos_top = self.boundingRect().top()
-        pos_bot = self.boundingRect().bottom()
-        if self.item2.scenePos().y() >= self.item1.scenePos().y():
-            pos1 = 0
-            pos2 = 1
-        else:
-            pos1 = 1
-            pos2 = 0
-
-        port_type1 = self.item1.getPortType()
-        port_type2 = self.item2.getPortType()
-        port_gradient = QLinearGradient(0, pos_top, 0, pos_bot)
-
-        if port_type1 == PORT_TYPE_AUDIO_JACK:
-            port_gradient.setColorAt(pos1, canvas.theme.line_audio_jack_sel if self.m_lineSelected else canvas.theme.line_audio_jack)
-        elif port_type1 == PORT_TYPE_MIDI_JACK:
-            port_gradient.setColorAt(pos1, canvas.theme.line_midi_jack_sel if self.m_lineSelected else canvas.theme.line_midi_jack)
-        elif port_type1 == PORT_TYPE_MIDI_ALSA:
-            port_gradient.setColorAt(pos1, canvas.theme.line_midi_alsa_sel if self.m_lineSelected else canvas.theme.line_midi_alsa)
-        elif port_type1 == PORT_TYPE_PARAMETER:
-            port_gradient.setColorAt(pos1, canvas.theme.line_parameter_sel if self.m_lineSelected else canvas.theme.line_parameter)
-
-        if port_type2 == PORT_TYPE_AUDIO_JACK:
-            port_gradient.setColorAt(pos2, canvas.theme.line_audio_jack_sel if self.m_lineSelected else canvas.theme.line_audio_jack)
-        elif port_type2 == PORT_TYPE_MIDI_JACK:
-            port_gradient.setColorAt(pos2, canvas.theme.line_midi_jack_sel if self.m_lineSelected else canvas.theme.line_midi_jack)
-        elif port_type2 == PORT_TYPE_MIDI_ALSA:
-            port_gradient.setColorAt(pos2, canvas.theme.line_midi_alsa_sel if self.m_lineSelected else canvas.theme.line_midi_alsa)
-        elif port_type2 == PORT_TYPE_PARAMETER:
-            port_gradient.setColorAt(pos2, canvas.theme.line_parameter_sel if self.m_lineSelected else canvas.theme.line_parameter)
-
-        self.setPen(QPen(port_gradient, 2.00001, Qt.SolidLine, Qt.RoundCap))
+        # connected ports always have the same type,
+        # so the line has one color, and its pen can be shared
+        # by all lines of the same type and state
+        port_type = self.item1.getPortType()
+        pen_key = (CanvasLineType, port_type, self.m_lineSelected)
+        pen = canvas.theme.line_pen_cache.get(pen_key)
+
+        if pen is None:
+            theme = canvas.theme
+            color = QColor(0, 0, 0)
+
+            if port_type == PORT_TYPE_AUDIO_JACK:
+                color = theme.line_audio_jack_sel if self.m_lineSelected else theme.line_audio_jack
+            elif port_type == PORT_TYPE_MIDI_JACK:
+                color = theme.line_midi_jack_sel if self.m_lineSelected else theme.line_midi_jack
+            elif port_type == PORT_TYPE_MIDI_ALSA:
+                color = theme.line_midi_alsa_sel if self.m_lineSelected else theme.line_midi_alsa
+            elif port_type == PORT_TYPE_PARAMETER:
+                color = theme.line_parameter_sel if self.m_lineSelected else theme.line_parameter
+
+            pen = QPen(color, 2.00001, Qt.SolidLine, Qt.RoundCap)
+            canvas.theme.line_pen_cache[pen_key] = pen
+
+        self.setPen(pen)
 
     def paint(self, painter, option, widget):
         painter.save()
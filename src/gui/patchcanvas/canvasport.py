@@ -67,7 +67,6 @@ from .utils import (
     CanvasGetPortGroupPosition,
     CanvasGetPortPrintName,
     CanvasConnectionMatches,
-    CanvasConnectionConcerns,
     CanvasGetGroupIcon,
     CanvasConnectPorts,
     CanvasCallback)
@@ -114,6 +113,10 @@ class CanvasPort(QGraphicsItem):
 
         self.setFlags(QGraphicsItem.ItemIsSelectable)
 
+        # keep the painting in a pixmap cache, re-rendered only on update()
+        # or zoom change, so panning does not redo all the vector drawing
+        self.setCacheMode(QGraphicsItem.DeviceCoordinateCache)
+
         if options.auto_select_items:
             self.setAcceptHoverEvents(True)
 
@@ -179,6 +182,7 @@ class CanvasPort(QGraphicsItem):
 
     def setPortGroupId(self, portgrp_id):
         self.m_portgrp_id = portgrp_id
+        self.update()
 
     def setPortName(self, port_name):
         # if (QFontMetrics(self.m_port_font).width(port_name)
@@ -186,7 +190,7 @@ class CanvasPort(QGraphicsItem):
         #     QTimer.singleShot(0, canvas.scene.update)
 
         self.m_port_name = port_name
-        # self.update()
+        self.update()
 
     def get_width_for_text(self, text: str):
         return QFontMetrics(self.m_port_font).width(text)
@@ -199,11 +203,12 @@ class CanvasPort(QGraphicsItem):
             #QTimer.singleShot(0, canvas.scene.update)
 
         self.m_port_width = port_width
-        #self.update()
+        self.update()
 
     def set_print_name(self, print_name:str, width_limited: int):
         self.m_print_name = print_name
         self.m_name_truncked = False
+        self.update()
 
         if width_limited:
             sizer = QFontMetrics(self.m_port_font)
@@ -267,7 +272,7 @@ class CanvasPort(QGraphicsItem):
 
     def SetAsStereo(self, port_id):
         port_id_list = []
-        for port in canvas.port_list:
+        for port in canvas.get_group_ports(self.m_group_id):
             if port.port_id in (self.m_port_id, port_id):
                 port_id_list.append(port.port_id)
 
@@ -296,26 +301,26 @@ class CanvasPort(QGraphicsItem):
             # cut and paste connections directly by attempt to connect
             # one port to another with same type and mode
             if self.m_hover_item.getPortMode() == self.m_port_mode:
-                for connection in canvas.connection_list:
-                    if CanvasConnectionConcerns(
-                            connection, self.m_group_id, [self.m_port_id]):
-                        canvas.callback(ACTION_PORTS_DISCONNECT,
-                                        connection.connection_id, 0, '')
-
-                        con_group_id = connection.group_out_id
-                        con_port_id = connection.port_out_id
-                        if self.m_port_mode == PORT_MODE_OUTPUT:
-                            con_group_id = connection.group_in_id
-                            con_port_id = connection.port_in_id
-
-                        for hover_port_id in hover_port_id_list:
-                            CanvasConnectPorts(con_group_id, con_port_id,
-                                               hover_group_id, hover_port_id)
+                for connection in canvas.get_port_connections(
+                        self.m_group_id, self.m_port_id):
+                    canvas.callback(ACTION_PORTS_DISCONNECT,
+                                    connection.connection_id, 0, '')
+
+                    con_group_id = connection.group_out_id
+                    con_port_id = connection.port_out_id
+                    if self.m_port_mode == PORT_MODE_OUTPUT:
+                        con_group_id = connection.group_in_id
+                        con_port_id = connection.port_in_id
+
+                    for hover_port_id in hover_port_id_list:
+                        CanvasConnectPorts(con_group_id, con_port_id,
+                                           hover_group_id, hover_port_id)
                 return
 
             # FIXME clean this big if stuff
             for hover_port_id in hover_port_id_list:
-                for connection in canvas.connection_list:
+                for connection in canvas.get_port_connections(
+                        self.m_group_id, self.m_port_id):
                     if CanvasConnectionMatches(connection,
                                     self.m_group_id, [self.m_port_id],
                                     hover_group_id, [hover_port_id]):
@@ -364,13 +369,8 @@ class CanvasPort(QGraphicsItem):
             self.m_mouse_down = True
             self.m_cursor_moving = False
 
-            for connection in canvas.connection_list:
-                if CanvasConnectionConcerns(
-                        connection, self.m_group_id, [self.m_port_id]):
-                    self.m_has_connections = True
-                    break
-            else:
-                self.m_has_connections = False
+            self.m_has_connections = bool(canvas.get_port_connections(
+                self.m_group_id, self.m_port_id))
 
         elif event.button() == Qt.RightButton:
             if canvas.is_line_mov:
@@ -384,7 +384,8 @@ class CanvasPort(QGraphicsItem):
                         line_mov.updateLinePos(event.scenePos())
 
                     for connection in self.m_dotcon_list:
-                        if connection in canvas.connection_list:
+                        if (canvas.get_connection(connection.connection_id)
+                                is connection):
                             connection.widget.setReadyToDisc(True)
                             connection.widget.updateLineGradient()
 
@@ -401,10 +402,9 @@ class CanvasPort(QGraphicsItem):
             self.setCursor(QCursor(Qt.CrossCursor))
             self.m_cursor_moving = True
 
-            for connection in canvas.connection_list:
-                if CanvasConnectionConcerns(connection,
-                                self.m_group_id, [self.m_port_id]):
-                    connection.widget.setLocked(True)
+            for connection in canvas.get_port_connections(
+                    self.m_group_id, self.m_port_id):
+                connection.widget.setLocked(True)
 
         if not self.m_line_mov_list:
             if options.use_bezier_lines:
@@ -445,12 +445,8 @@ class CanvasPort(QGraphicsItem):
 
             if self.m_has_connections:
                 if item.type() == CanvasPortType:
-                    for connection in canvas.connection_list:
-                        if CanvasConnectionConcerns(
-                                connection, item.getGroupId(),
-                                [item.getPortId()]):
-                            break
-                    else:
+                    if not canvas.get_port_connections(
+                            item.getGroupId(), item.getPortId()):
                         item_valid = True
 
             if not item_valid:
@@ -498,7 +494,8 @@ class CanvasPort(QGraphicsItem):
                             i, self.m_hover_item.getPortLength())
                         self.m_line_mov_list.append(line_mov)
 
-                for connection in canvas.connection_list:
+                for connection in canvas.get_port_connections(
+                        self.m_group_id, self.m_port_id):
                     if CanvasConnectionMatches(
                             connection,
                             self.m_group_id, [self.m_port_id],
@@ -522,18 +519,17 @@ class CanvasPort(QGraphicsItem):
 
                 if item.getPortMode() == self.m_port_mode:
                     # situation of cut and paste existing connections
-                    for connection in canvas.connection_list:
-                        if CanvasConnectionConcerns(
-                                connection,
-                                self.m_group_id, [self.m_port_id]):
-                            connection.widget.setReadyToDisc(True)
-                            connection.widget.updateLineGradient()
-                            self.m_dotcon_list.append(connection)
+                    for connection in canvas.get_port_connections(
+                            self.m_group_id, self.m_port_id):
+                        connection.widget.setReadyToDisc(True)
+                        connection.widget.updateLineGradient()
+                        self.m_dotcon_list.append(connection)
 
                     for line_mov in self.m_line_mov_list:
                         line_mov.setReadyToDisc(True)
                 else:
-                    for connection in canvas.connection_list:
+                    for connection in canvas.get_port_connections(
+                            self.m_group_id, self.m_port_id):
                         if CanvasConnectionMatches(
                                 connection,
                                 self.m_group_id, [self.m_port_id],
@@ -575,10 +571,9 @@ class CanvasPort(QGraphicsItem):
                     del item
                 self.m_line_mov_list.clear()
 
-            for connection in canvas.connection_list:
-                if CanvasConnectionConcerns(connection,
-                            self.m_group_id, [self.m_port_id]):
-                    connection.widget.setLocked(False)
+            for connection in canvas.get_port_connections(
+                    self.m_group_id, self.m_port_id):
+                connection.widget.setLocked(False)
 
             if self.m_hover_item:
                 if (self.m_last_rclick_item != self.m_hover_item
@@ -624,9 +619,8 @@ class CanvasPort(QGraphicsItem):
 
             # get list of available mono ports settables as stereo with port
             port_cousin_list = []
-            for port in canvas.port_list:
+            for port in canvas.get_group_ports(self.m_group_id):
                 if (port.port_type == PORT_TYPE_AUDIO_JACK
-                        and port.group_id == self.m_group_id
                         and port.port_mode == self.m_port_mode
                         and not port.is_alternate):
                     port_cousin_list.append(port.port_id)
@@ -639,7 +633,7 @@ class CanvasPort(QGraphicsItem):
                 stereo_able_ids_list.append(port_cousin_list[selfport_index +1])
 
             at_least_one = False
-            for port in canvas.port_list:
+            for port in canvas.get_group_ports(self.m_group_id):
                 if port.port_id in stereo_able_ids_list and not port.portgrp_id:
                     act_x_setasstereo = StereoMenu.addAction(port.port_name)
                     act_x_setasstereo.setData([self, port.port_id])
@@ -672,10 +666,9 @@ class CanvasPort(QGraphicsItem):
             canvas.callback(ACTION_PORT_RENAME, self.m_group_id, self.m_port_id, "")
 
     def setPortSelected(self, yesno):
-        for connection in canvas.connection_list:
-            if CanvasConnectionConcerns(connection,
-                            self.m_group_id, [self.m_port_id]):
-                connection.widget.setLineSelected(yesno)
+        for connection in canvas.get_port_connections(
+                self.m_group_id, self.m_port_id):
+            connection.widget.setLineSelected(yesno)
 
     def itemChange(self, change, value):
         if change == QGraphicsItem.ItemSelectedHasChanged:
@@ -737,6 +730,15 @@ class CanvasPort(QGraphicsItem):
                       % port_type2str(self.m_port_type))
             return
 
+        if (option.levelOfDetailFromTransform(painter.worldTransform())
+                < options.low_detail_zoom):
+            # low zoom, port is just a colored bar
+            painter.setPen(Qt.NoPen)
+            painter.setBrush(poly_color)
+            painter.drawRect(self.boundingRect().adjusted(0, 1, 0, -1))
+            painter.restore()
+            return
+
         # To prevent quality worsening
         poly_pen = QPen(poly_pen)
         poly_pen.setWidthF(poly_pen.widthF() + 0.00001)
@@ -809,13 +811,12 @@ class CanvasPort(QGraphicsItem):
 
             # look in portgroup if port is the first,
             # the last, or not.
-            for portgrp in canvas.portgrp_list:
-                if portgrp.portgrp_id == self.m_portgrp_id:
-                    if self.m_port_id == portgrp.port_id_list[0]:
-                        first_of_portgrp = True
-                    if self.m_port_id == portgrp.port_id_list[-1]:
-                        last_of_portgrp = True
-                    break
+            portgrp = canvas.get_portgrp(self.m_group_id, self.m_portgrp_id)
+            if portgrp is not None:
+                if self.m_port_id == portgrp.port_id_list[0]:
+                    first_of_portgrp = True
+                if self.m_port_id == portgrp.port_id_list[-1]:
+                    last_of_portgrp = True
 
             if first_of_portgrp:
                 polygon += QPointF(poly_locx[0] , lineHinting)
@@ -59,7 +59,7 @@ from .connect_menu import MainPortContextMenu
 from .utils import (CanvasGetFullPortName, CanvasGetPortConnectionList,
                     CanvasGetPortGroupPosition, CanvasGetPortPrintName,
                     CanvasGetPortGroupName, CanvasGetPortGroupFullName,
-                    CanvasConnectionMatches, CanvasConnectionConcerns,
+                    CanvasConnectionMatches, CanvasGetPortsConnections,
                     CanvasCallback, CanvasConnectPorts)
 
 # ------------------------------------------------------------------------------------------------------------
@@ -105,6 +105,10 @@ class CanvasPortGroup(QGraphicsItem):
         self.m_cursor_moving = False
         self.setFlags(QGraphicsItem.ItemIsSelectable)
 
+        # keep the painting in a pixmap cache, re-rendered only on update()
+        # or zoom change, so panning does not redo all the vector drawing
+        self.setCacheMode(QGraphicsItem.DeviceCoordinateCache)
+
     def getPortGroupId(self):
         return self.m_portgrp_id
 
@@ -169,15 +173,17 @@ class CanvasPortGroup(QGraphicsItem):
             #QTimer.singleShot(0, canvas.scene.update)
 
         self.m_portgrp_width = portgrp_width
-        #self.update()
+        self.update()
 
     def set_ports_width(self, ports_width:int):
         self.m_ports_width = ports_width
+        self.update()
 
     def set_print_name(self, print_name:str, width_limited: int):
         self.m_print_name = print_name
         self.m_normal_print_name = print_name
         self.m_name_truncked = False
+        self.update()
 
         if width_limited:
             sizer = QFontMetrics(self.m_portgrp_font)
@@ -253,35 +259,33 @@ class CanvasPortGroup(QGraphicsItem):
 
             if self.m_hover_item.getPortMode() == self.m_port_mode:
                 for i in range(len(self.m_port_id_list)):
-                    for connection in canvas.connection_list:
-                        if CanvasConnectionConcerns(
-                                connection, self.m_group_id,
-                                [self.m_port_id_list[i]]):
-                            canvas.callback(
-                                ACTION_PORTS_DISCONNECT,
-                                connection.connection_id,
-                                0, '')
-
-                            for j in range(len(hover_port_id_list)):
-                                if len(hover_port_id_list) >= len(self.m_port_id_list):
-                                    if j % len(self.m_port_id_list) != i:
-                                        continue
-                                else:
-                                    if i % len(hover_port_id_list) != j:
-                                        continue
-
-                                if self.m_port_mode == PORT_MODE_OUTPUT:
-                                    canvas.callback(
-                                        ACTION_PORTS_CONNECT, 0, 0,
-                                        "%i:%i:%i:%i" % (
-                                            hover_group_id, hover_port_id_list[j],
-                                            connection.group_in_id, connection.port_in_id))
-                                else:
-                                    canvas.callback(
-                                        ACTION_PORTS_CONNECT, 0, 0,
-                                        "%i:%i:%i:%i" % (
-                                            connection.group_out_id, connection.port_out_id,
-                                            hover_group_id, hover_port_id_list[j]))
+                    for connection in canvas.get_port_connections(
+                            self.m_group_id, self.m_port_id_list[i]):
+                        canvas.callback(
+                            ACTION_PORTS_DISCONNECT,
+                            connection.connection_id,
+                            0, '')
+
+                        for j in range(len(hover_port_id_list)):
+                            if len(hover_port_id_list) >= len(self.m_port_id_list):
+                                if j % len(self.m_port_id_list) != i:
+                                    continue
+                            else:
+                                if i % len(hover_port_id_list) != j:
+                                    continue
+
+                            if self.m_port_mode == PORT_MODE_OUTPUT:
+                                canvas.callback(
+                                    ACTION_PORTS_CONNECT, 0, 0,
+                                    "%i:%i:%i:%i" % (
+                                        hover_group_id, hover_port_id_list[j],
+                                        connection.group_in_id, connection.port_in_id))
+                            else:
+                                canvas.callback(
+                                    ACTION_PORTS_CONNECT, 0, 0,
+                                    "%i:%i:%i:%i" % (
+                                        connection.group_out_id, connection.port_out_id,
+                                        hover_group_id, hover_port_id_list[j]))
                 return
 
 
@@ -290,7 +294,8 @@ class CanvasPortGroup(QGraphicsItem):
                 for j in range(len(hover_port_id_list)):
                     hover_port_id = hover_port_id_list[j]
 
-                    for connection in canvas.connection_list:
+                    for connection in canvas.get_port_connections(
+                            self.m_group_id, port_id):
                         if CanvasConnectionMatches(connection,
                                         self.m_group_id, [port_id],
                                         hover_group_id, [hover_port_id]):
@@ -368,13 +373,8 @@ class CanvasPortGroup(QGraphicsItem):
             self.m_mouse_down = True
             self.m_cursor_moving = False
 
-            for connection in canvas.connection_list:
-                if CanvasConnectionConcerns(
-                        connection, self.m_group_id, self.m_port_id_list):
-                    self.m_has_connections = True
-                    break
-            else:
-                self.m_has_connections = False
+            self.m_has_connections = bool(CanvasGetPortsConnections(
+                self.m_group_id, self.m_port_id_list))
 
         elif event.button() == Qt.RightButton:
             if canvas.is_line_mov:
@@ -397,10 +397,9 @@ class CanvasPortGroup(QGraphicsItem):
             self.setCursor(QCursor(Qt.CrossCursor))
             self.m_cursor_moving = True
 
-            for connection in canvas.connection_list:
-                if CanvasConnectionConcerns(connection,
-                                self.m_group_id, self.m_port_id_list):
-                    connection.widget.setLocked(True)
+            for connection in CanvasGetPortsConnections(
+                    self.m_group_id, self.m_port_id_list):
+                connection.widget.setLocked(True)
 
         if not self.m_line_mov_list:
             self.m_last_rclick_item = None
@@ -408,9 +407,9 @@ class CanvasPortGroup(QGraphicsItem):
             self.setZValue(canvas.last_z_value)
             canvas.last_z_value += 1
 
-            for port in canvas.port_list:
-                if (port.group_id == self.m_group_id
-                        and port.port_id in self.m_port_id_list):
+            for port_id in self.m_port_id_list:
+                port = canvas.get_port(self.m_group_id, port_id)
+                if port is not None:
                     port.widget.setZValue(canvas.last_z_value)
 
             for i in range(len(self.m_port_id_list)):
@@ -452,12 +451,8 @@ class CanvasPortGroup(QGraphicsItem):
             if (self.m_has_connections
                     and item.type() == CanvasPortGroupType
                     and len(item.getPortsList()) == len(self.m_port_id_list)):
-                for connection in canvas.connection_list:
-                    if CanvasConnectionConcerns(
-                            connection, item.getGroupId(),
-                            item.getPortsList()):
-                        break
-                else:
+                if not CanvasGetPortsConnections(
+                        item.getGroupId(), item.getPortsList()):
                     item_valid = True
 
             if not item_valid:
@@ -487,7 +482,8 @@ class CanvasPortGroup(QGraphicsItem):
 
                 self.m_dotcon_list.clear()
 
-                for connection in canvas.connection_list:
+                for connection in CanvasGetPortsConnections(
+                        self.m_group_id, self.m_port_id_list):
                     if CanvasConnectionMatches(
                             connection,
                             self.m_group_id, self.m_port_id_list,
@@ -508,13 +504,11 @@ class CanvasPortGroup(QGraphicsItem):
                 self.resetLineMovPositions()
 
                 if item.getPortMode() == self.m_port_mode:
-                    for connection in canvas.connection_list:
-                        if CanvasConnectionConcerns(
-                                connection,
-                                self.m_group_id, self.m_port_id_list):
-                            connection.widget.setReadyToDisc(True)
-                            connection.widget.updateLineGradient()
-                            self.m_dotcon_list.append(connection)
+                    for connection in CanvasGetPortsConnections(
+                            self.m_group_id, self.m_port_id_list):
+                        connection.widget.setReadyToDisc(True)
+                        connection.widget.updateLineGradient()
+                        self.m_dotcon_list.append(connection)
 
                     for line_mov in self.m_line_mov_list:
                         line_mov.setReadyToDisc(True)
@@ -559,7 +553,8 @@ class CanvasPortGroup(QGraphicsItem):
                     symetric_con_list = []
                     for portself_id in self.m_port_id_list:
                         for porthover_id in self.m_hover_item.getPortsList():
-                            for connection in canvas.connection_list:
+                            for connection in canvas.get_port_connections(
+                                    self.m_group_id, portself_id):
                                 if CanvasConnectionMatches(
                                         connection,
                                         self.m_group_id, [portself_id],
@@ -610,9 +605,9 @@ class CanvasPortGroup(QGraphicsItem):
                     del item
                 self.m_line_mov_list.clear()
 
-                for connection in canvas.connection_list:
-                    if CanvasConnectionConcerns(connection, self.m_group_id, self.m_port_id_list):
-                        connection.widget.setLocked(False)
+                for connection in CanvasGetPortsConnections(
+                        self.m_group_id, self.m_port_id_list):
+                    connection.widget.setLocked(False)
 
                 if self.m_hover_item:
                     if (self.m_last_rclick_item != self.m_hover_item
@@ -656,10 +651,9 @@ class CanvasPortGroup(QGraphicsItem):
         event.accept()
 
     def setPortGroupSelected(self, yesno):
-        for connection in canvas.connection_list:
-            if CanvasConnectionConcerns(connection,
-                            self.m_group_id, self.m_port_id_list):
-                connection.widget.setLineSelected(yesno)
+        for connection in CanvasGetPortsConnections(
+                self.m_group_id, self.m_port_id_list):
+            connection.widget.setLineSelected(yesno)
 
     def itemChange(self, change, value):
         if change == QGraphicsItem.ItemSelectedHasChanged:
@@ -685,6 +679,27 @@ class CanvasPortGroup(QGraphicsItem):
         painter.setRenderHint(
             QPainter.Antialiasing, bool(options.antialiasing == ANTIALIASING_FULL))
 
+        if (option.levelOfDetailFromTransform(painter.worldTransform())
+                < options.low_detail_zoom):
+            # low zoom, portgroup is just a colored bar
+            theme = canvas.theme
+            selected = self.isSelected()
+
+            if self.m_port_type == PORT_TYPE_MIDI_JACK:
+                bar_color = theme.port_midi_jack_bg_sel if selected else theme.port_midi_jack_bg
+            elif self.m_port_type == PORT_TYPE_MIDI_ALSA:
+                bar_color = theme.port_midi_alsa_bg_sel if selected else theme.port_midi_alsa_bg
+            elif self.m_port_type == PORT_TYPE_PARAMETER:
+                bar_color = theme.port_parameter_bg_sel if selected else theme.port_parameter_bg
+            else:
+                bar_color = theme.portgrp_audio_jack_bg_sel if selected else theme.portgrp_audio_jack_bg
+
+            painter.setPen(Qt.NoPen)
+            painter.setBrush(bar_color)
+            painter.drawRect(self.boundingRect().adjusted(0, 1, 0, -1))
+            painter.restore()
+            return
+
         lineHinting = canvas.theme.port_audio_jack_pen.widthF() / 2
 
         poly_locx = [0, 0, 0, 0, 0]
@@ -696,7 +711,7 @@ class CanvasPortGroup(QGraphicsItem):
         if self.m_port_mode == PORT_MODE_INPUT:
             port_width = canvas.theme.port_in_portgrp_width
 
-            for port in canvas.port_list:
+            for port in canvas.get_group_ports(self.m_group_id):
                 if port.port_id in self.m_port_id_list:
                     port_print_name = CanvasGetPortPrintName(
                         port.group_id, port.port_id, self.m_portgrp_id)
@@ -20,6 +20,7 @@ from .utils import(
     CanvasCallback,
     CanvasConnectionMatches,
     CanvasConnectionConcerns,
+    CanvasGetPortsConnections,
     CanvasGetGroupIcon,
     CanvasGetFullPortName,
     CanvasGetPortConnectionList,
@@ -107,24 +108,22 @@ class ConnectGroupMenu(SubMenu):
 
         self._last_portgrp_id = 0
 
-        for port in canvas.port_list:
-            if (port.group_id == self._menu_group_id
-                    and port.port_type == self._port_type
+        for port in canvas.get_group_ports(self._menu_group_id):
+            if (port.port_type == self._port_type
                     and port.port_mode != self._port_mode):
                 if self._portgrp_id and port.portgrp_id:
                     if port.portgrp_id != self._last_portgrp_id:
-                        for portgrp in canvas.portgrp_list:
-                            if (portgrp.group_id == port.group_id
-                                    and portgrp.portgrp_id == port.portgrp_id):
-                                portgrp_full_name = CanvasGetPortGroupFullName(
-                                    portgrp.group_id, portgrp.portgrp_id)
-                                portgrp_name = '‖ ' \
-                                    + portgrp_full_name.partition(':')[2]
-
-                                # all portgroups items will have -1 as port_id
-                                self.add_element(-1, port.portgrp_id,
-                                                 portgrp_name)
-                                break
+                        portgrp = canvas.get_portgrp(
+                            port.group_id, port.portgrp_id)
+                        if portgrp is not None:
+                            portgrp_full_name = CanvasGetPortGroupFullName(
+                                portgrp.group_id, portgrp.portgrp_id)
+                            portgrp_name = '‖ ' \
+                                + portgrp_full_name.partition(':')[2]
+
+                            # all portgroups items will have -1 as port_id
+                            self.add_element(-1, port.portgrp_id,
+                                             portgrp_name)
                 else:
                     if (dangerous_mode == DANGEROUS_YES
                             and self._is_alternate == port.is_alternate):
@@ -218,7 +217,8 @@ class DangerousMenu(SubMenu):
                 CanvasConnectPortGroups(self._group_id, self._portgrp_id,
                                         group_id, portgrp_id, disconnect=True)
             else:
-                for connection in canvas.connection_list:
+                for connection in CanvasGetPortsConnections(
+                        self._group_id, self._port_id_list):
                     if CanvasConnectionMatches(
                             connection, self._group_id, self._port_id_list,
                             group_id, [port_id]):
@@ -259,9 +259,8 @@ class ConnectMenu(SubMenu):
             has_dangerous = False
             has_regular = False
 
-            for port in canvas.port_list:
-                if (port.group_id == group.group_id
-                        and port.port_type == self._port_type
+            for port in canvas.get_group_ports(group.group_id):
+                if (port.port_type == self._port_type
                         and port.port_mode != self._port_mode):
 
                     if (self._port_type == PORT_TYPE_AUDIO_JACK
@@ -325,7 +324,8 @@ class ConnectMenu(SubMenu):
                 CanvasConnectPortGroups(self._group_id, self._portgrp_id,
                                         group_id, portgrp_id, disconnect=True)
             else:
-                for connection in canvas.connection_list:
+                for connection in CanvasGetPortsConnections(
+                        self._group_id, self._port_id_list):
                     if CanvasConnectionMatches(
                             connection, self._group_id, self._port_id_list,
                             group_id, [port_id]):
@@ -391,7 +391,8 @@ class DisconnectMenu(SubMenu):
 
         for element in self.elements:
             if element['action'] == action:
-                for connection in canvas.connection_list:
+                for connection in CanvasGetPortsConnections(
+                        self._group_id, self._port_id_list):
                     if CanvasConnectionMatches(
                             connection, self._group_id, self._port_id_list,
                             element['group_id'], element['port_id_list']):
@@ -514,7 +515,8 @@ class ClipboardMenu(SubMenu):
         for self_port_id in self._port_id_list:
             group_port_ids = []
 
-            for connection in canvas.connection_list:
+            for connection in canvas.get_port_connections(
+                    self._group_id, self_port_id):
                 if self._port_mode == PORT_MODE_OUTPUT:
                     if (connection.group_out_id == self._group_id
                             and connection.port_out_id == self_port_id):
@@ -556,7 +558,8 @@ class ClipboardMenu(SubMenu):
 
                         if canvas.clipboard_cut:
                             # remove the original connection if still exists
-                            for connection in canvas.connection_list:
+                            for connection in canvas.get_port_connections(
+                                    element.group_id, element.port_id):
                                 if CanvasConnectionMatches(
                                         connection,
                                         element.group_id, [element.port_id],
@@ -587,26 +590,23 @@ class MainPortContextMenu(QMenu):
 
         if portgrp_id:
             # menu is for a portgroup
-            for portgrp in canvas.portgrp_list:
-                if (portgrp.group_id == group_id
-                        and portgrp.portgrp_id == portgrp_id):
-                    port_type = portgrp.port_type
-                    port_mode = portgrp.port_mode
-                    is_alternate = False
-                    break
-            else:
+            portgrp = canvas.get_portgrp(group_id, portgrp_id)
+            if portgrp is None:
                 return
+
+            port_type = portgrp.port_type
+            port_mode = portgrp.port_mode
+            is_alternate = False
         else:
             # menu is for a port
-            for port in canvas.port_list:
-                if port.group_id == group_id and port.port_id == port_id:
-                    port_type = port.port_type
-                    port_mode = port.port_mode
-                    is_alternate = port.is_alternate
-                    break
-            else:
+            port = canvas.get_port(group_id, port_id)
+            if port is None:
                 return
 
+            port_type = port.port_type
+            port_mode = port.port_mode
+            is_alternate = port.is_alternate
+
         border_color = canvas.theme.port_audio_jack_pen.color().name()
         sel_bg = canvas.theme.port_audio_jack_bg.name()
         sel_text_color = canvas.theme.port_audio_jack_text.color().name()
@@ -664,10 +664,9 @@ class MainPortContextMenu(QMenu):
 
         self.addSeparator()
 
-        for connection in canvas.connection_list:
-            if CanvasConnectionConcerns(
-                    connection, self._group_id, self._port_id_list):
-                self.add_connection(connection)
+        for connection in CanvasGetPortsConnections(
+                self._group_id, self._port_id_list):
+            self.add_connection(connection)
 
     def get_port_attributes(self)->tuple:
         return (self._group_id, self._port_id,
@@ -678,95 +677,97 @@ class MainPortContextMenu(QMenu):
             CanvasCallback(ACTION_PORTS_DISCONNECT,
                            connection.connection_id, 0, '')
 
+    def _get_connected_port(self, connection):
+        ''' returns the port at the other side of the connection '''
+        if self._port_mode == PORT_MODE_OUTPUT:
+            return canvas.get_port(connection.group_in_id,
+                                   connection.port_in_id)
+        elif self._port_mode == PORT_MODE_INPUT:
+            return canvas.get_port(connection.group_out_id,
+                                   connection.port_out_id)
+        return None
+
     def add_connection(self, connection):
         self.connection_list.append(connection)
 
-        for port in canvas.port_list:
-            if ((self._port_mode == PORT_MODE_OUTPUT
-                        and port.group_id == connection.group_in_id
-                        and port.port_id == connection.port_in_id)
-                    or (self._port_mode == PORT_MODE_INPUT
-                        and port.group_id == connection.group_out_id
-                        and port.port_id == connection.port_out_id)):
-                group_id = port.group_id
-                port_id = port.port_id
-                portgrp_id = port.portgrp_id
-                port_id_list = [port_id]
-
-                if self._portgrp_id and portgrp_id:
-                    port_id = -1
-                    port_id_list = CanvasGetPortGroupPortList(
-                        group_id, portgrp_id)
-
-                con_state = CanvasPortGroupConnectionState(
-                    self._group_id, self._port_id_list,
-                    group_id, port_id_list)
-
-                for group_menu in self.connect_menu.group_menus:
-                    if group_menu.group_id() == group_id:
-                        group_menu.check_element(
-                            port_id, portgrp_id, con_state)
-                        break
+        port = self._get_connected_port(connection)
+        if port is None:
+            return
 
-                for group_menu in self.connect_menu.dangerous_submenu.group_menus:
-                    if group_menu.group_id() == group_id:
-                        group_menu.check_element(
-                            port_id, portgrp_id, con_state)
-                        break
+        group_id = port.group_id
+        port_id = port.port_id
+        portgrp_id = port.portgrp_id
+        port_id_list = [port_id]
 
-                self.disconnect_menu.add_element(group_id, port_id_list,
-                                                 portgrp_id)
+        if self._portgrp_id and portgrp_id:
+            port_id = -1
+            port_id_list = CanvasGetPortGroupPortList(
+                group_id, portgrp_id)
+
+        con_state = CanvasPortGroupConnectionState(
+            self._group_id, self._port_id_list,
+            group_id, port_id_list)
+
+        for group_menu in self.connect_menu.group_menus:
+            if group_menu.group_id() == group_id:
+                group_menu.check_element(
+                    port_id, portgrp_id, con_state)
+                break
+
+        for group_menu in self.connect_menu.dangerous_submenu.group_menus:
+            if group_menu.group_id() == group_id:
+                group_menu.check_element(
+                    port_id, portgrp_id, con_state)
                 break
 
+        self.disconnect_menu.add_element(group_id, port_id_list,
+                                         portgrp_id)
+
     def connection_added_to_canvas(self, connection_id: int):
-        for connection in canvas.connection_list:
-            if connection.connection_id == connection_id:
-                if not CanvasConnectionConcerns(
-                        connection, self._group_id, self._port_id_list):
-                    return
+        connection = canvas.get_connection(connection_id)
+        if connection is None:
+            return
+
+        if not CanvasConnectionConcerns(
+                connection, self._group_id, self._port_id_list):
+            return
 
-                self.add_connection(connection)
+        self.add_connection(connection)
 
     def connection_removed_from_canvas(self, connection_id: int):
         for connection in self.connection_list:
             if connection.connection_id == connection_id:
-                for port in canvas.port_list:
-                    if ((self._port_mode == PORT_MODE_OUTPUT
-                            and port.group_id == connection.group_in_id
-                            and port.port_id == connection.port_in_id)
-                        or (self._port_mode == PORT_MODE_INPUT
-                            and port.group_id == connection.group_out_id
-                            and port.port_id == connection.port_out_id)):
-                        group_id = port.group_id
-                        port_id = port.port_id
-                        portgrp_id = port.portgrp_id
-
-                        if self._portgrp_id and portgrp_id:
-                            port_id = -1
-                            port_id_list = CanvasGetPortGroupPortList(
-                                group_id, portgrp_id)
-                        else:
-                            port_id_list = [port_id]
-
-                        con_state = CanvasPortGroupConnectionState(
-                            self._group_id, self._port_id_list,
-                            group_id, port_id_list)
-
-                        for group_menu in self.connect_menu.group_menus:
-                            if group_menu.group_id() == group_id:
-                                group_menu.check_element(
-                                    port_id, portgrp_id, con_state)
-                                break
-
-                        for group_menu in self.connect_menu.dangerous_submenu.group_menus:
-                            if group_menu.group_id() == group_id:
-                                group_menu.check_element(
-                                    port_id, portgrp_id, con_state)
-                                break
-
-                        self.disconnect_menu.remove_element(
-                            group_id, port_id_list, portgrp_id)
-                        break
+                port = self._get_connected_port(connection)
+                if port is not None:
+                    group_id = port.group_id
+                    port_id = port.port_id
+                    portgrp_id = port.portgrp_id
+
+                    if self._portgrp_id and portgrp_id:
+                        port_id = -1
+                        port_id_list = CanvasGetPortGroupPortList(
+                            group_id, portgrp_id)
+                    else:
+                        port_id_list = [port_id]
+
+                    con_state = CanvasPortGroupConnectionState(
+                        self._group_id, self._port_id_list,
+                        group_id, port_id_list)
+
+                    for group_menu in self.connect_menu.group_menus:
+                        if group_menu.group_id() == group_id:
+                            group_menu.check_element(
+                                port_id, portgrp_id, con_state)
+                            break
+
+                    for group_menu in self.connect_menu.dangerous_submenu.group_menus:
+                        if group_menu.group_id() == group_id:
+                            group_menu.check_element(
+                                port_id, portgrp_id, con_state)
+                            break
+
+                    self.disconnect_menu.remove_element(
+                        group_id, port_id_list, portgrp_id)
 
                 self.connection_list.remove(connection)
                 break
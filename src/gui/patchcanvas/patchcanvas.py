@@ -58,7 +58,8 @@ from .canvasbezierline import CanvasBezierLine
 from .canvasline import CanvasLine
 from .theme import Theme, getDefaultTheme, getThemeName
 from .utils import (CanvasCallback, CanvasGetNewGroupPos, CanvasItemFX,
-    CanvasRemoveItemFX, CanvasGetPortGroupPosition, CanvasGetNewGroupPositions)
+    CanvasRemoveItemFX, CanvasGetPortGroupPosition, CanvasGetNewGroupPositions,
+    CanvasClearIconCache)
 
 # FIXME
 from . import *
@@ -238,10 +239,7 @@ def clear():
     canvas.last_z_value = 0
     canvas.last_connection_id = 0
 
-    canvas.group_list = []
-    canvas.port_list = []
-    canvas.portgrp_list = []
-    canvas.connection_list = []
+    canvas.clear_registry()
     canvas.group_plugin_map = {}
 
     canvas.scene.clearSelection()
@@ -288,11 +286,10 @@ def addGroup(group_id, group_name, split=SPLIT_UNDEF, icon_type=ICON_APPLICATION
         print("PatchCanvas::addGroup(%i, %s, %s, %s)" % (
               group_id, group_name.encode(), split2str(split), icon2str(icon_type)))
 
-    for group in canvas.group_list:
-        if group.group_id == group_id:
-            qWarning("PatchCanvas::addGroup(%i, %s, %s, %s) - group already exists" % (
-                     group_id, group_name.encode(), split2str(split), icon2str(icon_type)))
-            return
+    if canvas.get_group(group_id) is not None:
+        qWarning("PatchCanvas::addGroup(%i, %s, %s, %s) - group already exists" % (
+                 group_id, group_name.encode(), split2str(split), icon2str(icon_type)))
+        return
 
     if split == SPLIT_UNDEF:
         isHardware = bool(icon_type == ICON_HARDWARE)
@@ -361,7 +358,7 @@ def addGroup(group_id, group_name, split=SPLIT_UNDEF, icon_type=ICON_APPLICATION
     canvas.last_z_value += 1
     group_box.setZValue(canvas.last_z_value)
 
-    canvas.group_list.append(group_dict)
+    canvas.add_group(group_dict)
 
     if options.eyecandy == EYECANDY_FULL and not options.auto_hide_groups:
         CanvasItemFX(group_box, True, False)
@@ -386,66 +383,72 @@ def removeGroup(group_id, save_positions=True, fast=False):
     if canvas.debug:
         print("PatchCanvas::removeGroup(%i)" % group_id)
 
-    for group in canvas.group_list:
-        if group.group_id == group_id:
-            item = group.widgets[0]
-            group_name = group.group_name
+    group = canvas.get_group(group_id)
+    if group is None:
+        qCritical("PatchCanvas::removeGroup(%i) - unable to find group to remove" % group_id)
+        return
 
-            if group.split:
-                s_item = group.widgets[1]
+    item = group.widgets[0]
+    group_name = group.group_name
 
-                if features.handle_group_pos and save_positions:
-                    canvas.settings.setValue("CanvasPositions/%s_OUTPUT" % group_name, item.pos())
-                    canvas.settings.setValue("CanvasPositions/%s_INPUT" % group_name, s_item.pos())
-                    canvas.settings.setValue("CanvasPositions/%s_SPLIT" % group_name, SPLIT_YES)
+    if group.split:
+        s_item = group.widgets[1]
 
-                if options.eyecandy == EYECANDY_FULL:
-                    CanvasItemFX(s_item, False, True)
-                else:
-                    s_item.removeIconFromScene()
-                    canvas.scene.removeItem(s_item)
-                    del s_item
+        if features.handle_group_pos and save_positions:
+            canvas.settings.setValue("CanvasPositions/%s_OUTPUT" % group_name, item.pos())
+            canvas.settings.setValue("CanvasPositions/%s_INPUT" % group_name, s_item.pos())
+            canvas.settings.setValue("CanvasPositions/%s_SPLIT" % group_name, SPLIT_YES)
 
-            else:
-                if features.handle_group_pos and save_positions:
-                    canvas.settings.setValue("CanvasPositions/%s" % group_name, item.pos())
-                    canvas.settings.setValue("CanvasPositions/%s_SPLIT" % group_name, SPLIT_NO)
+        # box is leaving, do not let it repulse other boxes
+        canvas.scene.box_index.remove_box(s_item)
 
-            if options.eyecandy == EYECANDY_FULL:
-                CanvasItemFX(item, False, True)
-            else:
-                item.removeIconFromScene()
-                canvas.scene.removeItem(item)
-                del item
+        if options.eyecandy == EYECANDY_FULL:
+            CanvasItemFX(s_item, False, True)
+        else:
+            s_item.removeIconFromScene()
+            canvas.scene.removeItem(s_item)
+            del s_item
 
-            canvas.group_list.remove(group)
-            canvas.group_plugin_map.pop(group.plugin_id, None)
+    else:
+        if features.handle_group_pos and save_positions:
+            canvas.settings.setValue("CanvasPositions/%s" % group_name, item.pos())
+            canvas.settings.setValue("CanvasPositions/%s_SPLIT" % group_name, SPLIT_NO)
 
-            if fast:
-                return
+    # box is leaving, do not let it repulse other boxes
+    canvas.scene.box_index.remove_box(item)
 
-            QTimer.singleShot(0, canvas.scene.update)
-            QTimer.singleShot(0, canvas.scene.resize_the_scene)
-            return
+    if options.eyecandy == EYECANDY_FULL:
+        CanvasItemFX(item, False, True)
+    else:
+        item.removeIconFromScene()
+        canvas.scene.removeItem(item)
+        del item
+
+    canvas.remove_group(group)
+    canvas.group_plugin_map.pop(group.plugin_id, None)
+
+    if fast:
+        return
 
-    qCritical("PatchCanvas::removeGroup(%i) - unable to find group to remove" % group_id)
+    QTimer.singleShot(0, canvas.scene.update)
+    QTimer.singleShot(0, canvas.scene.resize_the_scene)
 
 def renameGroup(group_id, new_group_name):
     if canvas.debug:
         print("PatchCanvas::renameGroup(%i, %s)" % (group_id, new_group_name.encode()))
 
-    for group in canvas.group_list:
-        if group.group_id == group_id:
-            group.group_name = new_group_name
-            group.widgets[0].setGroupName(new_group_name)
+    group = canvas.get_group(group_id)
+    if group is None:
+        qCritical("PatchCanvas::renameGroup(%i, %s) - unable to find group to rename" % (group_id, new_group_name.encode()))
+        return
 
-            if group.split and group.widgets[1]:
-                group.widgets[1].setGroupName(new_group_name)
+    group.group_name = new_group_name
+    group.widgets[0].setGroupName(new_group_name)
 
-            QTimer.singleShot(0, canvas.scene.update)
-            return
+    if group.split and group.widgets[1]:
+        group.widgets[1].setGroupName(new_group_name)
 
-    qCritical("PatchCanvas::renameGroup(%i, %s) - unable to find group to rename" % (group_id, new_group_name.encode()))
+    QTimer.singleShot(0, canvas.scene.update)
 
 def splitGroup(group_id, on_place=False):
     if canvas.debug:
@@ -468,33 +471,32 @@ def splitGroup(group_id, on_place=False):
     conns_data = []
 
     # Step 1 - Store all Item data
-    for group in canvas.group_list:
-        if group.group_id == group_id:
-            if group.split:
-                qCritical("PatchCanvas::splitGroup(%i) - group is already split" % group_id)
-                return
+    group = canvas.get_group(group_id)
+    if group is not None:
+        if group.split:
+            qCritical("PatchCanvas::splitGroup(%i) - group is already split" % group_id)
+            return
 
-            item = group.widgets[0]
-            group_name = group.group_name
-            group_icon_type = group.icon_type
-            group_icon_name = group.icon_name
-            group_null_pos = group.null_pos
-            group_in_pos = group.in_pos
-            group_out_pos = group.out_pos
-            plugin_id = group.plugin_id
-            plugin_ui = group.plugin_ui
-            plugin_inline = group.plugin_inline
-            handle_client_gui = group.handle_client_gui
-            gui_visible = group.gui_visible
-            
-            if on_place and item is not None:
-                pos = item.pos()
-                rect = item.boundingRect()
-                y = int(pos.y())
-                x = int(pos.x())
-                group_in_pos = QPoint(x - int(rect.width() / 2), y)
-                group_out_pos = QPoint(x + int(rect.width() / 2), y)
-            break
+        item = group.widgets[0]
+        group_name = group.group_name
+        group_icon_type = group.icon_type
+        group_icon_name = group.icon_name
+        group_null_pos = group.null_pos
+        group_in_pos = group.in_pos
+        group_out_pos = group.out_pos
+        plugin_id = group.plugin_id
+        plugin_ui = group.plugin_ui
+        plugin_inline = group.plugin_inline
+        handle_client_gui = group.handle_client_gui
+        gui_visible = group.gui_visible
+
+        if on_place and item is not None:
+            pos = item.pos()
+            rect = item.boundingRect()
+            y = int(pos.y())
+            x = int(pos.x())
+            group_in_pos = QPoint(x - int(rect.width() / 2), y)
+            group_out_pos = QPoint(x + int(rect.width() / 2), y)
 
     if not item:
         qCritical("PatchCanvas::splitGroup(%i) - unable to find group to split" % group_id)
@@ -502,41 +504,43 @@ def splitGroup(group_id, on_place=False):
 
     wrap = item.is_wrapped()
 
-    for portgrp in canvas.portgrp_list:
-        if portgrp.group_id == group_id:
-            portgrp_dict = portgrp_dict_t()
-            portgrp_dict.group_id = portgrp.group_id
-            portgrp_dict.portgrp_id = portgrp.portgrp_id
-            portgrp_dict.port_type = portgrp.port_type
-            portgrp_dict.port_mode = portgrp.port_mode
-            portgrp_dict.port_id_list = portgrp.port_id_list
-            portgrp_dict.widget = None
-            portgrps_data.append(portgrp_dict)
-
-    for port in canvas.port_list:
-        if port.group_id == group_id:
-            port_dict = port_dict_t()
-            port_dict.group_id = port.group_id
-            port_dict.port_id = port.port_id
-            port_dict.port_name = port.port_name
-            port_dict.port_mode = port.port_mode
-            port_dict.port_type = port.port_type
-            port_dict.portgrp_id = 0
-            port_dict.is_alternate = port.is_alternate
-            port_dict.widget = None
-            ports_data.append(port_dict)
-
-    for connection in canvas.connection_list:
-        if (connection.group_out_id == group_id
-                or connection.group_in_id == group_id):
-            connection_dict = connection_dict_t()
-            connection_dict.connection_id = connection.connection_id
-            connection_dict.group_in_id = connection.group_in_id
-            connection_dict.port_in_id = connection.port_in_id
-            connection_dict.group_out_id = connection.group_out_id
-            connection_dict.port_out_id = connection.port_out_id
-            connection_dict.widget = None
-            conns_data.append(connection_dict)
+    for portgrp in canvas.get_group_portgrps(group_id):
+        portgrp_dict = portgrp_dict_t()
+        portgrp_dict.group_id = portgrp.group_id
+        portgrp_dict.portgrp_id = portgrp.portgrp_id
+        portgrp_dict.port_type = portgrp.port_type
+        portgrp_dict.port_mode = portgrp.port_mode
+        portgrp_dict.port_id_list = portgrp.port_id_list
+        portgrp_dict.widget = None
+        portgrps_data.append(portgrp_dict)
+
+    for port in canvas.get_group_ports(group_id):
+        port_dict = port_dict_t()
+        port_dict.group_id = port.group_id
+        port_dict.port_id = port.port_id
+        port_dict.port_name = port.port_name
+        port_dict.port_mode = port.port_mode
+        port_dict.port_type = port.port_type
+        port_dict.portgrp_id = 0
+        port_dict.is_alternate = port.is_alternate
+        port_dict.widget = None
+        ports_data.append(port_dict)
+
+    # connections of the group, once even if inside the group
+    group_connections = {}
+    for port in canvas.get_group_ports(group_id):
+        for connection in canvas.get_port_connections(group_id, port.port_id):
+            group_connections[connection.connection_id] = connection
+
+    for connection in group_connections.values():
+        connection_dict = connection_dict_t()
+        connection_dict.connection_id = connection.connection_id
+        connection_dict.group_in_id = connection.group_in_id
+        connection_dict.port_in_id = connection.port_in_id
+        connection_dict.group_out_id = connection.group_out_id
+        connection_dict.port_out_id = connection.port_out_id
+        connection_dict.widget = None
+        conns_data.append(connection_dict)
 
     # Step 2 - Remove Item and Children
     for conn in conns_data:
@@ -578,12 +582,12 @@ def splitGroup(group_id, on_place=False):
         connectPorts(conn.connection_id, conn.group_out_id, conn.port_out_id,
                      conn.group_in_id, conn.port_in_id, fast=True)
 
-    for group in canvas.group_list:
-        if group.group_id == group_id:
-            for box in group.widgets:
-                if box is not None:
-                    box.set_wrapped(wrap, animate=False)
-                    box.updatePositions(even_animated=True)
+    group = canvas.get_group(group_id)
+    if group is not None:
+        for box in group.widgets:
+            if box is not None:
+                box.set_wrapped(wrap, animate=False)
+                box.updatePositions(even_animated=True)
 
     QTimer.singleShot(0, canvas.scene.update)
 
@@ -609,26 +613,25 @@ def joinGroup(group_id):
     conns_data = []
 
     # Step 1 - Store all Item data
-    for group in canvas.group_list:
-        if group.group_id == group_id:
-            if not group.split:
-                qCritical("PatchCanvas::joinGroup(%i) - group is not split" % group_id)
-                return
+    group = canvas.get_group(group_id)
+    if group is not None:
+        if not group.split:
+            qCritical("PatchCanvas::joinGroup(%i) - group is not split" % group_id)
+            return
 
-            item = group.widgets[0]
-            s_item = group.widgets[1]
-            group_name = group.group_name
-            group_icon_type = group.icon_type
-            group_icon_name = group.icon_name
-            group_null_pos = group.null_pos
-            group_in_pos = group.in_pos
-            group_out_pos = group.out_pos
-            plugin_id = group.plugin_id
-            plugin_ui = group.plugin_ui
-            plugin_inline = group.plugin_inline
-            handle_client_gui = group.handle_client_gui
-            gui_visible = group.gui_visible
-            break
+        item = group.widgets[0]
+        s_item = group.widgets[1]
+        group_name = group.group_name
+        group_icon_type = group.icon_type
+        group_icon_name = group.icon_name
+        group_null_pos = group.null_pos
+        group_in_pos = group.in_pos
+        group_out_pos = group.out_pos
+        plugin_id = group.plugin_id
+        plugin_ui = group.plugin_ui
+        plugin_inline = group.plugin_inline
+        handle_client_gui = group.handle_client_gui
+        gui_visible = group.gui_visible
 
     # FIXME
     if not (item and s_item):
@@ -637,41 +640,43 @@ def joinGroup(group_id):
 
     wrap = item.is_wrapped() and s_item.is_wrapped()
 
-    for portgrp in canvas.portgrp_list:
-        if portgrp.group_id == group_id:
-            portgrp_dict = portgrp_dict_t()
-            portgrp_dict.group_id = portgrp.group_id
-            portgrp_dict.portgrp_id = portgrp.portgrp_id
-            portgrp_dict.port_type = portgrp.port_type
-            portgrp_dict.port_mode = portgrp.port_mode
-            portgrp_dict.port_id_list = portgrp.port_id_list
-            portgrp_dict.widget = None
-            portgrps_data.append(portgrp_dict)
-
-    for port in canvas.port_list:
-        if port.group_id == group_id:
-            port_dict = port_dict_t()
-            port_dict.group_id = port.group_id
-            port_dict.port_id = port.port_id
-            port_dict.port_name = port.port_name
-            port_dict.port_mode = port.port_mode
-            port_dict.port_type = port.port_type
-            port_dict.portgrp_id = port.portgrp_id
-            port_dict.is_alternate = port.is_alternate
-            port_dict.widget = None
-            ports_data.append(port_dict)
-
-    for connection in canvas.connection_list:
-        if (connection.group_out_id == group_id
-                or connection.group_in_id == group_id):
-            connection_dict = connection_dict_t()
-            connection_dict.connection_id = connection.connection_id
-            connection_dict.group_in_id = connection.group_in_id
-            connection_dict.port_in_id = connection.port_in_id
-            connection_dict.group_out_id = connection.group_out_id
-            connection_dict.port_out_id = connection.port_out_id
-            connection_dict.widget = None
-            conns_data.append(connection_dict)
+    for portgrp in canvas.get_group_portgrps(group_id):
+        portgrp_dict = portgrp_dict_t()
+        portgrp_dict.group_id = portgrp.group_id
+        portgrp_dict.portgrp_id = portgrp.portgrp_id
+        portgrp_dict.port_type = portgrp.port_type
+        portgrp_dict.port_mode = portgrp.port_mode
+        portgrp_dict.port_id_list = portgrp.port_id_list
+        portgrp_dict.widget = None
+        portgrps_data.append(portgrp_dict)
+
+    for port in canvas.get_group_ports(group_id):
+        port_dict = port_dict_t()
+        port_dict.group_id = port.group_id
+        port_dict.port_id = port.port_id
+        port_dict.port_name = port.port_name
+        port_dict.port_mode = port.port_mode
+        port_dict.port_type = port.port_type
+        port_dict.portgrp_id = port.portgrp_id
+        port_dict.is_alternate = port.is_alternate
+        port_dict.widget = None
+        ports_data.append(port_dict)
+
+    # connections of the group, once even if inside the group
+    group_connections = {}
+    for port in canvas.get_group_ports(group_id):
+        for connection in canvas.get_port_connections(group_id, port.port_id):
+            group_connections[connection.connection_id] = connection
+
+    for connection in group_connections.values():
+        connection_dict = connection_dict_t()
+        connection_dict.connection_id = connection.connection_id
+        connection_dict.group_in_id = connection.group_in_id
+        connection_dict.port_in_id = connection.port_in_id
+        connection_dict.group_out_id = connection.group_out_id
+        connection_dict.port_out_id = connection.port_out_id
+        connection_dict.widget = None
+        conns_data.append(connection_dict)
 
     # Step 2 - Remove Item and Children
     for conn in conns_data:
@@ -710,12 +715,12 @@ def joinGroup(group_id):
         connectPorts(conn.connection_id, conn.group_out_id, conn.port_out_id,
                      conn.group_in_id, conn.port_in_id, fast=True)
 
-    for group in canvas.group_list:
-        if group.group_id == group_id:
-            for box in group.widgets:
-                if box is not None:
-                    box.set_wrapped(wrap, animate=False)
-                    box.updatePositions()
+    group = canvas.get_group(group_id)
+    if group is not None:
+        for box in group.widgets:
+            if box is not None:
+                box.set_wrapped(wrap, animate=False)
+                box.updatePositions()
 
     canvas.callback(ACTION_GROUP_JOINED, group_id, 0, '')
 
@@ -733,31 +738,29 @@ def redrawAllGroups():
     QTimer.singleShot(0, canvas.scene.update)
 
 def redrawGroup(group_id: int):
-    for group in canvas.group_list:
-        if group.group_id == group_id:
-            for box in group.widgets:
-                if box is not None:
-                    box.updatePositions()
-            break
+    group = canvas.get_group(group_id)
+    if group is not None:
+        for box in group.widgets:
+            if box is not None:
+                box.updatePositions()
 
     QTimer.singleShot(0, canvas.scene.update)
 
 def animateBeforeJoin(group_id: int):
     canvas.qobject.groups_to_join.append(group_id)
 
-    for group in canvas.group_list:
-        if group.group_id == group_id:
-            for widget in group.widgets:
-                canvas.scene.add_box_to_animation(
-                    widget, group.null_pos.x(), group.null_pos.y())
-            break
+    group = canvas.get_group(group_id)
+    if group is None:
+        return
+
+    for widget in group.widgets:
+        canvas.scene.add_box_to_animation(
+            widget, group.null_pos.x(), group.null_pos.y())
 
 def moveGroupBoxes(group_id: int, null_xy: tuple,
                    in_xy: tuple, out_xy: tuple, animate=True):
-    for group in canvas.group_list:
-        if group.group_id == group_id:
-            break
-    else:
+    group = canvas.get_group(group_id)
+    if group is None:
         return
 
     group.null_pos = QPoint(*null_xy)
@@ -798,12 +801,14 @@ def moveGroupBoxes(group_id: int, null_xy: tuple,
                                           force_anim=animate)
 
 def wrapGroupBox(group_id: int, port_mode: int, yesno: bool, animate=True):
-    for group in canvas.group_list:
-        if group.group_id == group_id:
-            for box in group.widgets:
-                if (box is not None
-                        and box.getSplittedMode() == port_mode):
-                    box.set_wrapped(yesno, animate=animate)
+    group = canvas.get_group(group_id)
+    if group is None:
+        return
+
+    for box in group.widgets:
+        if (box is not None
+                and box.getSplittedMode() == port_mode):
+            box.set_wrapped(yesno, animate=animate)
 
 # ------------------------------------------------------------------------------------------------------------
 
@@ -811,9 +816,9 @@ def getGroupPos(group_id, port_mode=PORT_MODE_OUTPUT):
     if canvas.debug:
         print("PatchCanvas::getGroupPos(%i, %s)" % (group_id, port_mode2str(port_mode)))
 
-    for group in canvas.group_list:
-        if group.group_id == group_id:
-            return group.widgets[1 if (group.split and port_mode == PORT_MODE_INPUT) else 0].pos()
+    group = canvas.get_group(group_id)
+    if group is not None:
+        return group.widgets[1 if (group.split and port_mode == PORT_MODE_INPUT) else 0].pos()
 
     qCritical("PatchCanvas::getGroupPos(%i, %s) - unable to find group" % (group_id, port_mode2str(port_mode)))
     return QPointF(0, 0)
@@ -847,15 +852,15 @@ def setGroupPosFull(group_id, group_pos_x_o, group_pos_y_o, group_pos_x_i, group
         print("PatchCanvas::setGroupPos(%i, %i, %i, %i, %i)" % (
               group_id, group_pos_x_o, group_pos_y_o, group_pos_x_i, group_pos_y_i))
 
-    for group in canvas.group_list:
-        if group.group_id == group_id:
-            group.widgets[0].setPos(group_pos_x_o, group_pos_y_o)
+    group = canvas.get_group(group_id)
+    if group is not None:
+        group.widgets[0].setPos(group_pos_x_o, group_pos_y_o)
 
-            if group.split and group.widgets[1]:
-                group.widgets[1].setPos(group_pos_x_i, group_pos_y_i)
+        if group.split and group.widgets[1]:
+            group.widgets[1].setPos(group_pos_x_i, group_pos_y_i)
 
-            QTimer.singleShot(0, canvas.scene.update)
-            return
+        QTimer.singleShot(0, canvas.scene.update)
+        return
 
     qCritical("PatchCanvas::setGroupPos(%i, %i, %i, %i, %i) - unable to find group to reposition" % (
               group_id, group_pos_x_o, group_pos_y_o, group_pos_x_i, group_pos_y_i))
@@ -866,15 +871,15 @@ def setGroupIcon(group_id, icon_type: int, icon_name: str):
     if canvas.debug:
         print("PatchCanvas::setGroupIcon(%i, %s)" % (group_id, icon2str(icon_type)))
 
-    for group in canvas.group_list:
-        if group.group_id == group_id:
-            group.icon_type = icon_type
-            for widget in group.widgets:
-                if widget is not None:
-                    widget.setIcon(icon_type, icon_name)
+    group = canvas.get_group(group_id)
+    if group is not None:
+        group.icon_type = icon_type
+        for widget in group.widgets:
+            if widget is not None:
+                widget.setIcon(icon_type, icon_name)
 
-            QTimer.singleShot(0, canvas.scene.update)
-            return
+        QTimer.singleShot(0, canvas.scene.update)
+        return
 
     qCritical("PatchCanvas::setGroupIcon(%i, %s) - unable to find group to change icon" % (group_id, icon2str(icon_type)))
 
@@ -883,18 +888,18 @@ def setGroupAsPlugin(group_id, plugin_id, hasUI, hasInlineDisplay):
         print("PatchCanvas::setGroupAsPlugin(%i, %i, %s, %s)" % (
               group_id, plugin_id, bool2str(hasUI), bool2str(hasInlineDisplay)))
 
-    for group in canvas.group_list:
-        if group.group_id == group_id:
-            group.plugin_id = plugin_id
-            group.plugin_ui = hasUI
-            group.plugin_inline = hasInlineDisplay
-            group.widgets[0].setAsPlugin(plugin_id, hasUI, hasInlineDisplay)
+    group = canvas.get_group(group_id)
+    if group is not None:
+        group.plugin_id = plugin_id
+        group.plugin_ui = hasUI
+        group.plugin_inline = hasInlineDisplay
+        group.widgets[0].setAsPlugin(plugin_id, hasUI, hasInlineDisplay)
 
-            if group.split and group.widgets[1]:
-                group.widgets[1].setAsPlugin(plugin_id, hasUI, hasInlineDisplay)
+        if group.split and group.widgets[1]:
+            group.widgets[1].setAsPlugin(plugin_id, hasUI, hasInlineDisplay)
 
-            canvas.group_plugin_map[plugin_id] = group
-            return
+        canvas.group_plugin_map[plugin_id] = group
+        return
 
     qCritical("PatchCanvas::setGroupAsPlugin(%i, %i, %s, %s) - unable to find group to set as plugin" % (
               group_id, plugin_id, bool2str(hasUI), bool2str(hasInlineDisplay)))
@@ -907,26 +912,24 @@ def addPort(group_id, port_id, port_name, port_mode, port_type, is_alternate=Fal
               group_id, port_id, port_name.encode(),
               port_mode2str(port_mode), port_type2str(port_type), bool2str(is_alternate)))
 
-    for port in canvas.port_list:
-        if port.group_id == group_id and port.port_id == port_id:
-            qWarning("PatchCanvas::addPort(%i, %i, %s, %s, %s) - port already exists" % (
-                     group_id, port_id, port_name.encode(), port_mode2str(port_mode), port_type2str(port_type)))
-            return
+    if canvas.get_port(group_id, port_id) is not None:
+        qWarning("PatchCanvas::addPort(%i, %i, %s, %s, %s) - port already exists" % (
+                 group_id, port_id, port_name.encode(), port_mode2str(port_mode), port_type2str(port_type)))
+        return
 
     box_widget = None
     port_widget = None
 
-    for group in canvas.group_list:
-        if group.group_id == group_id:
-            if group.split and group.widgets[0].getSplittedMode() != port_mode and group.widgets[1]:
-                n = 1
-            else:
-                n = 0
-            box_widget = group.widgets[n]
-            port_widget = box_widget.addPortFromGroup(
-                port_id, port_mode, port_type,
-                port_name, is_alternate)
-            break
+    group = canvas.get_group(group_id)
+    if group is not None:
+        if group.split and group.widgets[0].getSplittedMode() != port_mode and group.widgets[1]:
+            n = 1
+        else:
+            n = 0
+        box_widget = group.widgets[n]
+        port_widget = box_widget.addPortFromGroup(
+            port_id, port_mode, port_type,
+            port_name, is_alternate)
 
     if not (box_widget and port_widget):
         qCritical("PatchCanvas::addPort(%i, %i, %s, %s, %s) - Unable to find parent group" % (
@@ -942,7 +945,7 @@ def addPort(group_id, port_id, port_name, port_mode, port_type, is_alternate=Fal
     port_dict.portgrp_id = 0
     port_dict.is_alternate = is_alternate
     port_dict.widget = port_widget
-    canvas.port_list.append(port_dict)
+    canvas.add_port(port_dict)
 
     canvas.last_z_value += 1
     port_widget.setZValue(canvas.last_z_value)
@@ -954,7 +957,8 @@ def addPort(group_id, port_id, port_name, port_mode, port_type, is_alternate=Fal
 
     box_widget.updatePositions()
 
-    if options.eyecandy == EYECANDY_FULL:
+    if (options.eyecandy == EYECANDY_FULL
+            and port_type not in canvas.hidden_port_types):
         CanvasItemFX(port_widget, True, False)
         return
 
@@ -964,62 +968,127 @@ def removePort(group_id, port_id, fast=False):
     if canvas.debug:
         print("PatchCanvas::removePort(%i, %i)" % (group_id, port_id))
 
-    for port in canvas.port_list:
-        if port.group_id == group_id and port.port_id == port_id:
-            if port.portgrp_id:
-                qCritical("PatchCanvas::removePort(%i, %i) - Port is in portgroup %i, remove it before !" % (
-                    group_id, port_id, port.portgrp_id))
-                return
+    port = canvas.get_port(group_id, port_id)
+    if port is None:
+        qCritical("PatchCanvas::removePort(%i, %i) - Unable to find port to remove" % (group_id, port_id))
+        return
 
-            item = port.widget
-            if item is not None:
-                item.parentItem().removePortFromGroup(port_id)
-                canvas.scene.removeItem(item)
+    if port.portgrp_id:
+        qCritical("PatchCanvas::removePort(%i, %i) - Port is in portgroup %i, remove it before !" % (
+            group_id, port_id, port.portgrp_id))
+        return
 
-            del item
-            canvas.port_list.remove(port)
+    item = port.widget
+    if item is not None:
+        item.parentItem().removePortFromGroup(port_id)
+        canvas.scene.removeItem(item)
 
-            canvas.qobject.port_removed.emit(group_id, port_id)
-            if fast:
-                return
+    del item
+    canvas.remove_port(port)
 
-            QTimer.singleShot(0, canvas.scene.update)
-            return
+    canvas.qobject.port_removed.emit(group_id, port_id)
+    if fast:
+        return
+
+    QTimer.singleShot(0, canvas.scene.update)
+
+def reorderPorts(group_id: int, port_id_list: list, fast=False):
+    if canvas.debug:
+        print("PatchCanvas::reorderPorts(%i, %s)" % (group_id, str(port_id_list)))
 
-    qCritical("PatchCanvas::removePort(%i, %i) - Unable to find port to remove" % (group_id, port_id))
+    group = canvas.get_group(group_id)
+    if group is None:
+        qCritical("PatchCanvas::reorderPorts(%i) - Unable to find group" % group_id)
+        return
+
+    canvas.reorder_group_ports(group_id, port_id_list)
+
+    for box in group.widgets:
+        if box is not None:
+            box.reorderPorts(port_id_list)
+
+    if fast:
+        return
+
+    for box in group.widgets:
+        if box is not None:
+            box.updatePositions()
+
+    QTimer.singleShot(0, canvas.scene.update)
+
+def setPortTypeVisible(port_type: int, yesno: bool, fast=False):
+    ''' show or hide all ports, portgroups and connections of port_type.
+        They are kept in the canvas, so showing them again
+        does not need to re-create them.
+        With fast, boxes are not redrawn, call redrawAllGroups() after. '''
+    if canvas.debug:
+        print("PatchCanvas::setPortTypeVisible(%s, %s)" % (
+              port_type2str(port_type), bool2str(yesno)))
+
+    if yesno == bool(port_type not in canvas.hidden_port_types):
+        return
+
+    if yesno:
+        canvas.hidden_port_types.discard(port_type)
+    else:
+        canvas.hidden_port_types.add(port_type)
+
+    # lines first, so boxes redraw can update the shown ones
+    for connection in canvas.connection_list:
+        if connection.widget is None:
+            continue
+
+        port_out = canvas.get_port(connection.group_out_id,
+                                   connection.port_out_id)
+        if port_out is None or port_out.port_type != port_type:
+            continue
+
+        connection.widget.setVisible(yesno)
+
+    for group in canvas.group_list:
+        for box in group.widgets:
+            if box is None:
+                continue
+
+            box.update_port_types_visibility()
+            if not fast:
+                box.updatePositions()
+
+    if fast:
+        return
+
+    QTimer.singleShot(0, canvas.scene.update)
 
 def renamePort(group_id, port_id, new_port_name, fast=False):
     if canvas.debug:
         print("PatchCanvas::renamePort(%i, %i, %s)" % (group_id, port_id, new_port_name))
 
-    for port in canvas.port_list:
-        if port.group_id == group_id and port.port_id == port_id:
-            if new_port_name != port.port_name:
-                port.port_name = new_port_name
-                
-                port.widget.setPortName(new_port_name)
+    port = canvas.get_port(group_id, port_id)
+    if port is None:
+        qCritical("PatchCanvas::renamePort(%i, %i, %s) - Unable to find port to rename" % (
+                  group_id, port_id, new_port_name.encode()))
+        return
 
-            if fast:
-                return
+    if new_port_name != port.port_name:
+        port.port_name = new_port_name
+        port.widget.setPortName(new_port_name)
 
-            port.widget.parentItem().updatePositions()
+    if fast:
+        return
 
-            QTimer.singleShot(0, canvas.scene.update)
-            return
+    port.widget.parentItem().updatePositions()
 
-    qCritical("PatchCanvas::renamePort(%i, %i, %s) - Unable to find port to rename" % (
-              group_id, port_id, new_port_name.encode()))
+    QTimer.singleShot(0, canvas.scene.update)
 
 def addPortGroup(group_id, portgrp_id, port_mode, port_type,
                  port_id_list, fast=False):
     if canvas.debug:
         print("PatchCanvas::addPortGroup(%i, %i)" % (group_id, portgrp_id))
 
-    for portgrp in canvas.portgrp_list:
-        if portgrp.group_id == group_id and portgrp.portgrp_id == portgrp_id:
-            qWarning("PatchCanvas::addPortGroup(%i, %i) - portgroup already exists" % (
-                     group_id, portgrp_id))
-            return
+    if canvas.get_portgrp(group_id, portgrp_id) is not None:
+        qWarning("PatchCanvas::addPortGroup(%i, %i) - portgroup already exists" % (
+                 group_id, portgrp_id))
+        return
 
     portgrp_dict = portgrp_dict_t()
     portgrp_dict.group_id = group_id
@@ -1031,9 +1100,8 @@ def addPortGroup(group_id, portgrp_id, port_mode, port_type,
 
     i = 0
     # check that port ids are present and groupable in this group
-    for port in canvas.port_list:
-        if (port.group_id == group_id
-                and port.port_type == port_type
+    for port in canvas.get_group_ports(group_id):
+        if (port.port_type == port_type
                 and port.port_mode == port_mode):
             if port.port_id == port_id_list[i]:
                 if port.portgrp_id:
@@ -1057,30 +1125,31 @@ def addPortGroup(group_id, portgrp_id, port_mode, port_type,
         return
 
     # modify ports impacted by portgroup
-    for port in canvas.port_list:
-        if (port.group_id == group_id
-                 and port.port_id in port_id_list):
-            port.portgrp_id = portgrp_id
-            if port.widget is not None:
-                port.widget.setPortGroupId(portgrp_id)
+    for port_id in port_id_list:
+        port = canvas.get_port(group_id, port_id)
+        if port is None:
+            continue
+
+        port.portgrp_id = portgrp_id
+        if port.widget is not None:
+            port.widget.setPortGroupId(portgrp_id)
 
-    canvas.portgrp_list.append(portgrp_dict)
+    canvas.add_portgrp(portgrp_dict)
 
     # add portgroup widget and refresh the view
-    for group in canvas.group_list:
-        if group.group_id == group_id:
-            for box in group.widgets:
-                if box is None:
-                    continue
-
-                if (not box.isSplitted()
-                        or box.getSplittedMode() == port_mode):
-                    portgrp_dict.widget = box.addPortGroupFromGroup(
-                        portgrp_id, port_mode, port_type, port_id_list)
-
-                    if not fast:
-                        box.updatePositions()
-            break
+    group = canvas.get_group(group_id)
+    if group is not None:
+        for box in group.widgets:
+            if box is None:
+                continue
+
+            if (not box.isSplitted()
+                    or box.getSplittedMode() == port_mode):
+                portgrp_dict.widget = box.addPortGroupFromGroup(
+                    portgrp_id, port_mode, port_type, port_id_list)
+
+                if not fast:
+                    box.updatePositions()
 
 def removePortGroup(group_id, portgrp_id, fast=False):
     if canvas.debug:
@@ -1088,31 +1157,28 @@ def removePortGroup(group_id, portgrp_id, fast=False):
 
     box_widget = None
 
-    for portgrp in canvas.portgrp_list:
-        if (portgrp.group_id == group_id
-                and portgrp.portgrp_id == portgrp_id):
-            # set portgrp_id to the concerned ports
-            for port in canvas.port_list:
-                if (port.group_id == group_id
-                        and port.portgrp_id == portgrp_id):
-                    port.portgrp_id = 0
-
-                    if port.widget is not None:
-                        port.widget.setPortGroupId(0)
-                        box_widget = port.widget.parentItem()
-
-            if portgrp.widget is not None:
-                item = portgrp.widget
-                canvas.scene.removeItem(item)
-                del item
-                portgrp.widget = None
-            break
-    else:
+    portgrp = canvas.get_portgrp(group_id, portgrp_id)
+    if portgrp is None:
         qCritical("PatchCanvas::removePortGroup(%i, %i) - Unable to find portgrp to remove" % (
               group_id, portgrp_id))
         return
 
-    canvas.portgrp_list.remove(portgrp)
+    # set portgrp_id to the concerned ports
+    for port in canvas.get_group_ports(group_id):
+        if port.portgrp_id == portgrp_id:
+            port.portgrp_id = 0
+
+            if port.widget is not None:
+                port.widget.setPortGroupId(0)
+                box_widget = port.widget.parentItem()
+
+    if portgrp.widget is not None:
+        item = portgrp.widget
+        canvas.scene.removeItem(item)
+        del item
+        portgrp.widget = None
+
+    canvas.remove_portgrp(portgrp)
 
     if fast:
         return
@@ -1133,15 +1199,17 @@ def connectPorts(connection_id, group_out_id, port_out_id,
     port_out_parent = None
     port_in_parent = None
 
-    for port in canvas.port_list:
-        if port.group_id == group_out_id and port.port_id == port_out_id:
-            port_out = port.widget
-            if port_out is not None:
-                port_out_parent = port_out.parentItem()
-        elif port.group_id == group_in_id and port.port_id == port_in_id:
-            port_in = port.widget
-            if port_in is not None:
-                port_in_parent = port_in.parentItem()
+    port_out_dict = canvas.get_port(group_out_id, port_out_id)
+    if port_out_dict is not None:
+        port_out = port_out_dict.widget
+        if port_out is not None:
+            port_out_parent = port_out.parentItem()
+
+    port_in_dict = canvas.get_port(group_in_id, port_in_id)
+    if port_in_dict is not None:
+        port_in = port_in_dict.widget
+        if port_in is not None:
+            port_in_parent = port_in.parentItem()
 
     # FIXME
     if not (port_out and port_in and port_out_parent and port_in_parent):
@@ -1163,6 +1231,10 @@ def connectPorts(connection_id, group_out_id, port_out_id,
 
     canvas.scene.addItem(connection_dict.widget)
 
+    if port_out_dict.port_type in canvas.hidden_port_types:
+        # will be shown with its ports, see setPortTypeVisible()
+        connection_dict.widget.setVisible(False)
+
     port_out_parent.addLineFromGroup(connection_dict.widget, connection_id)
     port_in_parent.addLineFromGroup(connection_dict.widget, connection_id)
 
@@ -1173,11 +1245,11 @@ def connectPorts(connection_id, group_out_id, port_out_id,
     canvas.last_z_value += 1
     connection_dict.widget.setZValue(canvas.last_z_value)
 
-    canvas.connection_list.append(connection_dict)
+    canvas.add_connection(connection_dict)
 
     canvas.qobject.connection_added.emit(connection_id)
 
-    if fast:
+    if fast or not connection_dict.widget.isVisible():
         return
 
     if options.eyecandy == EYECANDY_FULL:
@@ -1197,15 +1269,14 @@ def disconnectPorts(connection_id, fast=False):
     group1id = port1id = 0
     group2id = port2id = 0
 
-    for connection in canvas.connection_list:
-        if connection.connection_id == connection_id:
-            group1id = connection.group_out_id
-            group2id = connection.group_in_id
-            port1id = connection.port_out_id
-            port2id = connection.port_in_id
-            line = connection.widget
-            canvas.connection_list.remove(connection)
-            break
+    connection = canvas.get_connection(connection_id)
+    if connection is not None:
+        group1id = connection.group_out_id
+        group2id = connection.group_in_id
+        port1id = connection.port_out_id
+        port2id = connection.port_in_id
+        line = connection.widget
+        canvas.remove_connection(connection)
 
     canvas.qobject.connection_removed.emit(connection_id)
 
@@ -1213,19 +1284,17 @@ def disconnectPorts(connection_id, fast=False):
         qCritical("PatchCanvas::disconnectPorts(%i) - unable to find connection ports" % connection_id)
         return
 
-    for port in canvas.port_list:
-        if port.group_id == group1id and port.port_id == port1id:
-            item1 = port.widget
-            break
+    port = canvas.get_port(group1id, port1id)
+    if port is not None:
+        item1 = port.widget
 
     if not item1:
         qCritical("PatchCanvas::disconnectPorts(%i) - unable to find output port" % connection_id)
         return
 
-    for port in canvas.port_list:
-        if port.group_id == group2id and port.port_id == port2id:
-            item2 = port.widget
-            break
+    port = canvas.get_port(group2id, port2id)
+    if port is not None:
+        item2 = port.widget
 
     if not item2:
         qCritical("PatchCanvas::disconnectPorts(%i) - unable to find input port" % connection_id)
@@ -1233,6 +1302,7 @@ def disconnectPorts(connection_id, fast=False):
 
     item1.parentItem().removeLineFromGroup(connection_id)
     item2.parentItem().removeLineFromGroup(connection_id)
+    canvas.scene.remove_offscreen_line(line)
 
     if options.eyecandy == EYECANDY_FULL and not fast:
         CanvasItemFX(line, False, True)
@@ -1255,6 +1325,7 @@ def arrange():
 def changeTheme(idx: int):
     canvas.theme.setTheme(idx)
     canvas.scene.updateTheme()
+    CanvasClearIconCache()
 
     for group in canvas.group_list:
         for widget in group.widgets:
@@ -1262,6 +1333,15 @@ def changeTheme(idx: int):
                 widget.repaintLines(forced=True)
                 widget.update()
 
+    # ports and portgroups are cached, they have to be re-rendered too
+    for port in canvas.port_list:
+        if port.widget is not None:
+            port.widget.update()
+
+    for portgrp in canvas.portgrp_list:
+        if portgrp.widget is not None:
+            portgrp.widget.update()
+
     QTimer.singleShot(0, canvas.scene.update)
 
 # ------------------------------------------------------------------------------------------------------------
@@ -1352,65 +1432,65 @@ def set_max_port_width(width: int):
     
     
 def semi_hide_group(group_id: int, yesno:bool):
-    for group in canvas.group_list:
-        if group.group_id == group_id:
-            for widget in group.widgets:
-                if widget is not None:
-                    widget.semi_hide(yesno)
-            break
+    group = canvas.get_group(group_id)
+    if group is None:
+        return
+
+    for widget in group.widgets:
+        if widget is not None:
+            widget.semi_hide(yesno)
 
 def semi_hide_connection(connection_id: int, yesno:bool):
-    for connection in canvas.connection_list:
-        if connection.connection_id == connection_id:
-            if connection.widget is not None:
-                connection.widget.semi_hide(yesno)
-            break
+    connection = canvas.get_connection(connection_id)
+    if connection is not None and connection.widget is not None:
+        connection.widget.semi_hide(yesno)
 
 def set_group_in_front(group_id: int):
     canvas.last_z_value += 1
-    
-    for group in canvas.group_list:
-        if group.group_id == group_id:
-            for widget in group.widgets:
-                if widget is not None:
-                    widget.setZValue(canvas.last_z_value)
-            break
+
+    group = canvas.get_group(group_id)
+    if group is None:
+        return
+
+    for widget in group.widgets:
+        if widget is not None:
+            widget.setZValue(canvas.last_z_value)
 
 def set_connection_in_front(connection_id: int):
     canvas.last_z_value += 1
-    
-    for conn in canvas.connection_list:
-        if conn.connection_id == connection_id:
-            if conn.widget is not None:
-                conn.widget.setZValue(canvas.last_z_value)
-            break
+
+    conn = canvas.get_connection(connection_id)
+    if conn is not None and conn.widget is not None:
+        conn.widget.setZValue(canvas.last_z_value)
 
 def select_filtered_group_box(group_id: int, n_select = 1):
-    for group in canvas.group_list:
-        if group.group_id == group_id:
-            n_widget = 1
-
-            for widget in group.widgets:
-                if widget is not None and widget.isVisible():
-                    if n_select == n_widget:
-                        canvas.scene.clearSelection()
-                        widget.setSelected(True)
-                        canvas.scene.center_view_on(widget)
-                        break
-
-                    n_widget += 1
-            break
+    group = canvas.get_group(group_id)
+    if group is None:
+        return
+
+    n_widget = 1
+
+    for widget in group.widgets:
+        if widget is not None and widget.isVisible():
+            if n_select == n_widget:
+                canvas.scene.clearSelection()
+                widget.setSelected(True)
+                canvas.scene.center_view_on(widget)
+                break
+
+            n_widget += 1
 
 def get_number_of_boxes(group_id: int)->int:
     n = 0
-    
-    for group in canvas.group_list:
-        if group.group_id == group_id:
-            for widget in group.widgets:
-                if widget is not None and widget.isVisible():
-                    n += 1
-            break
-    
+
+    group = canvas.get_group(group_id)
+    if group is None:
+        return n
+
+    for widget in group.widgets:
+        if widget is not None and widget.isVisible():
+            n += 1
+
     return n
     
 def set_semi_hide_opacity(opacity: float):
@@ -1426,16 +1506,15 @@ def set_semi_hide_opacity(opacity: float):
             conn.widget.updateLineGradient()
 
 def set_optional_gui_state(group_id: int, visible: bool):
-    for group in canvas.group_list:
-        if group.group_id == group_id:
-            group.handle_client_gui = True
-            group.gui_visible = visible
+    group = canvas.get_group(group_id)
+    if group is not None:
+        group.handle_client_gui = True
+        group.gui_visible = visible
+
+        for widget in group.widgets:
+            if widget is not None:
+                widget.set_optional_gui_state(visible)
 
-            for widget in group.widgets:
-                if widget is not None:
-                    widget.set_optional_gui_state(visible)
-            break
-        
     canvas.scene.update()
 
 # ------------------------------------------------------------------------------------------------------------
@@ -71,6 +71,73 @@ class RubberbandRect(QGraphicsRectItem):
 
 # ------------------------------------------------------------------------------------------------------------
 
+class BoxSpatialIndex:
+    ''' uniform grid of box scene rects,
+        used to find boxes near a rect without scanning all boxes '''
+
+    def __init__(self, cell_size=256):
+        self._cell_size = cell_size
+        self._cells = {}
+        self._box_cells = {}
+        self._box_order = {}
+        self._n_boxes = 0
+
+    def _get_cells(self, rect: QRectF)->tuple:
+        size = self._cell_size
+        return tuple(
+            (x, y)
+            for x in range(floor(rect.left() / size),
+                           floor(rect.right() / size) + 1)
+            for y in range(floor(rect.top() / size),
+                           floor(rect.bottom() / size) + 1))
+
+    def update_box(self, box):
+        cells = self._get_cells(box.boundingRect().translated(box.pos()))
+        old_cells = self._box_cells.get(box)
+        if old_cells == cells:
+            return
+
+        if old_cells is None:
+            self._box_order[box] = self._n_boxes
+            self._n_boxes += 1
+        else:
+            for cell in old_cells:
+                self._cells[cell].discard(box)
+                if not self._cells[cell]:
+                    del self._cells[cell]
+
+        for cell in cells:
+            self._cells.setdefault(cell, set()).add(box)
+        self._box_cells[box] = cells
+
+    def remove_box(self, box):
+        cells = self._box_cells.pop(box, None)
+        if cells is None:
+            return
+
+        del self._box_order[box]
+
+        for cell in cells:
+            self._cells[cell].discard(box)
+            if not self._cells[cell]:
+                del self._cells[cell]
+
+    def clear(self):
+        self._cells.clear()
+        self._box_cells.clear()
+        self._box_order.clear()
+
+    def boxes_in(self, rect: QRectF)->list:
+        ''' returns boxes which cells touch rect, in adding order.
+            caller has to check the real intersection '''
+        boxes = set()
+        for cell in self._get_cells(rect):
+            boxes |= self._cells.get(cell, set())
+
+        return sorted(boxes, key=self._box_order.__getitem__)
+
+# ------------------------------------------------------------------------------------------------------------
+
 class PatchScene(QGraphicsScene):
     scaleChanged = pyqtSignal(float)
     sceneGroupMoved = pyqtSignal(int, int, QPointF)
@@ -110,7 +177,22 @@ class PatchScene(QGraphicsScene):
         self.move_box_timer.timeout.connect(self.move_boxes_animation)
         self.move_box_n = 0
         self.move_box_n_max = 16 # 16 animations steps (20ms * 16 = 320ms)
-        
+
+        self.box_index = BoxSpatialIndex()
+
+        # lines whose geometry update was skipped
+        # because they were out of the view
+        self._offscreen_lines = set()
+
+        self.m_view.horizontalScrollBar().valueChanged.connect(
+            self.update_offscreen_lines)
+        self.m_view.verticalScrollBar().valueChanged.connect(
+            self.update_offscreen_lines)
+        self.m_view.horizontalScrollBar().rangeChanged.connect(
+            self.update_offscreen_lines)
+        self.m_view.verticalScrollBar().rangeChanged.connect(
+            self.update_offscreen_lines)
+        self.scaleChanged.connect(self.update_offscreen_lines)
 
         self.elastic_scene = True
         self.resizing_scene = False
@@ -124,6 +206,8 @@ class PatchScene(QGraphicsScene):
     def clear(self):
         # reimplement Qt function and fix missing rubberband after clear
         QGraphicsScene.clear(self)
+        self.box_index.clear()
+        self._offscreen_lines.clear()
         self.m_rubberband = RubberbandRect(self)
         self.updateTheme()
 
@@ -397,10 +481,22 @@ class PatchScene(QGraphicsScene):
 
             return rect.intersects(large_repulser_rect)
 
+        def boxes_near(rect):
+            # all boxes that rect_has_to_move_from could concern
+            margin = max(box_spacing, box_spacing_hor)
+            return self.box_index.boxes_in(
+                rect.adjusted(- margin, - box_spacing,
+                              margin, box_spacing))
+
         to_move_boxes = []
         repulsers = []
         wanted_directions = [wanted_direction]
 
+        # identity sets, to not rebuild lists for each tested box
+        repulser_set = set(repulser_boxes)
+        to_move_set = set()
+        moving_set = set([b['widget'] for b in self.move_boxes])
+
         for box in repulser_boxes:
             srect = box.boundingRect()
             
@@ -421,26 +517,25 @@ class PatchScene(QGraphicsScene):
 
             items_to_move = []
 
-            for group in canvas.group_list:
-                for widget in group.widgets:
-                    if (widget is None
-                            or widget in repulser_boxes
-                            or widget in [b['item'] for b in to_move_boxes]
-                            or widget in [b['widget'] for b in self.move_boxes]):
-                        continue
-                    
-                    irect = widget.boundingRect()
-                    irect.translate(widget.pos())
+            for widget in boxes_near(srect):
+                if (widget in repulser_set
+                        or widget in to_move_set
+                        or widget in moving_set
+                        or not widget.isVisible()):
+                    continue
+                
+                irect = widget.boundingRect()
+                irect.translate(widget.pos())
 
-                    if rect_has_to_move_from(
-                            repulser['rect'], irect,
-                            repulser['item'].get_current_port_mode(),
-                            widget.get_current_port_mode()):
-                        items_to_move.append({'item': widget, 'rect': irect})
+                if rect_has_to_move_from(
+                        repulser['rect'], irect,
+                        repulser['item'].get_current_port_mode(),
+                        widget.get_current_port_mode()):
+                    items_to_move.append({'item': widget, 'rect': irect})
                     
             for box_dict in self.move_boxes:
-                if (box_dict['widget'] in repulser_boxes
-                        or box_dict['widget'] in [b['item'] for b in to_move_boxes]):
+                if (box_dict['widget'] in repulser_set
+                        or box_dict['widget'] in to_move_set):
                     continue
             
                 widget = box_dict['widget']
@@ -476,6 +571,7 @@ class PatchScene(QGraphicsScene):
                     to_move_box['pos'] = - irect.bottom()
 
                 to_move_boxes.append(to_move_box)
+                to_move_set.add(item)
 
         # sort the list of dicts
         to_move_boxes = sorted(to_move_boxes, key = lambda d: d['pos'])
@@ -534,31 +630,31 @@ class PatchScene(QGraphicsScene):
             # check which existing boxes exists at the new place of the box
             # and add them to this to_move_boxes iteration
             adding_list = []
+            moving_set = set([b['widget'] for b in self.move_boxes])
             
-            for group in canvas.group_list:
-                for widget in group.widgets:
-                    if (widget is None
-                            or widget in repulser_boxes
-                            or widget in [b['item'] for b in to_move_boxes]
-                            or widget in [b['widget'] for b in self.move_boxes]):
-                        continue
-                    
-                    mirect = widget.boundingRect().translated(widget.pos())
-                    if rect_has_to_move_from(
-                            new_rect, mirect,
-                            to_move_box['item'].get_current_port_mode(),
-                            widget.get_current_port_mode()):
-                        adding_list.append(
-                            {'directions': directions,
-                            'pos': mirect.right(),
-                            'item': widget,
-                            'repulser': repulser})
+            for widget in boxes_near(new_rect):
+                if (not widget.isVisible()
+                        or widget in repulser_set
+                        or widget in to_move_set
+                        or widget in moving_set):
+                    continue
+                
+                mirect = widget.boundingRect().translated(widget.pos())
+                if rect_has_to_move_from(
+                        new_rect, mirect,
+                        to_move_box['item'].get_current_port_mode(),
+                        widget.get_current_port_mode()):
+                    adding_list.append(
+                        {'directions': directions,
+                        'pos': mirect.right(),
+                        'item': widget,
+                        'repulser': repulser})
             
             for box_dict in self.move_boxes:
                 mitem = box_dict['widget']
                 
-                if (mitem in repulser_boxes
-                        or mitem in [b['item'] for b in to_move_boxes]):
+                if (mitem in repulser_set
+                        or mitem in to_move_set):
                     continue
                 
                 rect = mitem.boundingRect()
@@ -577,6 +673,7 @@ class PatchScene(QGraphicsScene):
 
             for to_move_box in adding_list:
                 to_move_boxes.append(to_move_box)
+                to_move_set.add(to_move_box['item'])
 
             # now we decide where the box is moved
             pos_offset = item.boundingRect().topLeft()
@@ -586,6 +683,7 @@ class PatchScene(QGraphicsScene):
 
     def bring_neighbors_and_deplace_boxes(self, box_widget, new_scene_rect):
         neighbors = [box_widget]
+        neighbor_set = set(neighbors)
         limit_top = box_widget.pos().y()
         
         for neighbor in neighbors:
@@ -597,14 +695,16 @@ class PatchScene(QGraphicsScene):
             else:
                 srect.translate(neighbor.pos())
 
-            for item in self.items(
-                    srect.adjusted(
-                        0, 0, 0,
-                        canvas.theme.box_spacing + 1)):
-                if item not in neighbors and item.type() == CanvasBoxType:
-                    nrect = item.boundingRect().translated(item.pos())
-                    if nrect.top() >= limit_top:
-                        neighbors.append(item)
+            srect.adjust(0, 0, 0, canvas.theme.box_spacing + 1)
+
+            for item in self.box_index.boxes_in(srect):
+                if item in neighbor_set or not item.isVisible():
+                    continue
+
+                nrect = item.boundingRect().translated(item.pos())
+                if nrect.top() >= limit_top and nrect.intersects(srect):
+                    neighbors.append(item)
+                    neighbor_set.add(item)
         
         neighbors.remove(box_widget)
         
@@ -620,10 +720,39 @@ class PatchScene(QGraphicsScene):
         
         self.deplace_boxes_from_repulsers(repulser_boxes, wanted_direction=DIRECTION_UP)
 
+    def get_visible_rect(self)->QRectF:
+        ''' returns the scene rect currently shown by the view,
+            with a little margin '''
+        return self.m_view.mapToScene(
+            self.m_view.viewport().rect()).boundingRect().adjusted(
+                -50, -50, 50, 50)
+
+    def add_offscreen_line(self, line):
+        self._offscreen_lines.add(line)
+
+    def remove_offscreen_line(self, line):
+        self._offscreen_lines.discard(line)
+
+    def update_offscreen_lines(self, *args):
+        ''' update the geometry of lines skipped while out of the view,
+            the ones still out of the view will be skipped again '''
+        if not self._offscreen_lines:
+            return
+
+        lines = self._offscreen_lines
+        self._offscreen_lines = set()
+
+        for line in lines:
+            if line.scene() is self:
+                line.updateLinePos()
+
     def center_view_on(self, widget):
         self.m_view.centerOn(widget)
 
     def removeItem(self, item):
+        if item.type() == CanvasBoxType:
+            self.box_index.remove_box(item)
+
         for child_item in item.childItems():
             QGraphicsScene.removeItem(self, child_item)
         QGraphicsScene.removeItem(self, item)
@@ -80,6 +80,10 @@ class Theme(object):
         self.setTheme(idx)
 
     def setTheme(self, idx):
+        # pens and gradient stops shared by all connection lines,
+        # they depend on the theme colors
+        self.line_pen_cache = {}
+
         if idx == self.THEME_SILVER_GOLD:
             # Canvas
             self.canvas_bg = QColor(0, 0, 0)
@@ -32,6 +32,12 @@ from . import (bool2str, canvas, CanvasBoxType,
                PORT_MODE_NULL, PORT_MODE_INPUT, PORT_MODE_OUTPUT,
                ACTION_PORTS_CONNECT, ACTION_PORTS_DISCONNECT)
 from .canvasfadeanimation import CanvasFadeAnimation
+from .canvasicon import clearIconCache
+
+# ------------------------------------------------------------------------------------------------------------
+
+# icons returned by CanvasGetIcon, cleared on theme change
+_icons_cache = {}
 
 # ------------------------------------------------------------------------------------------------------------
 
@@ -147,13 +153,11 @@ def CanvasGetFullPortName(group_id, port_id):
     if canvas.debug:
         print("PatchCanvas::CanvasGetFullPortName(%i, %i)" % (group_id, port_id))
 
-    for port in canvas.port_list:
-        if port.group_id == group_id and port.port_id == port_id:
-            group_id = port.group_id
-            for group in canvas.group_list:
-                if group.group_id == group_id:
-                    return group.group_name + ":" + port.port_name
-            break
+    port = canvas.get_port(group_id, port_id)
+    if port is not None:
+        group = canvas.get_group(group_id)
+        if group is not None:
+            return group.group_name + ":" + port.port_name
 
     qCritical("PatchCanvas::CanvasGetFullPortName(%i, %i) - unable to find port" % (group_id, port_id))
     return ""
@@ -165,7 +169,7 @@ def CanvasGetPortConnectionList(group_id, port_id):
 
     conn_list = []
 
-    for connection in canvas.connection_list:
+    for connection in canvas.get_port_connections(group_id, port_id):
         if (connection.group_out_id == group_id
                 and connection.port_out_id == port_id):
             conn_list.append((connection.connection_id,
@@ -179,32 +183,37 @@ def CanvasGetPortConnectionList(group_id, port_id):
 
     return conn_list
 
+def CanvasGetPortsConnections(group_id: int, port_id_list: list)->list:
+    ''' returns connections concerning any port of port_id_list '''
+    connections = {}
+    for port_id in port_id_list:
+        for connection in canvas.get_port_connections(group_id, port_id):
+            connections[connection.connection_id] = connection
+    return list(connections.values())
+
 def CanvasGetPortGroupPosition(group_id: int, port_id: int,
                                portgrp_id: int)->tuple:
     if portgrp_id <= 0:
         return (0, 1)
 
-    for portgrp in canvas.portgrp_list:
-        if (portgrp.group_id == group_id
-                and portgrp.portgrp_id == portgrp_id):
-            for i in range(len(portgrp.port_id_list)):
-                if port_id == portgrp.port_id_list[i]:
-                    return (i, len(portgrp.port_id_list))
+    portgrp = canvas.get_portgrp(group_id, portgrp_id)
+    if portgrp is not None:
+        for i in range(len(portgrp.port_id_list)):
+            if port_id == portgrp.port_id_list[i]:
+                return (i, len(portgrp.port_id_list))
     return (0, 1)
 
 def CanvasGetPortGroupName(group_id: int, ports_ids_list: list)->str:
     # accept portgrp_id instead of ports_ids_list as second argument
     if isinstance(ports_ids_list, int):
-        for portgrp in canvas.portgrp_list:
-            if (portgrp.group_id == group_id
-                    and portgrp.portgrp_id == ports_ids_list):
-                ports_ids_list = portgrp.port_id_list
-                break
+        portgrp = canvas.get_portgrp(group_id, ports_ids_list)
+        if portgrp is not None:
+            ports_ids_list = portgrp.port_id_list
     
     ports_names = []
 
-    for port in canvas.port_list:
-        if port.group_id == group_id and port.port_id in ports_ids_list:
+    for port in canvas.get_group_ports(group_id):
+        if port.port_id in ports_ids_list:
             ports_names.append(port.port_name)
 
     if len(ports_names) < 2:
@@ -242,45 +251,38 @@ def CanvasGetPortGroupName(group_id: int, ports_ids_list: list)->str:
     return portgrp_name
 
 def CanvasGetPortPrintName(group_id, port_id, portgrp_id):
-    for portgrp in canvas.portgrp_list:
-        if (portgrp.group_id == group_id
-                and portgrp.portgrp_id == portgrp_id):
-            portgrp_name = CanvasGetPortGroupName(
-                group_id, portgrp.port_id_list)
+    portgrp = canvas.get_portgrp(group_id, portgrp_id)
+    if portgrp is None:
+        return
 
-            for port in canvas.port_list:
-                if port.group_id == group_id and port.port_id == port_id:
-                    return port.port_name.replace(portgrp_name, '', 1)
+    portgrp_name = CanvasGetPortGroupName(group_id, portgrp.port_id_list)
+
+    port = canvas.get_port(group_id, port_id)
+    if port is not None:
+        return port.port_name.replace(portgrp_name, '', 1)
 
 def CanvasGetPortGroupPortList(group_id: int, portgrp_id: int)->list:
-    for portgrp in canvas.portgrp_list:
-        if (portgrp.group_id == group_id
-                and portgrp.portgrp_id == portgrp_id):
-            return portgrp.port_id_list
+    portgrp = canvas.get_portgrp(group_id, portgrp_id)
+    if portgrp is not None:
+        return portgrp.port_id_list
     return []
 
 def CanvasGetPortGroupFullName(group_id, portgrp_id):
-    for portgrp in canvas.portgrp_list:
-        if (portgrp.group_id == group_id
-                and portgrp.portgrp_id == portgrp_id):
-            group_name = ""
-            for group in canvas.group_list:
-                if group.group_id == group_id:
-                    group_name = group.group_name
-                    break
-            else:
-                return ""
+    portgrp = canvas.get_portgrp(group_id, portgrp_id)
+    if portgrp is None:
+        return ""
 
-            endofname = ''
-            for port_id in portgrp.port_id_list:
-                endofname += "%s/" % CanvasGetPortPrintName(group_id, port_id,
-                                                     portgrp.portgrp_id)
-            portgrp_name = CanvasGetPortGroupName(group_id,
-                                                     portgrp.port_id_list)
+    group = canvas.get_group(group_id)
+    if group is None:
+        return ""
 
-            return "%s:%s %s" % (group_name, portgrp_name, endofname[:-1])
+    endofname = ''
+    for port_id in portgrp.port_id_list:
+        endofname += "%s/" % CanvasGetPortPrintName(group_id, port_id,
+                                                    portgrp.portgrp_id)
+    portgrp_name = CanvasGetPortGroupName(group_id, portgrp.port_id_list)
 
-    return ""
+    return "%s:%s %s" % (group.group_name, portgrp_name, endofname[:-1])
 
 def CanvasConnectionMatches(connection, group_id_1: int, port_ids_list_1: list,
                             group_id_2: int, port_ids_list_2: list)->bool:
@@ -313,17 +315,33 @@ def CanvasGetGroupIcon(group_id: int, port_mode: int):
     if port_mode == PORT_MODE_INPUT:
         group_port_mode = PORT_MODE_OUTPUT
 
-    for group in canvas.group_list:
-        if group.group_id == group_id:
-            if not group.split:
-                group_port_mode = PORT_MODE_NULL
+    group = canvas.get_group(group_id)
+    if group is None:
+        return QIcon()
 
-            return CanvasGetIcon(
-                group.icon_type, group.icon_name, group_port_mode)
+    if not group.split:
+        group_port_mode = PORT_MODE_NULL
 
-    return QIcon()
+    return CanvasGetIcon(group.icon_type, group.icon_name, group_port_mode)
+
+def CanvasClearIconCache():
+    _icons_cache.clear()
+    clearIconCache()
 
 def CanvasGetIcon(icon_type: int, icon_name: str, port_mode: int):
+    if icon_type in (ICON_CLIENT, ICON_APPLICATION):
+        # port mode does not change the icon
+        port_mode = PORT_MODE_NULL
+
+    key = (icon_type, icon_name, port_mode)
+    icon = _icons_cache.get(key)
+    if icon is None:
+        icon = _CanvasFindIcon(icon_type, icon_name, port_mode)
+        _icons_cache[key] = icon
+
+    return icon
+
+def _CanvasFindIcon(icon_type: int, icon_name: str, port_mode: int):
     if icon_type in (ICON_CLIENT, ICON_APPLICATION):
         icon = QIcon.fromTheme(icon_name)
 
@@ -361,15 +379,15 @@ def CanvasConnectPorts(group_id_1: int, port_id_1: int,
                        group_id_2: int, port_id_2:int):
     one_is_out = True
 
-    for port in canvas.port_list:
-        if port.group_id == group_id_1 and port.port_id == port_id_1:
-            if port.port_mode != PORT_MODE_OUTPUT:
-                one_is_out = False
-            break
-        elif port.group_id == group_id_2 and port.port_id == port_id_2:
-            if port.port_mode == PORT_MODE_OUTPUT:
-                one_is_out = False
-            break
+    port_1 = canvas.get_port(group_id_1, port_id_1)
+    port_2 = canvas.get_port(group_id_2, port_id_2)
+
+    if port_1 is not None:
+        if port_1.port_mode != PORT_MODE_OUTPUT:
+            one_is_out = False
+    elif port_2 is not None:
+        if port_2.port_mode == PORT_MODE_OUTPUT:
+            one_is_out = False
     else:
         sys.stderr.write(
             "PatchCanvas::CanvasConnectPorts, port not found %i:%i and %i:%i\n"
@@ -397,52 +415,52 @@ def CanvasPortGroupConnectionState(group_id_1: int, port_id_list_1: list,
     out_port_id_list = []
     in_port_id_list = []
 
-    for port in canvas.port_list:
-        if (port.group_id == group_id_1
-                and port.port_id in port_id_list_1):
-            if port.port_mode == PORT_MODE_OUTPUT:
-                out_port_id_list = port_id_list_1
-                group_out_id = group_id_1
-            else:
-                in_port_id_list = port_id_list_1
-                group_in_id = group_id_1
-        elif (port.group_id == group_id_2
-                and port.port_id in port_id_list_2):
+    for group_id, port_id_list in ((group_id_1, port_id_list_1),
+                                   (group_id_2, port_id_list_2)):
+        for port_id in port_id_list:
+            port = canvas.get_port(group_id, port_id)
+            if port is None:
+                continue
+
             if port.port_mode == PORT_MODE_OUTPUT:
-                out_port_id_list = port_id_list_2
-                group_out_id = group_id_2
+                out_port_id_list = port_id_list
+                group_out_id = group_id
             else:
-                in_port_id_list = port_id_list_2
-                group_in_id = group_id_2
+                in_port_id_list = port_id_list
+                group_in_id = group_id
+            break
 
     if not (out_port_id_list and in_port_id_list):
         return 0
 
+    # (port_out_id, port_in_id) of existing connections between the lists
+    connected = set()
+    for port_out_id in out_port_id_list:
+        for connection in canvas.get_port_connections(group_out_id, port_out_id):
+            if (connection.group_out_id == group_out_id
+                    and connection.port_out_id == port_out_id
+                    and connection.group_in_id == group_in_id):
+                connected.add((port_out_id, connection.port_in_id))
+
     has_connection = False
     miss_connection = False
 
     for out_index in range(len(out_port_id_list)):
         for in_index in range(len(in_port_id_list)):
+            is_connected = bool(
+                (out_port_id_list[out_index], in_port_id_list[in_index])
+                in connected)
+
             if (out_index % len(in_port_id_list)
                     == in_index % len(out_port_id_list)):
-                for connection in canvas.connection_list:
-                    if (connection.group_out_id == group_out_id
-                            and connection.port_out_id == out_port_id_list[out_index]
-                            and connection.group_in_id == group_in_id
-                            and connection.port_in_id == in_port_id_list[in_index]):
-                        has_connection = True
-                        break
+                if is_connected:
+                    has_connection = True
                 else:
                     miss_connection = True
-            else:
-                for connection in canvas.connection_list:
-                    if (connection.group_out_id == group_out_id
-                            and connection.port_out_id == out_port_id_list[out_index]
-                            and connection.group_in_id == group_in_id
-                            and connection.port_in_id == in_port_id_list[in_index]):
-                        # irregular connection exists
-                        # we are sure connection is irregular
-                        return 1
+            elif is_connected:
+                # irregular connection exists
+                # we are sure connection is irregular
+                return 1
 
     if has_connection:
         if miss_connection:
@@ -461,24 +479,18 @@ def CanvasConnectPortGroups(group_id_1: int, portgrp_id_1: int,
     out_port_id_list = []
     in_port_id_list = []
 
-    for portgrp in canvas.portgrp_list:
-        if (portgrp.group_id == group_id_1
-                and portgrp.portgrp_id == portgrp_id_1):
-            if portgrp.port_mode == PORT_MODE_OUTPUT:
-                group_out_id = group_id_1
-                out_port_id_list = portgrp.port_id_list
-            else:
-                group_in_id = group_id_1
-                in_port_id_list = portgrp.port_id_list
-
-        elif (portgrp.group_id == group_id_2
-                and portgrp.portgrp_id == portgrp_id_2):
-            if portgrp.port_mode == PORT_MODE_OUTPUT:
-                group_out_id = group_id_2
-                out_port_id_list = portgrp.port_id_list
-            else:
-                group_in_id = group_id_2
-                in_port_id_list = portgrp.port_id_list
+    for group_id, portgrp_id in ((group_id_1, portgrp_id_1),
+                                 (group_id_2, portgrp_id_2)):
+        portgrp = canvas.get_portgrp(group_id, portgrp_id)
+        if portgrp is None:
+            continue
+
+        if portgrp.port_mode == PORT_MODE_OUTPUT:
+            group_out_id = group_id
+            out_port_id_list = portgrp.port_id_list
+        else:
+            group_in_id = group_id
+            in_port_id_list = portgrp.port_id_list
 
     if not (out_port_id_list and in_port_id_list):
         sys.stderr.write(
@@ -487,8 +499,12 @@ def CanvasConnectPortGroups(group_id_1: int, portgrp_id_1: int,
 
     connected_indexes = []
 
+    out_connections = []
+    for port_out_id in out_port_id_list:
+        out_connections += canvas.get_port_connections(group_out_id, port_out_id)
+
     # disconnect irregular connections
-    for connection in canvas.connection_list:
+    for connection in out_connections:
         if (connection.group_out_id == group_out_id
                 and connection.port_out_id in out_port_id_list
                 and connection.group_in_id == group_in_id
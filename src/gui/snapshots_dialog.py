@@ -377,10 +377,20 @@ class SnapshotsDialog(ChildDialog):
         self.signaler.reply_auto_snapshot.connect(
             self.ui.checkBoxAutoSnapshot.setChecked)
         self.signaler.snapshots_found.connect(self._add_snapshots)
+        self.signaler.snapshot_added.connect(self._add_new_snapshot)
 
         self.snapshots = []
         self.main_snap_group = SnapGroup()
 
+        # snapshots are asked to daemon page by page
+        self._page_size = 200
+        self._page_offset = 0
+        self._page_received = 0
+
+        # a snapshot taken while paging shifts the next pages,
+        # its first snapshot is then already listed.
+        self._listed_snaptexts = set()
+
         self.ui.snapshotsList.setHeaderHidden(True)
         self.ui.snapshotsList.currentItemChanged.connect(
             self._current_item_changed)
@@ -391,16 +401,36 @@ class SnapshotsDialog(ChildDialog):
         self.ui.buttonBox.button(QDialogButtonBox.Ok).setEnabled(
            bool(current and current.data(0, Qt.UserRole)))
 
+    def _ask_snapshots_page(self):
+        pass
+
     def _add_snapshots(self, snaptexts):
         if not snaptexts and not self.main_snap_group.snapshots:
             # Snapshot list finished without any snapshot
             self._no_snapshot_found()
             return
 
+        if not snaptexts:
+            # end of page
+            if self._page_received >= self._page_size:
+                self._page_offset += self._page_received
+                self._page_received = 0
+                self._ask_snapshots_page()
+            return
+
+        self._page_received += len(snaptexts)
+        self._show_snapshots(snaptexts)
+
+    def _add_new_snapshot(self, snaptext: str):
+        # snapshot just taken, not part of the asked pages
+        self._show_snapshots([snaptext])
+
+    def _show_snapshots(self, snaptexts: list):
         for snaptext in snaptexts:
-            if not snaptext:
+            if not snaptext or snaptext in self._listed_snaptexts:
                 continue
 
+            self._listed_snaptexts.add(snaptext)
             snapshot = Snapshot.new_from_snaptext(snaptext)
             self.main_snap_group.add(snapshot)
 
@@ -453,7 +483,7 @@ class SessionSnapshotsDialog(SnapshotsDialog):
 
         self.ui.pushButtonSnapshotNow.clicked.connect(self._take_snapshot)
 
-        self.to_daemon('/ray/session/list_snapshots')
+        self._ask_snapshots_page()
 
         self.ui.checkBoxAutoSnapshot.stateChanged.connect(
             self._set_auto_snapshot)
@@ -469,6 +499,10 @@ class SessionSnapshotsDialog(SnapshotsDialog):
             self.ui.snapshotsList.setVisible(True)
             self.ui.label.setText(self._original_label)
 
+    def _ask_snapshots_page(self):
+        self.to_daemon('/ray/session/list_snapshots',
+                       self._page_offset, self._page_size)
+
     def _set_auto_snapshot(self, bool_snapshot):
         self.to_daemon('/ray/session/set_auto_snapshot', int(bool_snapshot))
 
@@ -487,9 +521,13 @@ class ClientSnapshotsDialog(SnapshotsDialog):
 
         self.client = client
 
-        self.to_daemon('/ray/client/list_snapshots', client.client_id)
+        self._ask_snapshots_page()
         self.resize(0, 0)
 
+    def _ask_snapshots_page(self):
+        self.to_daemon('/ray/client/list_snapshots', self.client.client_id,
+                       self._page_offset, self._page_size)
+
     def _no_snapshot_found(self):
         self.ui.label.setText(
             _translate('snapshots',
@@ -0,0 +1,131 @@
+class JackGraph:
+    ''' State of the JACK graph, indexed to keep all changes in constant
+        time whatever the graph size.
+        ports are indexed by name and by uuid,
+        connections (tuples (port_out_name, port_in_name)) are indexed
+        by port name, metadatas are stored in a (uuid, key) -> value dict.
+        Ports and clients removed from JACK are removed with their
+        connections and metadatas. '''
+
+    def __init__(self):
+        # dicts keep insertion order, useful to send ports in JACK order
+        self.ports = {}
+        self._ports_by_uuid = {}
+
+        self.connections = set()
+        # port name -> set of connections
+        self._port_connections = {}
+
+        # (uuid, key) -> value
+        self.metadatas = {}
+        # uuid -> set of keys
+        self._metadata_keys = {}
+
+        # client name -> uuid
+        self.clients = {}
+
+    def clear(self):
+        self.ports.clear()
+        self._ports_by_uuid.clear()
+        self.connections.clear()
+        self._port_connections.clear()
+        self.metadatas.clear()
+        self._metadata_keys.clear()
+        self.clients.clear()
+
+    def get_port(self, port_name: str):
+        return self.ports.get(port_name)
+
+    def get_port_from_uuid(self, uuid: int):
+        return self._ports_by_uuid.get(uuid)
+
+    def add_port(self, port):
+        self.ports[port.name] = port
+        if port.uuid:
+            self._ports_by_uuid[port.uuid] = port
+
+    def remove_port(self, port_name: str):
+        ''' remove port with its connections and metadatas,
+            returns the removed port or None '''
+        port = self.ports.pop(port_name, None)
+        if port is None:
+            return None
+
+        if self._ports_by_uuid.get(port.uuid) is port:
+            del self._ports_by_uuid[port.uuid]
+
+        for connection in list(self._port_connections.get(port_name, ())):
+            self.remove_connection(connection)
+
+        self.remove_metadatas(port.uuid)
+        return port
+
+    def rename_port(self, old_name: str, new_name: str):
+        ''' returns the renamed port or None '''
+        port = self.ports.pop(old_name, None)
+        if port is None:
+            return None
+
+        port.name = new_name
+        self.ports[new_name] = port
+
+        for connection in list(self._port_connections.get(old_name, ())):
+            self.remove_connection(connection)
+            self.add_connection(
+                tuple(new_name if name == old_name else name
+                      for name in connection))
+
+        return port
+
+    def add_connection(self, connection: tuple):
+        self.connections.add(connection)
+        for port_name in connection:
+            self._port_connections.setdefault(port_name, set()).add(connection)
+
+    def remove_connection(self, connection: tuple) -> bool:
+        if connection not in self.connections:
+            return False
+
+        self.connections.discard(connection)
+
+        for port_name in connection:
+            port_connections = self._port_connections.get(port_name)
+            if port_connections is None:
+                continue
+
+            port_connections.discard(connection)
+            if not port_connections:
+                del self._port_connections[port_name]
+
+        return True
+
+    def get_port_connections(self, port_name: str) -> set:
+        return self._port_connections.get(port_name, set())
+
+    def set_metadata(self, uuid: int, key: str, value: str):
+        self.metadatas[(uuid, key)] = value
+        self._metadata_keys.setdefault(uuid, set()).add(key)
+
+    def remove_metadata(self, uuid: int, key: str):
+        if self.metadatas.pop((uuid, key), None) is None:
+            return
+
+        keys = self._metadata_keys[uuid]
+        keys.discard(key)
+        if not keys:
+            del self._metadata_keys[uuid]
+
+    def get_metadata_keys(self, uuid: int) -> set:
+        return self._metadata_keys.get(uuid, set())
+
+    def remove_metadatas(self, uuid: int):
+        for key in self._metadata_keys.pop(uuid, ()):
+            del self.metadatas[(uuid, key)]
+
+    def add_client(self, client_name: str, uuid: int):
+        self.clients[client_name] = uuid
+
+    def remove_client(self, client_name: str):
+        uuid = self.clients.pop(client_name, None)
+        if uuid is not None:
+            self.remove_metadatas(uuid)
@@ -999,10 +999,16 @@ def port_get_all_connections(client, port):
     ports = jlib.jack_port_get_all_connections(client, port)
     if not ports:
         return
+
+    port_names = []
     for port_name in ports:
         if port_name is None:
             break
-        yield _d(port_name)
+        port_names.append(_d(port_name))
+
+    # list returned by JACK has to be freed by the caller
+    free(ports)
+    yield from port_names
 
 
 def port_tie(src, dst):
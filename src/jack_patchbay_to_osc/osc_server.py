@@ -1,17 +1,21 @@
 
+import os
 import sys
 import time
 #import pickle
-import tempfile
 import socket
 import json
 import subprocess
 
-from liblo import Server, Address, make_method
+import liblo
+from liblo import Server, Address, AddressError, Bundle, Message, make_method
 
 import jacklib
 
 
+SNAPSHOT_DIR = '/tmp/RaySession/patchbay_snapshots'
+
+
 ### Code copied from shared/ray.py
 ### we don't import ray.py here, because this executable is Qt free
 ### TODO : make a miniray.py with only Qt free code
@@ -109,11 +113,17 @@ def areOnSameMachine(url1, url2):
 class OscJackPatch(Server):
     slow_wait_time = 0.020
     slow_wait_num = 50
+    # max number of messages in one bundle, to stay under UDP packet size
+    bundle_max_messages = 50
+    # max number of messages in one bundle sent to a GUI TCP server
+    bulk_max_messages = 100
     
     def __init__(self, main_object):
         Server.__init__(self)
         self.add_method('/ray/patchbay/add_gui', 's',
                         self._ray_patchbay_add_gui)
+        self.add_method('/ray/patchbay/add_gui', 'ss',
+                        self._ray_patchbay_add_gui)
         self.add_method('/ray/patchbay/gui_disannounce', '',
                         self._ray_patchbay_gui_disannounce)
         self.add_method('ray/patchbay/port/set_alias', 'sis',
@@ -128,17 +138,24 @@ class OscJackPatch(Server):
                         self._ray_patchbay_refresh)
         self.add_method('/ray/patchbay/set_metadata', 'hss',
                         self._ray_patchbay_set_metadata)
+        self.add_method('/ray/patchbay/resync', '',
+                        self._ray_patchbay_resync)
         
         self.main_object = main_object
         self.jack_client = main_object.jack_client
-        self.port_list = main_object.port_list
-        self.connection_list = main_object.connection_list
-        self.metadata_list = main_object.metadata_list
-        self.client_list = main_object.client_list
+        self.graph = main_object.graph
         self.gui_list = []
+        # GUI url -> address of its TCP server for bulk transfers
+        self._bulk_addrs = {}
         self._tmp_gui_url = ''
         self._terminate = False
 
+        # sequence number of the graph state, incremented at each
+        # bundle of changes sent to GUIs, GUIs check they received all.
+        self._seq = 0
+        self._snapshot_seq = -1
+        self._snapshot_path = '%s/%i.json' % (SNAPSHOT_DIR, self.port)
+
     def set_tmp_gui_url(self, gui_url):
         self._tmp_gui_url = gui_url
 
@@ -146,13 +163,14 @@ class OscJackPatch(Server):
         self.jack_client = jack_client
     
     def _ray_patchbay_add_gui(self, path, args, types, src_addr):
-        self.add_gui(args[0])
+        self.add_gui(*args)
 
     def _ray_patchbay_gui_disannounce(self, path, args, types, src_addr):
         for gui_addr in self.gui_list:
             if gui_addr.url == src_addr.url:
                 # possible because we break the loop
                 self.gui_list.remove(gui_addr)
+                self._bulk_addrs.pop(gui_addr.url, None)
                 break
         
         if not self.gui_list:
@@ -161,17 +179,18 @@ class OscJackPatch(Server):
 
     def _ray_patchbay_port_set_alias(self, path, args, types, src_addr):
         port_name, alias_num, alias = args
-        for port in self.port_list:
-            if port.name == port_name:
-                # TODO
-                # better would be to use jacklib.port_set_alias(port, alias)
-                # but this is very confuse
-                # 2 aliases possibles, but only one arg to this method (after port).
-                if alias_num == 1:
-                    port.alias_1 = alias
-                elif alias_num == 2:
-                    port.alias_2 = alias
-                break
+        port = self.graph.get_port(port_name)
+        if port is None:
+            return
+
+        # TODO
+        # better would be to use jacklib.port_set_alias(port, alias)
+        # but this is very confuse
+        # 2 aliases possibles, but only one arg to this method (after port).
+        if alias_num == 1:
+            port.alias_1 = alias
+        elif alias_num == 2:
+            port.alias_2 = alias
 
     def _ray_patchbay_connect(self, path, args):
         port_out_name, port_in_name = args
@@ -194,6 +213,16 @@ class OscJackPatch(Server):
         uuid, key, value = args
         self.main_object.set_metadata(uuid, key, value)
 
+    def _ray_patchbay_resync(self, path, args, types, src_addr):
+        # GUI missed a bundle of changes, send it the full graph
+        for gui_addr in self.gui_list:
+            if gui_addr.url == src_addr.url:
+                if areOnSameMachine(gui_addr.url, self.url):
+                    self.send_local_data([gui_addr])
+                else:
+                    self.send_distant_data([gui_addr])
+                break
+
     def send_gui(self, *args):
         for gui_addr in self.gui_list:
             self.send(gui_addr, *args)
@@ -202,94 +231,145 @@ class OscJackPatch(Server):
         for src_addr in src_addr_list:
             self.send(src_addr, *args)
 
-    def send_local_data(self, src_addr_list):
-        # at invitation, if gui is on the same machine
-        # it's prefferable to save all data in /tmp
-        # Indeed, to prevent OSC packet loses
-        # this daemon will send a lot of OSC messages not too fast
-        # so here, it is faster, and prevent OSC saturation.
-        # json format (and not binary with pickle) is choosen
-        # this way, code language of the GUI is not a blocker
-        patchbay_data = {'ports': [], 'connections': [],
+    def _write_snapshot(self):
+        patchbay_data = {'seq': self._seq,
+                         'ports': [], 'connections': [],
                          'metadatas': [], 'clients': []}
-        for port in self.port_list:
+
+        for port in self.graph.ports.values():
             port_dict = {'name': port.name, 'type': port.type,
                          'flags': port.flags, 'uuid': port.uuid}
             patchbay_data['ports'].append(port_dict)
         
-        for connection in self.connection_list:
+        for connection in self.graph.connections:
             conn_dict = {'port_out_name': connection[0],
                          'port_in_name': connection[1]}
             patchbay_data['connections'].append(conn_dict)
 
-        for metadata in self.metadata_list:
-            patchbay_data['metadatas'].append(metadata)
+        for (uuid, key), value in self.graph.metadatas.items():
+            patchbay_data['metadatas'].append(
+                {'uuid': uuid, 'key': key, 'value': value})
 
-        for client_dict in self.client_list:
-            patchbay_data['clients'].append(client_dict)
+        for client_name, uuid in self.graph.clients.items():
+            patchbay_data['clients'].append(
+                {'name': client_name, 'uuid': uuid})
 
-        for src_addr in src_addr_list:
-            # tmp file is deleted by the gui itself once read
-            # so there is one tmp file per local GUI
-            file = tempfile.NamedTemporaryFile(delete=False, mode='w+')
-            json.dump(patchbay_data, file)
-            file.close()
+        # write in a tmp file and rename it,
+        # so a GUI never reads a partially written file.
+        tmp_path = self._snapshot_path + '.tmp'
 
-            self.send(src_addr, '/ray/gui/patchbay/fast_temp_file_running',
-                    file.name)
+        try:
+            os.makedirs(SNAPSHOT_DIR, exist_ok=True)
+            with open(tmp_path, 'w') as file:
+                json.dump(patchbay_data, file)
+            os.replace(tmp_path, self._snapshot_path)
+        except OSError as e:
+            sys.stderr.write(
+                'ray-patchbay_to_osc: unable to write snapshot %s: %s\n'
+                % (self._snapshot_path, str(e)))
+            return False
+
+        self._snapshot_seq = self._seq
+        return True
+
+    def remove_snapshot_file(self):
+        if os.path.exists(self._snapshot_path):
+            try:
+                os.remove(self._snapshot_path)
+            except OSError:
+                pass
+
+    def send_local_data(self, src_addr_list):
+        # if gui is on the same machine, it reads the graph
+        # from a json file in /tmp shared by all local GUIs.
+        # Indeed, to prevent OSC packet loses
+        # this daemon will send a lot of OSC messages not too fast
+        # so here, it is faster, and prevent OSC saturation.
+        # json format (and not binary with pickle) is choosen
+        # this way, code language of the GUI is not a blocker.
+        # The file is written again only if graph changed since last write.
+        if self._snapshot_seq != self._seq:
+            if not self._write_snapshot():
+                self.send_distant_data(src_addr_list)
+                return
+
+        self.multi_send(src_addr_list,
+                        '/ray/gui/patchbay/fast_temp_file_shared',
+                        self._snapshot_path, self._seq)
+
+    def _send_bulk(self, gui_addr, messages: list) -> bool:
+        ''' send messages grouped in bundles to the TCP server of the GUI,
+            returns False if GUI has no TCP server or if it is unreachable. '''
+        bulk_addr = self._bulk_addrs.get(gui_addr.url)
+        if bulk_addr is None:
+            return False
+
+        # liblo send without server uses the TCP socket of the address
+        try:
+            for i in range(0, len(messages), self.bulk_max_messages):
+                bundle = Bundle()
+                for message in messages[i:i + self.bulk_max_messages]:
+                    bundle.add(Message(*message))
+                liblo.send(bulk_addr, bundle)
+        except IOError:
+            self._bulk_addrs.pop(gui_addr.url, None)
+            return False
+
+        return True
 
     def send_distant_data(self, src_addr_list):
+        messages = [('/ray/gui/patchbay/sequence_reset', self._seq),
+                    ('/ray/gui/patchbay/big_packets', 0)]
+
+        for port in self.graph.ports.values():
+            messages.append(('/ray/gui/patchbay/port_added',
+                             port.name, port.type, port.flags, port.uuid))
+
+        for connection in self.graph.connections:
+            messages.append(('/ray/gui/patchbay/connection_added',
+                             connection[0], connection[1]))
+
+        for (uuid, key), value in self.graph.metadatas.items():
+            messages.append(('/ray/gui/patchbay/metadata_updated',
+                             uuid, key, value))
+
+        messages.append(('/ray/gui/patchbay/big_packets', 1))
+
+        udp_addr_list = [gui_addr for gui_addr in src_addr_list
+                         if not self._send_bulk(gui_addr, messages)]
+        if not udp_addr_list:
+            return
+
         # we need to slow the long process of messages sends
         # to prevent loss packets
-        self.multi_send(src_addr_list, '/ray/gui/patchbay/big_packets', 0)
         n = 0
-        increment = len(src_addr_list)
+        increment = len(udp_addr_list)
 
-        for port in self.port_list:
-            self.multi_send(src_addr_list, '/ray/gui/patchbay/port_added',
-                            port.name, port.type, port.flags, port.uuid)
-            
-            n += increment
-            if n % self.slow_wait_num < increment:
-                self.multi_send(src_addr_list,
-                                '/ray/gui/patchbay/big_packets', 1)
-                time.sleep(self.slow_wait_time)
-                self.multi_send(src_addr_list,
-                                '/ray/gui/patchbay/big_packets', 0)
+        # last message ends the big packets
+        for message in messages[:-1]:
+            self.multi_send(udp_addr_list, *message)
 
-        for connection in self.connection_list:
-            self.multi_send(src_addr_list,
-                            '/ray/gui/patchbay/connection_added',
-                            connection[0], connection[1])
-            
-            n += increment
-            if n % self.slow_wait_num < increment:
-                self.multi_send(src_addr_list,
-                                '/ray/gui/patchbay/big_packets', 1)
-                time.sleep(self.slow_wait_time)
-                self.multi_send(src_addr_list,
-                                '/ray/gui/patchbay/big_packets', 0)
-                
-        for metadata in self.metadata_list:
-            self.multi_send(src_addr_list,
-                            '/ray/gui/patchbay/metadata_updated',
-                            metadata['uuid'], metadata['key'],
-                            metadata['value'])
-            
             n += increment
             if n % self.slow_wait_num < increment:
-                self.multi_send(src_addr_list,
+                self.multi_send(udp_addr_list,
                                 '/ray/gui/patchbay/big_packets', 1)
                 time.sleep(self.slow_wait_time)
-                self.multi_send(src_addr_list,
+                self.multi_send(udp_addr_list,
                                 '/ray/gui/patchbay/big_packets', 0)
 
-        self.multi_send(src_addr_list, '/ray/gui/patchbay/big_packets', 1)
+        self.multi_send(udp_addr_list, *messages[-1])
 
-    def add_gui(self, gui_url):
+    def add_gui(self, gui_url, bulk_url=''):
         gui_addr = Address(gui_url)
         if gui_addr is None:
             return
+
+        if bulk_url:
+            try:
+                self._bulk_addrs[gui_addr.url] = Address(bulk_url)
+            except AddressError:
+                sys.stderr.write(
+                    'ray-patchbay_to_osc: invalid bulk url %s\n' % bulk_url)
         
         self.send(gui_addr, '/ray/gui/patchbay/announce',
                   int(self.main_object.jack_running),
@@ -307,6 +387,9 @@ class OscJackPatch(Server):
         self.gui_list.append(gui_addr)
 
     def server_restarted(self):
+        # graph has been read again
+        self._seq += 1
+
         self.send_gui('/ray/gui/patchbay/server_started')
         self.send_samplerate()
         self.send_buffersize()
@@ -329,44 +412,26 @@ class OscJackPatch(Server):
         self.send_gui('/ray/gui/patchbay/client_name_and_uuid',
                       client_name, uuid)
 
-    def port_added(self, port):
-        self.send_gui('/ray/gui/patchbay/port_added',
-                      port.name, port.type, port.flags, port.uuid) 
+    def send_gui_batch(self, messages: list):
+        ''' send messages (tuples (path, *args)) to all GUIs,
+            grouped in bundles. Each bundle starts with its sequence number.'''
+        for i in range(0, len(messages), self.bundle_max_messages):
+            self._seq += 1
 
-    def port_renamed(self, port, ex_name):
-        self.send_gui('/ray/gui/patchbay/port_renamed', ex_name, port.name)
-    
-    def port_removed(self, port):
-        self.send_gui('/ray/gui/patchbay/port_removed', port.name)
-    
-    def metadata_updated(self, uuid: int, key: str, value: str):
-        self.send_gui('/ray/gui/patchbay/metadata_updated', uuid, key, value)
-    
-    def port_order_changed(self, port):
-        if port.order is None:
-            return
+            if not self.gui_list:
+                continue
 
-        self.send_gui('/ray/gui/patchbay/port_order_changed',
-                      port.name, port.order)
-    
-    def connection_added(self, connection):
-        self.send_gui('/ray/gui/patchbay/connection_added',
-                     connection[0], connection[1])    
+            bundle = Bundle()
+            bundle.add(Message('/ray/gui/patchbay/sequence', self._seq))
+            for message in messages[i:i + self.bundle_max_messages]:
+                bundle.add(Message(*message))
+
+            for gui_addr in self.gui_list:
+                self.send(gui_addr, bundle)
 
-    def connection_removed(self, connection):
-        self.send_gui('/ray/gui/patchbay/connection_removed',
-                     connection[0], connection[1])
-    
-    def server_stopped(self):
-        # here server is JACK (in future maybe pipewire)
-        self.send_gui('/ray/gui/patchbay/server_stopped')
-    
     def send_dsp_load(self, dsp_load: int):
         self.send_gui('/ray/gui/patchbay/dsp_load', dsp_load)
     
-    def send_one_xrun(self):
-        self.send_gui('/ray/gui/patchbay/add_xrun')
-    
     def send_buffersize(self):
         self.send_gui('/ray/gui/patchbay/buffer_size',
                      self.main_object.buffer_size)
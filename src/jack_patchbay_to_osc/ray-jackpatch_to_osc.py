@@ -8,8 +8,10 @@ import warnings
 import osc_server
 import threading
 import time
+from collections import deque
 
 import jacklib
+from jack_graph import JackGraph
 from jacklib.helpers import c_char_p_p_to_list, voidptr2str
 
 PORT_TYPE_NULL = 0
@@ -18,6 +20,30 @@ PORT_TYPE_MIDI = 2
 
 EXISTENCE_PATH = '/tmp/RaySession/patchbay_daemons/'
 
+# port metadatas sent to the GUI at startup
+PORT_METADATA_KEYS = (jacklib.JACK_METADATA_CONNECTED,
+                      jacklib.JACK_METADATA_ORDER,
+                      jacklib.JACK_METADATA_PORT_GROUP,
+                      jacklib.JACK_METADATA_PRETTY_NAME)
+
+# events pushed by JACK callbacks, treated in the main loop
+EV_CLIENT_REGISTERED = 0
+EV_PORT_ADDED = 1
+EV_PORT_REMOVED = 2
+EV_PORT_RENAMED = 3
+EV_CONNECTION_ADDED = 4
+EV_CONNECTION_REMOVED = 5
+EV_METADATA_CHANGED = 6
+EV_XRUN = 7
+EV_BUFFER_SIZE = 8
+EV_SAMPLERATE = 9
+EV_SHUTDOWN = 10
+
+# events included in the state read by get_all_ports_and_connections()
+GRAPH_EVENTS = (EV_PORT_ADDED, EV_PORT_REMOVED, EV_PORT_RENAMED,
+                EV_CONNECTION_ADDED, EV_CONNECTION_REMOVED,
+                EV_METADATA_CHANGED)
+
 
 
 
@@ -77,25 +103,12 @@ class JackPort:
             self.type = PORT_TYPE_AUDIO
         elif port_type_str == jacklib.JACK_DEFAULT_MIDI_TYPE:
             self.type = PORT_TYPE_MIDI
-            
-        order_prop = jacklib.get_property(self.uuid,
-                                          jacklib.JACK_METADATA_ORDER)
-
-        ret, alias_1, alias_2 = jacklib.port_get_aliases(port_ptr)
-        if ret:
-            self.alias_1 = alias_1
-            self.alias_2 = alias_2
 
     def __lt__(self, other):
         return self.uuid < other.uuid
 
 
 class MainObject:
-    port_list = []
-    connection_list = []
-    metadata_list = []
-    client_list = [] # list of dicts {'name': client_name, 'uuid': client_uuid}
-    client_names_queue = []
     jack_running = False
     osc_server = None
     terminate = False
@@ -109,6 +122,12 @@ class MainObject:
         self.max_dsp_since_last_sent = 0.00
         self._waiting_jack_client_open = True
 
+        # JACK callbacks only append events here (deque is thread safe),
+        # the main loop treats them.
+        self._events = deque()
+
+        self.graph = JackGraph()
+
         self.osc_server = osc_server.OscJackPatch(self)
         self.osc_server.set_tmp_gui_url(gui_url)
         self.write_existence_file()
@@ -162,30 +181,155 @@ class MainObject:
         if sig in (signal.SIGINT, signal.SIGTERM):
             cls.terminate = True
             
-    def eat_client_names_queue(self):
-        while self.client_names_queue:
-            client_name = self.client_names_queue.pop(0)
-            b_uuid = jacklib.get_uuid_for_client_name(self.jack_client, client_name)
-
-            # convert bytes uuid to int
-            uuid = 0
-            if isinstance(b_uuid, bytes):
-                str_uuid = b_uuid.decode()
-                if str_uuid.isdigit():
-                    uuid = int(str_uuid)
+    def _client_registered(self, client_name: str, register: bool):
+        if not register:
+            self.graph.remove_client(client_name)
+            return
 
-            if not uuid:
-                continue
+        b_uuid = jacklib.get_uuid_for_client_name(self.jack_client, client_name)
+
+        # convert bytes uuid to int
+        uuid = 0
+        if isinstance(b_uuid, bytes):
+            str_uuid = b_uuid.decode()
+            if str_uuid.isdigit():
+                uuid = int(str_uuid)
+
+        if uuid:
+            self.graph.add_client(client_name, uuid)
+
+    def treat_events(self):
+        ''' treat all events received from JACK callbacks since last call,
+            and send to GUIs the resulting messages in one batch.
+            A port or a connection added and removed in the same batch
+            is not sent, only the last change of a metadata is sent. '''
+        messages = []
+        added_ports = {}
+        added_connections = {}
+        metadatas = {}
+
+        while self._events:
+            event = self._events.popleft()
+            ev_type = event[0]
+
+            if ev_type == EV_CLIENT_REGISTERED:
+                self._client_registered(*event[1:])
+
+            elif ev_type == EV_PORT_ADDED:
+                jport = event[1]
+                if self.graph.get_port(jport.name) is not None:
+                    # already in the graph,
+                    # see get_all_ports_and_connections()
+                    continue
+
+                self.graph.add_port(jport)
+                added_ports[jport.name] = len(messages)
+                messages.append(('/ray/gui/patchbay/port_added',
+                                 jport.name, jport.type,
+                                 jport.flags, jport.uuid))
+
+            elif ev_type == EV_PORT_REMOVED:
+                port_name = event[1]
+                if self.graph.remove_port(port_name) is None:
+                    continue
+
+                if port_name in added_ports:
+                    messages[added_ports.pop(port_name)] = None
+                else:
+                    messages.append(
+                        ('/ray/gui/patchbay/port_removed', port_name))
+
+            elif ev_type == EV_PORT_RENAMED:
+                old_name, new_name = event[1:]
+                if self.graph.rename_port(old_name, new_name) is None:
+                    continue
 
-            for client_dict in self.client_list:
-                if client_dict['name'] == client_name:
-                    client_dict['uuid'] = uuid
-                    break
+                # a renamed port can't be cancelled anymore
+                added_ports.pop(old_name, None)
+                messages.append(
+                    ('/ray/gui/patchbay/port_renamed', old_name, new_name))
+
+            elif ev_type == EV_CONNECTION_ADDED:
+                connection = event[1]
+                if connection in self.graph.connections:
+                    # already in the graph,
+                    # see get_all_ports_and_connections()
+                    continue
+
+                self.graph.add_connection(connection)
+                added_connections[connection] = len(messages)
+                messages.append(('/ray/gui/patchbay/connection_added',
+                                 *connection))
+
+            elif ev_type == EV_CONNECTION_REMOVED:
+                connection = event[1]
+                if not self.graph.remove_connection(connection):
+                    continue
+
+                if connection in added_connections:
+                    messages[added_connections.pop(connection)] = None
+                else:
+                    messages.append(('/ray/gui/patchbay/connection_removed',
+                                     *connection))
+
+            elif ev_type == EV_METADATA_CHANGED:
+                uuid, key, deleted = event[1:]
+
+                if key is None:
+                    # all metadatas of this uuid have been removed
+                    for ex_key in list(self.graph.get_metadata_keys(uuid)):
+                        self.graph.remove_metadata(uuid, ex_key)
+                        messages.append(('/ray/gui/patchbay/metadata_updated',
+                                         uuid, ex_key, ''))
+                    continue
+
+                if (uuid, key) in metadatas:
+                    messages[metadatas[(uuid, key)][0]] = None
+
+                # value will be read only once, at end
+                metadatas[(uuid, key)] = (len(messages), deleted)
+                messages.append(None)
+
+            elif ev_type == EV_XRUN:
+                messages.append(('/ray/gui/patchbay/add_xrun',))
+
+            elif ev_type == EV_BUFFER_SIZE:
+                self.buffer_size = event[1]
+                messages.append(('/ray/gui/patchbay/buffer_size',
+                                 self.buffer_size))
+
+            elif ev_type == EV_SAMPLERATE:
+                self.samplerate = event[1]
+                messages.append(('/ray/gui/patchbay/sample_rate',
+                                 self.samplerate))
+
+            elif ev_type == EV_SHUTDOWN:
+                self.graph.clear()
+                messages.clear()
+                added_ports.clear()
+                added_connections.clear()
+                metadatas.clear()
+                messages.append(('/ray/gui/patchbay/server_stopped',))
+
+        for (uuid, key), (index, deleted) in metadatas.items():
+            value = ''
+
+            if deleted:
+                self.graph.remove_metadata(uuid, key)
             else:
-                self.client_list.append({'name': client_name, 'uuid': uuid})
-    
-    def add_gui(self, gui_url: str):
-        self.osc_server.add_gui(gui_url)
+                prop = jacklib.get_property(uuid, key)
+                if prop is None:
+                    continue
+
+                value = self.get_metadata_value_str(prop)
+                self.graph.set_metadata(uuid, key, value)
+            messages[index] = ('/ray/gui/patchbay/metadata_updated',
+                               uuid, key, value)
+
+        self.osc_server.send_gui_batch([m for m in messages if m is not None])
+
+    def add_gui(self, gui_url: str, bulk_url=''):
+        self.osc_server.add_gui(gui_url, bulk_url)
     
     def check_jack_client_responding(self):
         for i in range(25): # JACK has 5s to answer
@@ -233,10 +377,11 @@ class MainObject:
                     self.remember_dsp_load()
                 if n % 20 == 0:
                     self.send_dsp_load()
-                
-                self.eat_client_names_queue()
 
-            else:
+            if self._events:
+                self.treat_events()
+
+            if not self.jack_running:
                 if n % 10 == 0:
                     self.start_jack_client()
             n += 1
@@ -246,6 +391,7 @@ class MainObject:
             jacklib.deactivate(self.jack_client)
             jacklib.client_close(self.jack_client)
         self.remove_existence_file()
+        self.osc_server.remove_snapshot_file()
         del self.osc_server
     
     def start_jack_client(self):
@@ -309,88 +455,90 @@ class MainObject:
             self.jack_client, self.jack_shutdown_callback, None)
         jacklib.activate(self.jack_client)
     
+    def _forget_graph_events(self):
+        ''' remove queued port, connection and metadata events,
+            keep the others (shutdown, xrun, buffer size...) in order. '''
+        kept = []
+
+        # events can be appended by JACK callbacks at the same time
+        for i in range(len(self._events)):
+            event = self._events.popleft()
+            if event[0] not in GRAPH_EVENTS:
+                kept.append(event)
+
+        self._events.extendleft(reversed(kept))
+
     def get_all_ports_and_connections(self):
-        self.port_list.clear()
-        self.connection_list.clear()
-        self.metadata_list.clear()
+        # graph events received before are included in the new state.
+        # Events received during the enumeration stay queued,
+        # treat_events() skips ports and connections already listed here.
+        self._forget_graph_events()
+        self.graph.clear()
+
+        # get all metadatas in one call
+        try:
+            all_properties = jacklib.get_all_properties()
+        except BaseException:
+            # metadatas not supported by this JACK version
+            all_properties = {}
 
         #get all currents Jack ports and connections
         port_name_list = c_char_p_p_to_list(
             jacklib.get_ports(self.jack_client, "", "", 0))
         
-        client_names = []
+        # dict used as ordered set
+        client_names = {}
         
         for port_name in port_name_list:
             port_ptr = jacklib.port_by_name(self.jack_client, port_name)
-            jport = JackPort(port_name, self.jack_client)
-            self.port_list.append(jport)
+            jport = JackPort(port_name, self.jack_client, port_ptr)
+            self.graph.add_port(jport)
             
-            client_name = port_name.partition(':')[0]
-            if not client_name in client_names:
-                client_names.append(client_name)
+            client_names[port_name.partition(':')[0]] = None
 
             # get port metadatas
-            for key in (jacklib.JACK_METADATA_CONNECTED,
-                        jacklib.JACK_METADATA_ORDER,
-                        jacklib.JACK_METADATA_PORT_GROUP,
-                        jacklib.JACK_METADATA_PRETTY_NAME):
-                prop = jacklib.get_property(jport.uuid, key)
-                if prop is None:
-                    continue
-
-                value = self.get_metadata_value_str(prop)
-                self.metadata_list.append(
-                    {'uuid': jport.uuid,
-                     'key': key,
-                     'value': value})
+            for prop in all_properties.get(jport.uuid, ()):
+                if prop.key in PORT_METADATA_KEYS:
+                    self.graph.set_metadata(
+                        jport.uuid, prop.key,
+                        self.get_metadata_value_str(prop))
 
             if jport.flags & jacklib.JackPortIsInput:
                 continue
 
-            port_ptr = jacklib.port_by_name(self.jack_client, jport.name)
-            
             # this port is output, list its connections
-            port_connection_names = tuple(
-                jacklib.port_get_all_connections(self.jack_client, port_ptr))
-
-            for port_con_name in port_connection_names:
-                self.connection_list.append((jport.name, port_con_name))
+            for port_con_name in jacklib.port_get_all_connections(
+                    self.jack_client, port_ptr):
+                self.graph.add_connection((jport.name, port_con_name))
         
         for client_name in client_names:
             uuid = jacklib.get_uuid_for_client_name(self.jack_client, client_name)
             if not uuid:
                 continue
 
-            self.client_list.append({'name': client_name, 'uuid': int(uuid)})
-
-        #self.port_list.sort()
+            self.graph.add_client(client_name, int(uuid))
     
     def jack_shutdown_callback(self, arg=None)->int:
         self.jack_running = False
-        self.port_list.clear()
-        self.connection_list.clear()
-        self.osc_server.server_stopped()
+        self._events.append((EV_SHUTDOWN,))
         return 0
 
     def jack_xrun_callback(self, arg=None)->int:
-        self.osc_server.send_one_xrun()
+        self._events.append((EV_XRUN,))
         return 0
 
     def jack_sample_rate_callback(self, samplerate, arg=None)->int:
-        self.samplerate = samplerate
-        self.osc_server.send_samplerate()
+        self._events.append((EV_SAMPLERATE, samplerate))
         return 0
 
     def jack_buffer_size_callback(self, buffer_size, arg=None)->int:
-        self.buffer_size = buffer_size
-        self.osc_server.send_buffersize()
+        self._events.append((EV_BUFFER_SIZE, buffer_size))
         return 0
 
     def jack_client_registration_callback(self, client_name: bytes,
                                           register: int, arg=None)->int:
-        
-        client_name = client_name.decode()
-        self.client_names_queue.append(client_name)
+        self._events.append((EV_CLIENT_REGISTERED, client_name.decode(),
+                             bool(register)))
         return 0
         
     def jack_port_registration_callback(self, port_id: int, register: bool,
@@ -402,46 +550,31 @@ class MainObject:
         port_name = jacklib.port_name(port_ptr)
         
         if register:
+            # port infos have to be read now, port may not exist later
             jport = JackPort(port_name, self.jack_client, port_ptr)
-            self.port_list.append(jport)
-            self.osc_server.port_added(jport)
+            self._events.append((EV_PORT_ADDED, jport))
         else:
-            for jport in self.port_list:
-                if jport.name == port_name:
-                    self.port_list.remove(jport)
-                    self.osc_server.port_removed(jport)
-                    break
+            self._events.append((EV_PORT_REMOVED, port_name))
         return 0
     
-    def jack_port_rename_callback(self, port_id: int, old_name: str,
-                                  new_name: str, arg=None)->int:
-        for jport in self.port_list:
-            if jport.name == str(old_name.decode()):
-                ex_name = jport.name
-                jport.name = str(new_name.decode())
-                self.osc_server.port_renamed(jport, ex_name)
-                break
+    def jack_port_rename_callback(self, port_id: int, old_name: bytes,
+                                  new_name: bytes, arg=None)->int:
+        self._events.append((EV_PORT_RENAMED,
+                             old_name.decode(), new_name.decode()))
         return 0
     
     def jack_port_connect_callback(self, port_id_A: int, port_id_B: int,
                                    connect_yesno: bool, arg=None)->int:
-        #if not self.jack_client:
-            #return 0
-        
         port_ptr_A = jacklib.port_by_id(self.jack_client, port_id_A)
         port_ptr_B = jacklib.port_by_id(self.jack_client, port_id_B)
 
-        port_str_A = jacklib.port_name(port_ptr_A)
-        port_str_B = jacklib.port_name(port_ptr_B)
-
-        connection = (port_str_A, port_str_B)
+        connection = (jacklib.port_name(port_ptr_A),
+                      jacklib.port_name(port_ptr_B))
 
         if connect_yesno:
-            self.connection_list.append(connection)
-            self.osc_server.connection_added(connection)
-        elif connection in self.connection_list:
-            self.connection_list.remove(connection)
-            self.osc_server.connection_removed(connection)
+            self._events.append((EV_CONNECTION_ADDED, connection))
+        else:
+            self._events.append((EV_CONNECTION_REMOVED, connection))
 
         return 0
 
@@ -449,26 +582,10 @@ class MainObject:
                                         type_: int, arg=None)->int:
         if name is not None:
             name = name.decode()
-        
-        value = ''
-
-        if name and type_ != jacklib.PropertyDeleted:
-            prop = jacklib.get_property(uuid, name)
-            if prop is None:
-                return 0
-            
-            value = self.get_metadata_value_str(prop)
-        
-        for metadata in self.metadata_list:
-            if metadata['uuid'] == uuid and metadata['key'] == name:
-                metadata['value'] = value
-                break
-        else:
-            self.metadata_list.append(
-                {'uuid': uuid, 'key': name, 'value': value})
-        
-        self.osc_server.metadata_updated(uuid, name, value)
 
+        self._events.append(
+            (EV_METADATA_CHANGED, uuid, name,
+             bool(type_ == jacklib.PropertyDeleted)))
         return 0
     
     def set_buffer_size(self, buffer_size: int):
@@ -494,8 +611,16 @@ def main_process():
     
     main_object = MainObject(daemon_port, gui_url)
 
-    for gui_url in args:
-        main_object.add_gui(gui_url)
+    # a tcp url is the url for bulk transfers of the previous GUI url
+    gui_urls = []
+    for url in args:
+        if url.startswith('osc.tcp://') and gui_urls:
+            gui_urls[-1][1] = url
+        else:
+            gui_urls.append([url, ''])
+
+    for gui_url, bulk_url in gui_urls:
+        main_object.add_gui(gui_url, bulk_url)
     
     main_object.start_loop()
     main_object.exit()
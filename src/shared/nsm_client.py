@@ -122,6 +122,9 @@ class NSMThread(ServerThread):
         else:
             self.sendToDaemon('/nsm/client/is_clean')
 
+    def sendProgress(self, progress: float):
+        self.sendToDaemon('/nsm/client/progress', float(progress))
+
     def sendGuiState(self, state):
         if state:
             self.sendToDaemon('/nsm/client/gui_is_shown')